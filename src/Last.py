@@ -6,13 +6,38 @@ import tkinter as tk
 from tkinter import ttk, messagebox, simpledialog
 import csv
 import json
+import hashlib
+import gc
+import importlib.util
 from tkcalendar import DateEntry
 import sys, os
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+import io
+import base64
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.artist import setp
 import numpy as np
-from datetime import datetime
-from collections import defaultdict
+from datetime import datetime, date
+from bisect import bisect_left, bisect_right, insort
+from functools import lru_cache
+from contextlib import contextmanager
+from collections import defaultdict, OrderedDict, namedtuple, deque, Counter
+import math
+import time
+import threading
+import multiprocessing
+import queue
+import atexit
+import struct
+import zlib
+import marshal
+import heapq
+if os.name == "nt":
+    import msvcrt
+else:
+    import fcntl
 
 # ---------------------------------
 # 1. TrueSkill
@@ -36,143 +61,1920 @@ def resource_path(relative_path):
     # en lugar de usar _MEIPASS.
     return os.path.join(os.path.dirname(sys.executable), relative_path)
 
-def obtener_season(fecha_str):
+# ---------------------------------
+# NUEVO: Calendario de seasons
+# ---------------------------------
+# Las seasons se definen en temporadas.json como una lista ordenada de
+# {"nombre", "inicio", "fin"} (fechas YYYY-mm-dd, ambas incluidas). El id de
+# cada season es su posición en la lista y es lo que se usa en todo el
+# programa; el nombre solo se muestra. Sin archivo se usa el calendario de
+# siempre: Season 0 hasta 2024 y después una season por semestre, sin fin
+# (los semestres posteriores al año actual se añaden al pedir una fecha suya).
+SEASON_DESCONOCIDA = 9999   # Va la última al ordenar, como antes "Unknown"
+
+temporadas = []              # [{"nombre", "inicio", "fin"}] con fechas como ordinales
+id_season_por_nombre = {}
+_inicios_seasons = []        # Ordinales de inicio ordenados (para bisect)
+_ids_por_inicio = []         # Id de la season que empieza en cada _inicios_seasons[i]
+calendario_semestral = False # True con el calendario de siempre (se amplía solo)
+
+def calendario_por_defecto(hasta_anio=None):
+    """Season 0 y los semestres de 2025 a hasta_anio (por defecto, el actual)."""
+    calendario = [{"nombre": "Season 0", "inicio": "0001-01-01", "fin": "2024-12-31"}]
+    numero = 1
+    for anio in range(2025, (hasta_anio or datetime.today().year) + 1):
+        calendario.append({"nombre": f"Season {numero}",
+                           "inicio": f"{anio}-01-01", "fin": f"{anio}-06-30"})
+        calendario.append({"nombre": f"Season {numero + 1}",
+                           "inicio": f"{anio}-07-01", "fin": f"{anio}-12-31"})
+        numero += 2
+    return calendario
+
+def cargar_calendario():
+    calendario = None
+    archivo = resource_path("temporadas.json")
+    if os.path.exists(archivo):
+        try:
+            with open(archivo, "r", encoding="utf-8") as f:
+                calendario = json.load(f)
+        except Exception as e:
+            print("Error al leer temporadas:", e)
+    if calendario:
+        configurar_calendario(calendario)
+    else:
+        configurar_calendario(calendario_por_defecto(), semestral=True)
+
+def configurar_calendario(calendario, semestral=False):
+    global calendario_semestral
+    calendario_semestral = semestral
+    temporadas.clear()
+    id_season_por_nombre.clear()
+    for sid, entrada in enumerate(calendario):
+        temporadas.append({
+            "nombre": entrada["nombre"],
+            "inicio": date.fromisoformat(entrada["inicio"]).toordinal(),
+            "fin": date.fromisoformat(entrada["fin"]).toordinal(),
+        })
+        id_season_por_nombre[entrada["nombre"]] = sid
+    por_inicio = sorted(range(len(temporadas)), key=lambda sid: temporadas[sid]["inicio"])
+    _inicios_seasons[:] = [temporadas[sid]["inicio"] for sid in por_inicio]
+    _ids_por_inicio[:] = por_inicio
+    dia_ordinal.cache_clear()
+
+def _ampliar_semestres(anio):
     """
-    Determina la 'Season' según la fecha.
-    Ajusta la lógica según tu calendario real de temporadas.
+    Añade al calendario de siempre los semestres que faltan hasta anio. Los
+    ids son posiciones, así que alargar la lista no cambia los ya dados.
     """
+    for entrada in calendario_por_defecto(anio)[len(temporadas):]:
+        sid = len(temporadas)
+        inicio = date.fromisoformat(entrada["inicio"]).toordinal()
+        temporadas.append({"nombre": entrada["nombre"], "inicio": inicio,
+                           "fin": date.fromisoformat(entrada["fin"]).toordinal()})
+        id_season_por_nombre[entrada["nombre"]] = sid
+        _inicios_seasons.append(inicio)
+        _ids_por_inicio.append(sid)
+
+@lru_cache(maxsize=None)
+def dia_ordinal(fecha_str):
+    """Ordinal del día de una fecha YYYY-mm-dd (None si no es válida)."""
     try:
-        fecha = datetime.strptime(fecha_str, '%Y-%m-%d')
-    except Exception:
+        return date(int(fecha_str[0:4]), int(fecha_str[5:7]), int(fecha_str[8:10])).toordinal()
+    except (ValueError, TypeError):
+        return None
+
+def season_de_dia(ordinal):
+    if ordinal is None:
+        return SEASON_DESCONOCIDA
+    if calendario_semestral and ordinal > temporadas[-1]["fin"]:
+        _ampliar_semestres(date.fromordinal(ordinal).year)
+    i = bisect_right(_inicios_seasons, ordinal) - 1
+    if i < 0:
+        return SEASON_DESCONOCIDA
+    sid = _ids_por_inicio[i]
+    return sid if ordinal <= temporadas[sid]["fin"] else SEASON_DESCONOCIDA
+
+def obtener_season(fecha_str):
+    """
+    Determina el id de la 'Season' según la fecha.
+    """
+    return season_de_dia(dia_ordinal(fecha_str))
+
+def season_actual():
+    return season_de_dia(date.today().toordinal())
+
+def nombre_season(sid):
+    if sid == SEASON_DESCONOCIDA or sid >= len(temporadas):
         return "Unknown"
-    limite = datetime(2025, 1, 1)
-    if fecha < limite:
-        return "Season 0"
-    else:
-        year_diff = fecha.year - 2025
-        sem = 0 if fecha.month <= 6 else 1
-        season_num = 1 + (2 * year_diff) + sem
-        return f"Season {season_num}"
+    return temporadas[sid]["nombre"]
+
+configurar_calendario(calendario_por_defecto(), semestral=True)
 
 # Menos conservador que mu - 3*sigma: permite subir/bajar más rápido
 def rating_value(rating_obj):
     return rating_obj.mu - 2 * rating_obj.sigma
 
+# ---------------------------------
+# NUEVO: Historial de partidos por tramos
+# ---------------------------------
+class HistorialPartidos:
+    """
+    Lista de partidos (el id de un partido es su posición) repartida en
+    tramos: primero las seasons archivadas, un shard por season, y al final
+    los partidos de resultados.csv. Un shard no se lee hasta que se pide uno
+    de sus partidos, así que arrancar solo cuesta lo que la season abierta.
+    """
+    def __init__(self):
+        self.archivadas = []    # [{"season", "inicio", "filas", "ruta", "sha256", "ultima_fecha", "partidos"}]
+        self._inicios = []      # inicio de cada tramo archivado (para bisect)
+        self.vivos = []         # Partidos de resultados.csv
+        self.inicio_vivos = 0
+
+    def clear(self):
+        self.archivadas = []
+        self._inicios = []
+        self.vivos = []
+        self.inicio_vivos = 0
+
+    def agregar_archivada(self, tramo):
+        """Añade el shard de una season detrás de los anteriores (antes que los vivos)."""
+        tramo["inicio"] = self.inicio_vivos
+        self.archivadas.append(tramo)
+        self._inicios.append(self.inicio_vivos)
+        self.inicio_vivos += tramo["filas"]
+
+    def cargar(self, tramo):
+        if tramo["partidos"] is None:
+            tramo["partidos"] = leer_shard(tramo)
+        return tramo["partidos"]
+
+    def __len__(self):
+        return self.inicio_vivos + len(self.vivos)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[k] for k in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if i >= self.inicio_vivos:
+            return self.vivos[i - self.inicio_vivos]
+        if i < 0:
+            raise IndexError("partido fuera de rango")
+        tramo = self.archivadas[bisect_right(self._inicios, i) - 1]
+        return self.cargar(tramo)[i - tramo["inicio"]]
+
+    def __iter__(self):
+        for tramo in self.archivadas:
+            yield from self.cargar(tramo)
+        yield from self.vivos
+
+    def recorrer(self):
+        """
+        Como iterar, pero los shards que no estaban en memoria se leen bloque
+        a bloque y no se quedan cargados (para agregados de todas las seasons).
+        """
+        for tramo in self.archivadas:
+            if tramo["partidos"] is not None:
+                yield from tramo["partidos"]
+            else:
+                yield from recorrer_shard(tramo)
+        yield from self.vivos
+
+    def recorrer_por_season(self):
+        """
+        (season, [(idx, partido)]) de cada season, de una en una y en orden de
+        season. Como en recorrer, los shards que no estaban en memoria se leen
+        solo mientras se entrega su season y no se quedan cargados.
+        """
+        def partidos_del_tramo(tramo):
+            partidos = tramo["partidos"] if tramo["partidos"] is not None else recorrer_shard(tramo)
+            return ((tramo["inicio"] + k, p) for k, p in enumerate(partidos))
+
+        tramos = defaultdict(list)
+        sueltos = defaultdict(list)   # Vivos y shards antiguos con varias seasons
+        for tramo in self.archivadas:
+            if tramo["season"] is not None:
+                tramos[tramo["season"]].append(tramo)
+            else:
+                for idx, p in partidos_del_tramo(tramo):
+                    sueltos[p["season"]].append((idx, p))
+        for k, p in enumerate(self.vivos):
+            sueltos[p["season"]].append((self.inicio_vivos + k, p))
+        for season in sorted(tramos.keys() | sueltos.keys()):
+            lista = []
+            for tramo in tramos.get(season, []):
+                lista.extend(partidos_del_tramo(tramo))
+            lista.extend(sueltos.pop(season, []))
+            lista.sort(key=lambda x: x[0])
+            yield season, lista
+
+    def append(self, partido):
+        self.vivos.append(partido)
+
+    def copia(self):
+        """
+        Copia para leer desde otro hilo: comparte los shards (no cambian) y
+        copia solo la lista de vivos, que es la que se modifica.
+        """
+        otra = HistorialPartidos()
+        otra.archivadas = list(self.archivadas)
+        otra._inicios = list(self._inicios)
+        otra.vivos = list(self.vivos)
+        otra.inicio_vivos = self.inicio_vivos
+        return otra
+
+    def tramo_de_season(self, season):
+        for tramo in self.archivadas:
+            if tramo["season"] == season:
+                return tramo
+        return None
+
+    def seasons(self):
+        """Seasons con partidos, sin leer ningún shard."""
+        return ({t["season"] for t in self.archivadas if t["season"] is not None} |
+                {p["season"] for p in self.iterar_cargados()})
+
+    def iterar_cargados(self):
+        """Partidos ya en memoria; no lee shards."""
+        for tramo in self.archivadas:
+            if tramo["partidos"] is not None and tramo["season"] is None:
+                yield from tramo["partidos"]
+        yield from self.vivos
+
+    def partidos_de_season(self, season):
+        """[(idx, partido)] de una season; de los shards solo se lee el suyo."""
+        lista = []
+        for tramo in self.archivadas:
+            if tramo["season"] == season or (tramo["season"] is None and tramo["partidos"] is not None):
+                lista.extend((tramo["inicio"] + k, p) for k, p in enumerate(self.cargar(tramo))
+                             if p["season"] == season)
+        lista.extend((self.inicio_vivos + k, p) for k, p in enumerate(self.vivos) if p["season"] == season)
+        return lista
+
 # ---------------------------------
 # 3. Variables globales
 # ---------------------------------
-jugadores = []
-resultados = []
+jugadores = []          # Nombres de los jugadores activos (ordenados, para los combobox)
+resultados = HistorialPartidos()
 parejas = []
 equipos_str = []
 equipo_str_a_pareja = {}
 
-ranking_trueskill_por_season = {}  # {season: {jugador: Rating}}
-ts_changes_por_partido = {}        # {idx_partido: {jugador: cambio_en_rating}}
-champion_by_season = {}            # {season: nombre_jugador_campeon}
+ranking_trueskill_por_season = {}  # {season: {id_jugador: Rating}}
+clasificacion_por_season = {}      # {season: Clasificacion} (mismo ranking, ordenado)
+ts_changes_por_partido = {}        # {idx_partido: {id_jugador: cambio_en_rating}}
+champion_by_season = {}            # {season: id_jugador_campeon}
+podio_por_season = {}              # {season: [id_1º, id_2º, id_3º]}
+ultima_fecha_por_season = {}       # {season: fecha del último partido repetido}
 
-# Contadores de puestos
+# Contadores de puestos (por id de jugador)
 trofeos_Liga_jugador = defaultdict(int)  # 1º puestos
 segundos_Liga_jugador = defaultdict(int) # 2º puestos
 terceros_Liga_jugador = defaultdict(int) # 3º puestos
 
-# Lista de ganadores de torneos (tupla de (fecha, ganador1, ganador2))
+# Lista de ganadores de torneos (tupla de (fecha, id_ganador1, id_ganador2))
 torneo_winners = []
 # Contador de torneos ganados por cada jugador
 torneos_jugador = defaultdict(int)
 
+# Tabla internada de jugadores: el id es la posición y nunca cambia.
+# Renombrar solo toca nombre_por_id; eliminar marca el jugador como inactivo
+# para que su historial siga resolviéndose.
+nombre_por_id = []   # nombre_por_id[id] -> nombre visible
+activo_por_id = []   # activo_por_id[id] -> bool
+id_por_nombre = {}   # {nombre: id}
+# Ids cambiados aquí desde la última escritura de jugadores.json
+jugadores_modificados = set()
+
+# Sube cada vez que cambian jugadores o partidos; sirve de clave a las cachés
+version_datos = 0
+
+# version_datos con la que se calcularon los rankings (-1 = nunca)
+version_rankings = -1
+
+def marcar_datos_modificados():
+    global version_datos
+    version_datos += 1
+
 # ---------------------------------
-# 4. Lectura/Escritura de Jugadores
+# NUEVO: Cambios para las ventanas abiertas
 # ---------------------------------
-def leer_jugadores():
-    global jugadores
-    archivo_jugadores = resource_path("jugadores.json")
-    if os.path.exists(archivo_jugadores):
+# Quien modifica los datos publica qué ha cambiado (un partido nuevo, editado,
+# borrado o reinsertado, unos jugadores) y notificar_cambios pasa la lista a
+# cada ventana suscrita, que repinta solo las filas afectadas. Un cambio
+# "todo" (recarga completa, otro motor de rating) obliga a repintarlas enteras.
+#   seasons:   seasons tocadas (None = todas)
+#   jugadores: jugadores cuyos datos cambian (None = cualquiera)
+#   repite:    la season se ha repetido, así que cambian también ratings y
+#              deltas de partidos y jugadores que no son los del cambio
+Cambio = namedtuple("Cambio", ["tipo", "idx", "seasons", "jugadores", "repite"])
+CAMBIO_TOTAL = Cambio("todo", None, None, None, True)
+MAX_CAMBIOS_PENDIENTES = 1000   # con más, sale más a cuenta repintar todo
+
+cambios_pendientes = []
+# Funciones refrescar(cambios) de las ventanas abiertas
+observadores_datos = []
+
+def publicar_cambio(tipo, idx=None, partidos=(), jugadores=None, repite=False):
+    """
+    Anota un cambio para la próxima notificación. partidos son los partidos
+    tocados (el anterior y el nuevo al editar): de ellos salen las seasons y
+    los jugadores. Sin partidos afecta a todas las seasons.
+    """
+    if cambios_pendientes and cambios_pendientes[0].tipo == "todo":
+        return
+    if tipo == "todo" or len(cambios_pendientes) >= MAX_CAMBIOS_PENDIENTES:
+        cambios_pendientes[:] = [CAMBIO_TOTAL]
+        return
+    seasons = None
+    if partidos:
+        seasons = frozenset(p["season"] for p in partidos)
+        jugadores = frozenset(j for p in partidos for j in p["partido"][0] + p["partido"][1] if j is not None)
+    elif jugadores is not None:
+        jugadores = frozenset(jugadores)
+    cambios_pendientes.append(Cambio(tipo, idx, seasons, jugadores, repite))
+
+def seasons_afectadas(cambios):
+    """Seasons tocadas por cambios (None = todas)."""
+    if cambios is None:
+        return None
+    seasons = set()
+    for cambio in cambios:
+        if cambio.seasons is None:
+            return None
+        seasons |= cambio.seasons
+    return seasons
+
+def jugadores_afectados(cambios):
+    """Jugadores cuyos datos han cambiado (None = cualquiera)."""
+    if cambios is None:
+        return None
+    ids = set()
+    for cambio in cambios:
+        if cambio.jugadores is None or cambio.repite:
+            return None
+        ids |= cambio.jugadores
+    return ids
+
+def suscribir_ventana(ventana, refrescar):
+    observadores_datos.append(refrescar)
+
+    def al_cerrar(event):
+        if event.widget is ventana and refrescar in observadores_datos:
+            observadores_datos.remove(refrescar)
+
+    ventana.bind("<Destroy>", al_cerrar, add="+")
+
+def notificar_cambios():
+    # Sin nada publicado no se sabe qué ha cambiado: se repinta todo
+    cambios = cambios_pendientes[:] or [CAMBIO_TOTAL]
+    cambios_pendientes.clear()
+    for refrescar in list(observadores_datos):
         try:
-            with open(archivo_jugadores, "r", encoding="utf-8") as f:
-                jugadores = json.load(f)
-        except Exception as e:
-            print("Error al leer jugadores:", e)
-            jugadores = []
+            refrescar(cambios)
+        except tk.TclError:
+            # La ventana se cerró mientras tanto
+            if refrescar in observadores_datos:
+                observadores_datos.remove(refrescar)
+
+def _subsecuencia_creciente(valores):
+    """Posiciones de una subsecuencia creciente de longitud máxima de valores."""
+    colas = []      # colas[k]: posición del menor final de una subsecuencia de longitud k + 1
+    anterior = [-1] * len(valores)
+    for i, v in enumerate(valores):
+        k = bisect_left(colas, v, key=lambda j: valores[j])
+        anterior[i] = colas[k - 1] if k else -1
+        if k == len(colas):
+            colas.append(i)
+        else:
+            colas[k] = i
+    posiciones = []
+    i = colas[-1] if colas else -1
+    while i >= 0:
+        posiciones.append(i)
+        i = anterior[i]
+    return posiciones[::-1]
+
+def sincronizar_filas(tree, filas, mostradas):
+    """
+    Deja en tree las filas [(iid, values, tags)] en ese orden tocando solo
+    lo que cambia: borra las que sobran, inserta las nuevas, actualiza las
+    que tienen otros valores y mueve el mínimo de filas para ordenarlas.
+    mostradas {iid: (values, tags)} es lo que hay pintado; se pone al día.
+    """
+    nuevas = {iid for iid, _, _ in filas}
+    sobran = [iid for iid in mostradas if iid not in nuevas]
+    if sobran:
+        tree.delete(*sobran)
+        for iid in sobran:
+            del mostradas[iid]
+    posicion = {iid: k for k, iid in enumerate(tree.get_children())}
+    seguidas = [iid for iid, _, _ in filas if iid in posicion]
+    # Las filas que ya están en orden relativo se quedan donde están
+    quietas = {seguidas[k] for k in _subsecuencia_creciente([posicion[iid] for iid in seguidas])}
+    mover = [iid for iid in seguidas if iid not in quietas]
+    if mover:
+        tree.detach(*mover)
+    for k, (iid, values, tags) in enumerate(filas):
+        if iid not in mostradas:
+            tree.insert("", k, iid=iid, values=values, tags=tags)
+        else:
+            if iid not in quietas:
+                tree.move(iid, "", k)
+            if mostradas[iid] != (values, tags):
+                tree.item(iid, values=values, tags=tags)
+        mostradas[iid] = (values, tags)
+
+# ---------------------------------
+# NUEVO: Cerrojo entre instancias
+# ---------------------------------
+# Varias personas abren la app sobre la misma carpeta de datos (en una unidad
+# de red). Quien escribe un archivo compartido toma antes un cerrojo
+# consultivo del sistema sobre <archivo>.lock, solo mientras dura la
+# escritura; quien solo lee no lo toma nunca (las reescrituras son atómicas y
+# las filas a medio añadir se dejan para la siguiente lectura). El sistema
+# suelta el cerrojo si el proceso muere, así que no quedan cerrojos huérfanos.
+ARCHIVOS_COMPARTIDOS = ("jugadores.json", "resultados.csv", "torneos.csv")
+ESPERA_MAX_CERROJO = 10.0   # segundos
+REINTENTOS_ESCRITURA = 3    # intentos de un lote si otra instancia retiene el cerrojo
+ESPERA_REINTENTO = 1.0      # segundos antes del segundo intento (se dobla en cada uno)
+
+def _intentar_cerrojo(f):
+    """Intenta el cerrojo exclusivo sobre el archivo abierto f, sin esperar."""
+    try:
+        if os.name == "nt":
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+        else:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        return False
+    return True
+
+def _soltar_cerrojo(f):
+    if os.name == "nt":
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
     else:
-        jugadores = ["Ibai", "Xabi", "Ian", "Aitor", "Cifu", "David",
-                     "Igarki", "Aimar", "Erli", "Maria", "Dani", "AnderM",
-                     "Abad", "Sanchez"]
-    jugadores.sort()
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+@contextmanager
+def bloqueo_archivos(rutas, espera=None):
+    """
+    Cerrojo entre instancias sobre las rutas. Se toman en orden alfabético
+    para que dos instancias no se queden esperándose la una a la otra; si
+    alguno no se consigue en espera segundos (ESPERA_MAX_CERROJO por
+    defecto) se lanza TimeoutError sin haber escrito nada.
+    """
+    if espera is None:
+        espera = ESPERA_MAX_CERROJO
+    tomados = []
+    try:
+        for ruta in sorted(set(rutas)):
+            f = open(ruta + ".lock", "a+b")
+            limite = time.monotonic() + espera
+            while not _intentar_cerrojo(f):
+                if time.monotonic() >= limite:
+                    f.close()
+                    raise TimeoutError(f"{os.path.basename(ruta)} lo tiene bloqueado otra instancia")
+                time.sleep(0.01)
+            tomados.append(f)
+        yield
+    finally:
+        for f in reversed(tomados):
+            _soltar_cerrojo(f)
+            f.close()
+
+# ---------------------------------
+# NUEVO: Persistencia en segundo plano
+# ---------------------------------
+class ColaPersistencia:
+    """
+    Escritura diferida de los archivos de datos. La interfaz encola las
+    escrituras y vuelve enseguida; un hilo las vuelca por lotes con todo lo
+    que se haya acumulado: las filas añadidas a un mismo archivo van en una
+    sola escritura con un único fsync, y las reescrituras completas se hacen
+    en un temporal que sustituye al original con os.replace, de modo que un
+    archivo siempre es el viejo o el nuevo, nunca uno a medias. Los archivos
+    compartidos se escriben con su cerrojo entre instancias tomado.
+
+    Si un lote no se puede escribir (cerrojo retenido tras
+    REINTENTOS_ESCRITURA intentos, disco lleno...) lo que falta se queda en
+    la cola de fallidos, delante del siguiente lote, y se avisa por
+    conflictos_escritura: no se pierde ni se desordena nada.
+    """
+    def __init__(self):
+        self._cola = queue.Queue()
+        self._hilo = None
+        self._pendientes = Counter()    # ruta -> operaciones aún sin escribir
+        self._fallidos = []             # Operaciones de lotes que no se pudieron escribir
+        self._cerrojo = threading.Lock()
+
+    def _encolar(self, op):
+        with self._cerrojo:
+            self._pendientes[op[1]] += 1
+        if self._hilo is None:
+            self._hilo = threading.Thread(target=self._trabajar, name="persistencia", daemon=True)
+            self._hilo.start()
+        self._cola.put(op)
+
+    def anexar(self, ruta, lineas, cabecera="", encoding="utf-8-sig", al_terminar=None):
+        """Añade lineas (texto ya formateado) al final de ruta; si no existe empieza por cabecera."""
+        self._encolar(("anexar", ruta, list(lineas), cabecera, encoding, al_terminar))
+
+    def reemplazar(self, ruta, contenido, encoding="utf-8", al_terminar=None):
+        """
+        Sustituye ruta entera por contenido (texto, o bytes tal cual). Si es
+        una función se llama desde el hilo de escritura, con el cerrojo del
+        archivo tomado, para obtenerlo; si devuelve None no se escribe nada.
+        """
+        self._encolar(("reemplazar", ruta, contenido, None, encoding, al_terminar))
+
+    def borrar(self, ruta, al_terminar=None):
+        self._encolar(("borrar", ruta, None, None, None, al_terminar))
+
+    def pendiente(self, ruta):
+        with self._cerrojo:
+            return self._pendientes[ruta] > 0
+
+    def vaciar(self):
+        """
+        Espera a que se haya intentado escribir todo lo encolado (lo que
+        haya fallado sigue en fallidos()).
+        """
+        if self._hilo is not None:
+            self._cola.join()
+
+    def fallidos(self):
+        """Archivos con cambios que no se han podido escribir."""
+        with self._cerrojo:
+            return sorted({op[1] for op in self._fallidos})
+
+    def reintentar(self):
+        """Vuelve a intentar los fallidos sin esperar a un cambio nuevo."""
+        if self._hilo is not None:
+            self._cola.put(None)
+
+    def _trabajar(self):
+        while True:
+            recibidas = [self._cola.get()]
+            # Commit en grupo: se junta todo lo que ya esté esperando
+            while True:
+                try:
+                    recibidas.append(self._cola.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                # Lo que falló antes va delante, para no desordenar los anexos
+                with self._cerrojo:
+                    lote = self._fallidos + [op for op in recibidas if op is not None]
+                    self._fallidos = []
+                fallidas, error = self._escribir_con_reintentos(lote)
+                with self._cerrojo:
+                    self._fallidos = fallidas
+                    escritas = Counter(op[1] for op in lote)
+                    escritas.subtract(op[1] for op in fallidas)
+                    self._pendientes.subtract(escritas)
+                if fallidas:
+                    archivos = ", ".join(sorted({os.path.basename(op[1]) for op in fallidas}))
+                    conflictos_escritura.append(
+                        f"No se han podido guardar los cambios de {archivos} ({error}). "
+                        "Siguen pendientes: se volverá a intentar con el próximo cambio y al cerrar.")
+            finally:
+                for _ in recibidas:
+                    self._cola.task_done()
+
+    def _escribir_con_reintentos(self, lote):
+        """
+        Escribe el lote; si otra instancia retiene un cerrojo reintenta lo
+        que falte con espera creciente. Devuelve (operaciones sin escribir, error).
+        """
+        for intento in range(REINTENTOS_ESCRITURA):
+            hechas = set()
+            try:
+                self._escribir_lote(lote, hechas)
+                return [], None
+            except TimeoutError as e:
+                lote = [op for i, op in enumerate(lote) if i not in hechas]
+                error = e
+                if intento + 1 < REINTENTOS_ESCRITURA:
+                    time.sleep(ESPERA_REINTENTO * 2 ** intento)
+            except Exception as e:
+                return [op for i, op in enumerate(lote) if i not in hechas], e
+        return lote, error
+
+    @staticmethod
+    def _escribir_atomico(ruta, contenido, encoding):
+        # Temporal propio de este proceso: otra instancia puede estar escribiendo el suyo
+        temporal = f"{ruta}.{os.getpid()}.tmp"
+        if callable(contenido):
+            contenido = contenido()
+            if contenido is None:
+                return
+        try:
+            if isinstance(contenido, bytes):
+                f = open(temporal, "wb")
+            else:
+                f = open(temporal, "w", encoding=encoding, newline="")
+            with f:
+                f.write(contenido)
+                f.flush()
+                os.fsync(f.fileno())
+            for intento in range(50):
+                try:
+                    os.replace(temporal, ruta)
+                    break
+                except PermissionError:
+                    # En Windows no se puede sustituir un archivo que otro esté leyendo en ese momento
+                    if intento == 49:
+                        raise
+                    time.sleep(0.02)
+        except BaseException:
+            # El original sigue intacto; no se deja el temporal a medias
+            if os.path.exists(temporal):
+                os.remove(temporal)
+            raise
+
+    def _escribir_lote(self, lote, hechas):
+        # Todos los cerrojos del lote se toman antes de escribir nada, y los
+        # al_terminar se llaman aún con ellos tomados
+        with bloqueo_archivos(op[1] for op in lote if os.path.basename(op[1]) in ARCHIVOS_COMPARTIDOS):
+            self._escribir_lote_bloqueado(lote, hechas)
+
+    def _escribir_lote_bloqueado(self, lote, hechas):
+        # hechas recibe las posiciones de las operaciones ya en disco, para
+        # que un fallo a mitad de lote no repita anexos al reintentar.
+        # Lo anterior a la última reescritura de un archivo ya va incluido en ella
+        ultima_reescritura = {op[1]: i for i, op in enumerate(lote) if op[0] == "reemplazar"}
+        incluidas = defaultdict(list)   # ruta -> operaciones que van dentro de su reescritura
+        anexos = {}
+        try:
+            for i, (tipo, ruta, datos, cabecera, encoding, _) in enumerate(lote):
+                if i < ultima_reescritura.get(ruta, -1):
+                    incluidas[ruta].append(i)
+                    continue
+                if tipo == "reemplazar":
+                    self._escribir_atomico(ruta, datos, encoding)
+                    hechas.update(incluidas.pop(ruta, []))
+                    hechas.add(i)
+                elif tipo == "borrar":
+                    if os.path.exists(ruta):
+                        os.remove(ruta)
+                    hechas.add(i)
+                else:
+                    anexo = anexos.setdefault(ruta, (cabecera, encoding, [], []))
+                    anexo[2].extend(datos)
+                    anexo[3].append(i)
+            for ruta, (cabecera, encoding, lineas, posiciones) in anexos.items():
+                nuevo = not os.path.exists(ruta) or os.path.getsize(ruta) == 0
+                if not nuevo:
+                    # Con el cerrojo nadie está a media fila: si falta el salto final
+                    # (archivo editado a mano) se pone para no pegar las filas
+                    with open(ruta, "rb") as f:
+                        f.seek(-1, os.SEEK_END)
+                        cabecera = "" if f.read(1) == b"\n" else "\n"
+                with open(ruta, "a", encoding=encoding, newline="") as f:
+                    f.write(cabecera + "".join(lineas))
+                    f.flush()
+                    os.fsync(f.fileno())
+                hechas.update(posiciones)
+        finally:
+            for i in sorted(hechas):
+                if lote[i][-1] is not None:
+                    lote[i][-1]()
+
+persistencia = ColaPersistencia()
+atexit.register(persistencia.vaciar)
+
+def lineas_csv(campos, filas, cabecera=False):
+    """Texto CSV de filas, con los mismos saltos de línea que DictWriter; con cabecera si se pide."""
+    salida = io.StringIO()
+    writer = csv.DictWriter(salida, fieldnames=campos)
+    if cabecera:
+        writer.writeheader()
+    for fila in filas:
+        writer.writerow(fila)
+    return salida.getvalue()
+
+# ---------------------------------
+# 4. Lectura/Escritura de Jugadores
+# ---------------------------------
+JUGADORES_POR_DEFECTO = ["Ibai", "Xabi", "Ian", "Aitor", "Cifu", "David",
+                         "Igarki", "Aimar", "Erli", "Maria", "Dani", "AnderM",
+                         "Abad", "Sanchez"]
+
+def internar_jugador(nombre, activo=True):
+    """
+    Devuelve el id del jugador con ese nombre, creándolo si no existe.
+    """
+    pid = id_por_nombre.get(nombre)
+    if pid is None:
+        pid = len(nombre_por_id)
+        nombre_por_id.append(nombre)
+        activo_por_id.append(activo)
+        id_por_nombre[nombre] = pid
+        jugadores_modificados.add(pid)
+    return pid
+
+def nombre_jugador(pid):
+    if pid is None:
+        return ""
+    return nombre_por_id[pid]
+
+def ids_activos():
+    return [pid for pid, activo in enumerate(activo_por_id) if activo]
+
+def ids_activos_ordenados():
+    """Ids activos ordenados por nombre (el orden que ve el usuario)."""
+    return sorted(ids_activos(), key=lambda pid: nombre_por_id[pid].lower())
+
+def nombre_valido(nombre):
+    # Los nombres puramente numéricos se confundirían con ids en los CSV
+    return bool(nombre) and not nombre.isdigit()
+
+def refrescar_lista_jugadores():
+    # Se modifica en sitio para que las referencias existentes sigan valiendo
+    jugadores[:] = [nombre_por_id[pid] for pid in ids_activos_ordenados()]
+
+def renombrar_jugador(pid, nuevo_nombre):
+    """
+    Cambia el nombre visible de un jugador. Los partidos guardan ids,
+    así que no hay que reescribir el historial.
+    """
+    antiguo = nombre_por_id[pid]
+    del id_por_nombre[antiguo]
+    nombre_por_id[pid] = nuevo_nombre
+    id_por_nombre[nuevo_nombre] = pid
+    jugadores_modificados.add(pid)
+    refrescar_lista_jugadores()
+    publicar_cambio("jugadores", jugadores=[pid])
+
+def eliminar_jugador(pid):
+    activo_por_id[pid] = False
+    jugadores_modificados.add(pid)
+    refrescar_lista_jugadores()
+    publicar_cambio("jugadores", jugadores=[pid])
+
+def _leer_entradas_jugadores(ruta):
+    """
+    Entradas {"id", "nombre", "activo"} de jugadores.json, una por id y en
+    orden (los huecos de la numeración son jugadores inactivos). None si no existe.
+    """
+    if not os.path.exists(ruta):
+        return None
+    try:
+        with open(ruta, "r", encoding="utf-8") as f:
+            datos = json.load(f)
+    except Exception as e:
+        print("Error al leer jugadores:", e)
+        datos = []
+    if datos and not isinstance(datos[0], str):
+        datos = sorted(datos, key=lambda e: int(e["id"]))
+    entradas = []
+    vistos = set()
+    for entrada in datos:
+        if isinstance(entrada, str):
+            # Formato antiguo: lista de nombres, el id es la posición
+            if entrada not in vistos:
+                vistos.add(entrada)
+                entradas.append({"id": len(entradas), "nombre": entrada, "activo": True})
+            continue
+        pid = int(entrada["id"])
+        if pid < len(entradas):
+            continue
+        while len(entradas) < pid:
+            entradas.append({"id": len(entradas), "nombre": f"#{len(entradas)}", "activo": False})
+        entradas.append({"id": pid, "nombre": entrada["nombre"], "activo": entrada.get("activo", True)})
+    return entradas
+
+def _entradas_jugadores():
+    return [{"id": pid, "nombre": nombre, "activo": activo_por_id[pid]}
+            for pid, nombre in enumerate(nombre_por_id)]
+
+def leer_jugadores():
+    nombre_por_id.clear()
+    activo_por_id.clear()
+    id_por_nombre.clear()
+    jugadores_modificados.clear()
+    entradas = _leer_entradas_jugadores(resource_path("jugadores.json"))
+    if entradas is None:
+        entradas = [{"id": pid, "nombre": nombre, "activo": True}
+                    for pid, nombre in enumerate(JUGADORES_POR_DEFECTO)]
+    for entrada in entradas:
+        nombre_por_id.append(entrada["nombre"])
+        activo_por_id.append(entrada["activo"])
+        id_por_nombre[entrada["nombre"]] = entrada["id"]
+    refrescar_lista_jugadores()
+    estado_seguimiento["mtime_jugadores"] = _mtime_jugadores()
 
 def guardar_jugadores():
+    """
+    Encola jugadores.json entero. Se escribe sobre lo que haya en el archivo
+    en ese momento cambiando solo los jugadores que hemos tocado desde la
+    última escritura, así no se pisa lo que otra instancia haya cambiado.
+    """
+    archivo_jugadores = resource_path("jugadores.json")
+    datos = _entradas_jugadores()
+    tocados = sorted(jugadores_modificados)
+    jugadores_modificados.clear()
+    ajenos = []
+
+    def contenido():
+        mezcla = _leer_entradas_jugadores(archivo_jugadores)
+        if mezcla is None:
+            mezcla = datos
+        for pid in tocados:
+            while len(mezcla) <= pid:
+                mezcla.append(datos[len(mezcla)])
+            mezcla[pid] = datos[pid]
+        ajenos.append(mezcla != datos)
+        return json.dumps(mezcla, ensure_ascii=False, indent=4)
+
+    def recordar_mtime():
+        # Si han entrado cambios de otros, el seguimiento releerá los jugadores
+        estado_seguimiento["mtime_jugadores"] = None if any(ajenos) else _mtime_jugadores()
+
+    persistencia.reemplazar(archivo_jugadores, contenido, al_terminar=recordar_mtime)
+
+def alta_jugador(nombre):
+    """
+    Da de alta (o reactiva) un jugador y lo guarda en el momento. El id se
+    decide con el cerrojo de jugadores.json tomado y sobre el archivo recién
+    leído, así que dos instancias no pueden dar el mismo a jugadores distintos.
+    """
     archivo_jugadores = resource_path("jugadores.json")
-    with open(archivo_jugadores, "w", encoding="utf-8") as f:
-        json.dump(jugadores, f, ensure_ascii=False, indent=4)
+    persistencia.vaciar()
+    with bloqueo_archivos([archivo_jugadores]):
+        n_ids = len(nombre_por_id)
+        leer_jugadores()
+        while len(nombre_por_id) < n_ids:
+            internar_jugador(f"#{len(nombre_por_id)}", activo=False)
+        pid = internar_jugador(nombre)
+        activo_por_id[pid] = True
+        refrescar_lista_jugadores()
+        ColaPersistencia._escribir_atomico(archivo_jugadores,
+                                           json.dumps(_entradas_jugadores(), ensure_ascii=False, indent=4), "utf-8")
+        jugadores_modificados.clear()
+        estado_seguimiento["mtime_jugadores"] = _mtime_jugadores()
+    # Al releer el archivo pueden haber llegado cambios de otros jugadores
+    publicar_cambio("jugadores")
+    return pid
 
 # ---------------------------------
 # 5. Lectura/Escritura de Resultados
 # ---------------------------------
+CAMPOS_RESULTADOS = [
+    "equipo1_jugador1", "equipo1_jugador2",
+    "equipo2_jugador1", "equipo2_jugador2",
+    "ganador_primer_set_jugador1", "ganador_primer_set_jugador2",
+    "ganador_partido_jugador1", "ganador_partido_jugador2",
+    "mvp", "puntuaciones", "tie_breaks", "lugar", "fecha", "season"
+]
+
+def resolver_jugador(valor):
+    """
+    Convierte una celda de jugador en su id. Los CSV nuevos guardan ids;
+    los antiguos guardaban nombres, que se internan al vuelo (como
+    inactivos si ya no están en jugadores.json).
+    Devuelve (id, era_nombre).
+    """
+    valor = valor.strip()
+    if not valor:
+        return None, False
+    if valor.isdigit():
+        pid = int(valor)
+        while len(nombre_por_id) <= pid:
+            internar_jugador(f"#{len(nombre_por_id)}", activo=False)
+        return pid, False
+    return internar_jugador(valor, activo=False), True
+
+def parsear_fila_resultado(row):
+    """
+    Convierte una fila del CSV (dict) en un resultado. Devuelve
+    (resultado, hay_nombres); lanza excepción si la fila es ilegible.
+    """
+    hay_nombres = False
+    celdas = {}
+    for campo in CAMPOS_RESULTADOS[:9]:
+        celdas[campo], era_nombre = resolver_jugador(row.get(campo) or "")
+        hay_nombres = hay_nombres or era_nombre
+    puntuaciones = row.get("puntuaciones", "").split(';') if row.get("puntuaciones") else []
+    fecha_str = row.get("fecha", "").strip()
+    # Una season explícita en el CSV manda si existe en el calendario
+    season = id_season_por_nombre.get((row.get("season") or "").strip())
+    if season is None:
+        season = obtener_season(fecha_str)
+    resultado = {
+        "partido": ((celdas["equipo1_jugador1"], celdas["equipo1_jugador2"]),
+                    (celdas["equipo2_jugador1"], celdas["equipo2_jugador2"])),
+        "ganador_primer_set": (celdas["ganador_primer_set_jugador1"],
+                               celdas["ganador_primer_set_jugador2"]),
+        "ganador_partido": (celdas["ganador_partido_jugador1"],
+                            celdas["ganador_partido_jugador2"]),
+        "mvp": celdas["mvp"],
+        "puntuaciones": puntuaciones,
+        "tie_breaks": int(row["tie_breaks"]) if row.get("tie_breaks") else 0,
+        "lugar": row.get("lugar", "").strip(),
+        "fecha": fecha_str,
+        "season": season
+    }
+    return resultado, hay_nombres
+
+# ---------------------------------
+# NUEVO: Lectura por trozos de resultados.csv
+# ---------------------------------
+# El CSV se lee por trozos de FILAS_POR_TROZO partidos, sin tener nunca el
+# archivo entero en memoria. Con pyarrow instalado se usa su lector de CSV
+# por bloques y las columnas se convierten de golpe; sin él (o si un trozo
+# trae nombres en vez de ids) cada fila pasa por parsear_fila_resultado.
+# Las filas ilegibles no se imprimen: se devuelven como RechazoFila con su
+# número de línea en el archivo (la cabecera es la línea 1). archivo es el
+# shard en CSV del que viene, o None si es de resultados.csv.
+FILAS_POR_TROZO = 50000
+RechazoFila = namedtuple("RechazoFila", ["linea", "motivo", "archivo"], defaults=(None,))
+rechazos_resultados = []     # Rechazos de la última lectura de resultados.csv (y sus shards en CSV)
+
+def _comprobar_columnas(row):
+    """Una fila con más o menos columnas que la cabecera no se puede leer con seguridad."""
+    esperadas = len(row) - (None in row)
+    if None in row:
+        raise ValueError(f"se esperaban {esperadas} columnas y hay {esperadas + len(row[None])}")
+    vacias = sum(valor is None for valor in row.values())
+    if vacias:
+        raise ValueError(f"se esperaban {esperadas} columnas y hay {esperadas - vacias}")
+
+def _trozos_csv(file, tam, rechazos, filas_por_trozo):
+    """Lectura con el módulo csv, por trozos de líneas completas."""
+    cabecera = file.readline()
+    campos = next(csv.reader([cabecera.decode("utf-8-sig")]), [])
+    cabecera_resultados[:] = campos or CAMPOS_RESULTADOS
+    leido = len(cabecera)
+    linea = 1
+    trozo = []
+    hay_nombres = False
+    while leido < tam:
+        # Hasta 1 MB y el resto de su última línea, sin pasar nunca de tam
+        bloque = file.read(min(1 << 20, tam - leido))
+        if not bloque:
+            break
+        if not bloque.endswith(b"\n") and leido + len(bloque) < tam:
+            bloque += file.readline(tam - leido - len(bloque))
+        leido += len(bloque)
+        texto = bloque.decode("utf-8")
+        for row in csv.DictReader(io.StringIO(texto, newline=""), fieldnames=campos):
+            linea += 1
+            try:
+                _comprobar_columnas(row)
+                resultado, era_nombre = parsear_fila_resultado(row)
+            except Exception as e:
+                rechazos.append(RechazoFila(linea, str(e)))
+                continue
+            hay_nombres = hay_nombres or era_nombre
+            trozo.append(resultado)
+            if len(trozo) >= filas_por_trozo:
+                yield trozo, hay_nombres
+                trozo = []
+    if trozo:
+        yield trozo, hay_nombres
+
+def _trozos_pyarrow(ruta, tam, rechazos, filas_por_trozo):
+    """Lectura con pyarrow: el archivo se mapea en memoria y se convierte por columnas."""
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.csv as pacsv
+
+    with open(ruta, mode="rb") as file:
+        cabecera = file.readline()
+    campos = next(csv.reader([cabecera.decode("utf-8-sig")]), [])
+    cabecera_resultados[:] = campos or CAMPOS_RESULTADOS
+    if not campos or len(cabecera) >= tam:
+        return
+    saltadas = []   # Líneas descartadas por pyarrow (en orden)
+
+    def fila_invalida(fila):
+        saltadas.append(fila.number)
+        rechazos.append(RechazoFila(fila.number, f"se esperaban {fila.expected_columns} columnas "
+                                                 f"y hay {fila.actual_columns}"))
+        return "skip"
+
+    def linea_de(fila):
+        """Línea del archivo de la fila válida número fila (desde 0)."""
+        linea = fila + 2
+        while True:
+            siguiente = fila + 2 + bisect_right(saltadas, linea)
+            if siguiente == linea:
+                return linea
+            linea = siguiente
+
+    vacio = pa.scalar(None, pa.string())
+    cache_seasons = {}
+    leidas = 0
+    with pa.memory_map(ruta) as mapa:
+        lector = pacsv.open_csv(
+            pa.BufferReader(mapa.read_buffer(tam)),
+            read_options=pacsv.ReadOptions(skip_rows=1, column_names=campos, use_threads=False,
+                                           block_size=1 << 22),
+            parse_options=pacsv.ParseOptions(invalid_row_handler=fila_invalida),
+            convert_options=pacsv.ConvertOptions(column_types={c: pa.string() for c in campos},
+                                                 strings_can_be_null=False))
+        for lote in lector:
+            for inicio in range(0, lote.num_rows, filas_por_trozo):
+                parte = lote.slice(inicio, filas_por_trozo)
+                columnas = dict(zip(parte.schema.names, parte.columns))
+                if any(c not in columnas for c in CAMPOS_RESULTADOS):
+                    columnas = None
+                else:
+                    jugadores = [pc.utf8_trim_whitespace(columnas[c]) for c in CAMPOS_RESULTADOS[:9]]
+                    if not all(pc.all(pc.match_substring_regex(col, r"^[0-9]*$")).as_py() for col in jugadores):
+                        columnas = None
+                if columnas is None:
+                    # Nombres (formato antiguo) o columnas que faltan: fila a fila
+                    trozo, hay_nombres = [], False
+                    for k, row in enumerate(parte.to_pylist()):
+                        try:
+                            resultado, era_nombre = parsear_fila_resultado(row)
+                        except Exception as e:
+                            rechazos.append(RechazoFila(linea_de(leidas + k), str(e)))
+                            continue
+                        hay_nombres = hay_nombres or era_nombre
+                        trozo.append(resultado)
+                    leidas += parte.num_rows
+                    yield trozo, hay_nombres
+                    continue
+
+                ids = [pc.cast(pc.if_else(pc.equal(col, ""), vacio, col), pa.int64()) for col in jugadores]
+                max_id = max((pc.max(col).as_py() or 0) for col in ids)
+                while len(nombre_por_id) <= max_id:
+                    internar_jugador(f"#{len(nombre_por_id)}", activo=False)
+                ids = [col.to_pylist() for col in ids]
+                # tie_breaks como int(): vacío = 0, y si no es un entero la fila se rechaza
+                tie_breaks = columnas["tie_breaks"]
+                malos = pc.invert(pc.or_(pc.equal(tie_breaks, ""),
+                                         pc.match_substring_regex(tie_breaks, r"^\s*[+-]?[0-9]+\s*$")))
+                rechazadas = set()
+                if pc.any(malos).as_py():
+                    for k in pc.indices_nonzero(malos).to_pylist():
+                        valor = tie_breaks[k].as_py()
+                        rechazadas.add(k)
+                        rechazos.append(RechazoFila(linea_de(leidas + k),
+                                                    f"invalid literal for int() with base 10: {valor!r}"))
+                    tie_breaks = pc.if_else(malos, "0", tie_breaks)
+                tie_breaks = pc.cast(pc.if_else(pc.equal(tie_breaks, ""), "0", pc.utf8_trim_whitespace(tie_breaks)),
+                                     pa.int64()).to_pylist()
+                fechas = pc.utf8_trim_whitespace(columnas["fecha"]).to_pylist()
+                lugares = pc.utf8_trim_whitespace(columnas["lugar"]).to_pylist()
+                puntuaciones = columnas["puntuaciones"].to_pylist()
+                nombres_season = pc.utf8_trim_whitespace(columnas["season"]).to_pylist()
+                trozo = []
+                for k, (e11, e12, e21, e22, s1, s2, g1, g2, mvp, tb, fecha, lugar, punt, nombre) in enumerate(
+                        zip(*ids, tie_breaks, fechas, lugares, puntuaciones, nombres_season)):
+                    if rechazadas and k in rechazadas:
+                        continue
+                    # Una season explícita en el CSV manda si existe en el calendario
+                    season = id_season_por_nombre.get(nombre)
+                    if season is None:
+                        season = cache_seasons.get(fecha)
+                        if season is None:
+                            season = cache_seasons[fecha] = obtener_season(fecha)
+                    trozo.append({
+                        "partido": ((e11, e12), (e21, e22)),
+                        "ganador_primer_set": (s1, s2),
+                        "ganador_partido": (g1, g2),
+                        "mvp": mvp,
+                        "puntuaciones": punt.split(';') if punt else [],
+                        "tie_breaks": tb,
+                        "lugar": lugar,
+                        "fecha": fecha,
+                        "season": season
+                    })
+                leidas += parte.num_rows
+                yield trozo, False
+
+@contextmanager
+def recolector_en_pausa(congelar=False):
+    """
+    Para crear de golpe muchos objetos sin ciclos (partidos, filas): el
+    recolector de basura solo recorrería una y otra vez los ya creados.
+    Con congelar=True (cargas completas) lo creado queda además fuera de las
+    próximas pasadas; en una recarga se descongela antes lo de la anterior
+    para que sus restos se puedan recoger.
+    """
+    recolector_activo = gc.isenabled()
+    if congelar and gc.get_freeze_count():
+        gc.unfreeze()
+        gc.collect()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if congelar:
+            gc.freeze()
+        if recolector_activo:
+            gc.enable()
+
+def texto_rechazos(rechazos, maximo=10):
+    archivos = sorted({r.archivo or "resultados.csv" for r in rechazos})
+    lineas = [f"Hay {len(rechazos)} filas de {', '.join(archivos)} que no se han podido leer "
+              f"({'el archivo' if len(archivos) == 1 else 'los archivos'} no se modificará"
+              f"{'' if len(archivos) == 1 else 'n'} hasta corregirlas):"]
+    for rechazo in rechazos[:maximo]:
+        donde = f"{rechazo.archivo}, línea" if rechazo.archivo else "línea"
+        lineas.append(f"  {donde} {rechazo.linea}: {rechazo.motivo}")
+    if len(rechazos) > maximo:
+        lineas.append(f"  ... y {len(rechazos) - maximo} más")
+    return "\n".join(lineas)
+
+def leer_trozos_resultados(ruta, rechazos, tam=None, filas_por_trozo=FILAS_POR_TROZO, rapido=None):
+    """
+    Genera los partidos de los primeros tam bytes de un CSV de resultados
+    en trozos (lista_de_partidos, hay_nombres). Las filas ilegibles se
+    añaden a rechazos. rapido=None usa pyarrow si está instalado.
+    """
+    if tam is None:
+        tam = os.path.getsize(ruta)
+    if rapido is None:
+        rapido = importlib.util.find_spec("pyarrow") is not None
+    if rapido:
+        yield from _trozos_pyarrow(ruta, tam, rechazos, filas_por_trozo)
+    else:
+        with open(ruta, mode="rb") as file:
+            yield from _trozos_csv(file, tam, rechazos, filas_por_trozo)
+
+def _tam_lineas_completas(ruta):
+    """
+    Tamaño de ruta hasta su último salto de línea: una fila que otra
+    instancia esté añadiendo no se lee a medias (llegará por el seguimiento).
+    """
+    with open(ruta, mode="rb") as file:
+        fin = os.fstat(file.fileno()).st_size
+        while fin > 0:
+            inicio = max(fin - 4096, 0)
+            file.seek(inicio)
+            salto = file.read(fin - inicio).rfind(b"\n")
+            if salto >= 0:
+                return inicio + salto + 1
+            fin = inicio
+    return 0
+
 def leer_resultados():
+    """
+    Carga resultados.csv (y registra los shards de seasons archivadas).
+    Devuelve la lista de filas rechazadas (también en rechazos_resultados).
+    """
     global resultados
     resultados.clear()
+    rechazos_resultados.clear()
     archivo_resultados = resource_path("resultados.csv")
+    n_jugadores_antes = len(nombre_por_id)
+    leer_manifiesto_seasons()
+    hay_nombres = False
+    tam = 0
+    # Antes de leer: si otra instancia reescribe el archivo mientras tanto, se notará
+    generacion = _generacion_resultados()
+    cabecera_resultados[:] = CAMPOS_RESULTADOS
     if os.path.exists(archivo_resultados):
-        with open(archivo_resultados, mode='r', newline='', encoding='utf-8-sig') as file:
-            reader = csv.DictReader(file)
-            for row in reader:
-                try:
-                    eq1j1 = row.get("equipo1_jugador1", "").strip()
-                    eq1j2 = row.get("equipo1_jugador2", "").strip()
-                    eq2j1 = row.get("equipo2_jugador1", "").strip()
-                    eq2j2 = row.get("equipo2_jugador2", "").strip()
-                    g1s1 = row.get("ganador_primer_set_jugador1", "").strip()
-                    g1s2 = row.get("ganador_primer_set_jugador2", "").strip()
-                    gpart1 = row.get("ganador_partido_jugador1", "").strip()
-                    gpart2 = row.get("ganador_partido_jugador2", "").strip()
-                    puntuaciones = row.get("puntuaciones", "").split(';') if row.get("puntuaciones") else []
-                    fecha_str = row.get("fecha", "").strip()
-                    season = row.get("season") or obtener_season(fecha_str)
-                    resultado = {
-                        "partido": ((eq1j1, eq1j2), (eq2j1, eq2j2)),
-                        "ganador_primer_set": (g1s1, g1s2),
-                        "ganador_partido": (gpart1, gpart2),
-                        "mvp": row.get("mvp", "").strip(),
-                        "puntuaciones": puntuaciones,
-                        "tie_breaks": int(row["tie_breaks"]) if row.get("tie_breaks") else 0,
-                        "lugar": row.get("lugar", "").strip(),
-                        "fecha": fecha_str,
-                        "season": season
-                    }
-                    resultados.append(resultado)
-                except Exception as e:
-                    print(f"Error procesando fila: {row}, Error: {e}")
+        # Se fija el tamaño antes de leer para saber exactamente hasta qué byte se ha leído
+        tam = _tam_lineas_completas(archivo_resultados)
+        with recolector_en_pausa(congelar=True):
+            for trozo, era_nombre in leer_trozos_resultados(archivo_resultados, rechazos_resultados, tam):
+                resultados.vivos.extend(trozo)
+                hay_nombres = hay_nombres or era_nombre
+    rechazos_resultados.sort(key=lambda r: (r.archivo or "", r.linea))
+    hay_errores = bool(rechazos_resultados)
+    # Si hay filas ilegibles se deja el archivo como está para no perderlas
+    archivadas = not hay_errores and archivar_seasons_cerradas()
+    if len(nombre_por_id) != n_jugadores_antes:
+        # Jugadores que solo aparecían en el historial (eliminados)
+        guardar_jugadores()
+    marcar_datos_modificados()
+    # La reescritura parte de lo leído para conservar lo que otros añadan entretanto
+    _marcar_leido_archivo(archivo_resultados, tam, generacion)
+    if (hay_nombres or archivadas) and not hay_errores:
+        # Migración única del formato antiguo (nombres) al nuevo (ids), o
+        # quitar los partidos que acaban de pasar a su shard
+        reescribir_resultados_csv()
+    return rechazos_resultados
+
+def fila_csv_resultado(resultado):
+    def celda(pid):
+        return "" if pid is None else pid
+    return {
+        "equipo1_jugador1": celda(resultado["partido"][0][0]),
+        "equipo1_jugador2": celda(resultado["partido"][0][1]),
+        "equipo2_jugador1": celda(resultado["partido"][1][0]),
+        "equipo2_jugador2": celda(resultado["partido"][1][1]),
+        "ganador_primer_set_jugador1": celda(resultado["ganador_primer_set"][0]),
+        "ganador_primer_set_jugador2": celda(resultado["ganador_primer_set"][1]),
+        "ganador_partido_jugador1": celda(resultado["ganador_partido"][0]),
+        "ganador_partido_jugador2": celda(resultado["ganador_partido"][1]),
+        "mvp": celda(resultado["mvp"]),
+        "puntuaciones": ';'.join(resultado["puntuaciones"]),
+        "tie_breaks": resultado["tie_breaks"],
+        "lugar": resultado["lugar"],
+        "fecha": resultado["fecha"],
+        "season": nombre_season(resultado["season"])
+    }
 
 def guardar_resultado_csv(resultado):
-    archivo_resultados = resource_path("resultados.csv")
-    file_exists = os.path.exists(archivo_resultados)
-    fieldnames = [
-        "equipo1_jugador1", "equipo1_jugador2",
-        "equipo2_jugador1", "equipo2_jugador2",
-        "ganador_primer_set_jugador1", "ganador_primer_set_jugador2",
-        "ganador_partido_jugador1", "ganador_partido_jugador2",
-        "mvp", "puntuaciones", "tie_breaks", "lugar", "fecha", "season"
-    ]
-    with open(archivo_resultados, mode='a', newline='', encoding='utf-8-sig') as file:
-        writer = csv.DictWriter(file, fieldnames=fieldnames)
-        if not file_exists:
-            writer.writeheader()
-        writer.writerow({
-            "equipo1_jugador1": resultado["partido"][0][0],
-            "equipo1_jugador2": resultado["partido"][0][1],
-            "equipo2_jugador1": resultado["partido"][1][0],
-            "equipo2_jugador2": resultado["partido"][1][1],
-            "ganador_primer_set_jugador1": resultado["ganador_primer_set"][0],
-            "ganador_primer_set_jugador2": resultado["ganador_primer_set"][1],
-            "ganador_partido_jugador1": resultado["ganador_partido"][0],
-            "ganador_partido_jugador2": resultado["ganador_partido"][1],
-            "mvp": resultado["mvp"],
-            "puntuaciones": ';'.join(resultado["puntuaciones"]),
-            "tie_breaks": resultado["tie_breaks"],
-            "lugar": resultado["lugar"],
-            "fecha": resultado["fecha"],
-            "season": resultado["season"]
+    """Encola la fila del partido al final de resultados.csv."""
+    linea = lineas_csv(CAMPOS_RESULTADOS, [fila_csv_resultado(resultado)])
+    # El seguimiento reconocerá la fila como nuestra cuando aparezca en el archivo
+    filas_propias[linea.encode("utf-8").rstrip(b"\r\n")] += 1
+    persistencia.anexar(resource_path("resultados.csv"), [linea],
+                        cabecera=lineas_csv(CAMPOS_RESULTADOS, [], cabecera=True))
+
+def _filas_ajenas(ruta, base, propias):
+    """
+    Filas (bytes) que otras instancias han añadido a ruta después de base,
+    el estado de seguimiento con el que lo leímos, quitando las nuestras
+    (propias). None si desde entonces alguien lo ha reescrito.
+    """
+    if not os.path.exists(ruta):
+        return b""
+    with open(ruta, mode="rb") as file:
+        tam = os.fstat(file.fileno()).st_size
+        if _archivo_reescrito(file, tam, base):
+            return None
+        file.seek(base["offset"])
+        nuevas = file.read(tam - base["offset"])
+    lineas = nuevas.split(b"\n")
+    if lineas[-1] == b"":
+        lineas.pop()
+    if base["offset"] == 0 and lineas:
+        # No habíamos leído ni la cabecera
+        lineas.pop(0)
+    ajenas = []
+    for linea in lineas:
+        clave = linea.rstrip(b"\r")
+        if propias[clave] > 0:
+            propias[clave] -= 1
+            continue
+        ajenas.append(linea + b"\n")
+    return b"".join(ajenas)
+
+def reescribir_resultados_csv():
+    """
+    Reescribe resultados.csv completo (con ids). Se escribe en un temporal
+    que sustituye al original de golpe para no dejar nunca un archivo a medias.
+    Es optimista: con el cerrojo tomado se comprueba que el archivo sigue
+    siendo el que leímos; las filas que otras instancias hayan añadido
+    mientras tanto se conservan al final (y el seguimiento las incorpora),
+    y si otra lo ha reescrito no se pisa su versión y se anota el conflicto.
+    """
+    # El texto se genera en el hilo de escritura, desde una copia de la lista
+    # (los partidos no se modifican, se sustituyen)
+    vivos = list(resultados.vivos)
+    propias = Counter(filas_propias)
+    ruta = resource_path("resultados.csv")
+    escrito = []
+
+    def contenido():
+        # Lo leído (o lo que dejó nuestra reescritura anterior): el seguimiento
+        # no lo toca mientras esto esté pendiente
+        ajenas = _filas_ajenas(ruta, dict(estado_seguimiento), propias)
+        if ajenas is None:
+            conflictos_escritura.append(
+                "Otro equipo ha reescrito resultados.csv a la vez (editando o borrando partidos). "
+                "Se ha cargado su versión: comprueba tu último cambio y repítelo si no está.")
+            return None
+        texto = lineas_csv(CAMPOS_RESULTADOS, (fila_csv_resultado(r) for r in vivos), cabecera=True)
+        texto = texto.encode("utf-8-sig")
+        _marcar_leido_hasta(texto)
+        escrito.append(True)
+        return texto + ajenas
+
+    def subir_generacion():
+        # Después de sustituir el archivo y aún con el cerrojo: quien lea la
+        # generación vieja con el archivo nuevo solo hará una recarga de más
+        if escrito:
+            generacion = estado_seguimiento["generacion"] + 1
+            ColaPersistencia._escribir_atomico(_ruta_generacion(), str(generacion), "utf-8")
+            estado_seguimiento["generacion"] = generacion
+
+    persistencia.reemplazar(ruta, contenido, al_terminar=subir_generacion)
+    cabecera_resultados[:] = CAMPOS_RESULTADOS
+    filas_propias.clear()
+
+# ---------------------------------
+# NUEVO: Seasons cerradas en shards
+# ---------------------------------
+# Al arrancar, los partidos de seasons ya cerradas salen de resultados.csv
+# y pasan a seasons/season_<nombre>.bin (archivo comprimido por bloques,
+# ver más abajo), ordenados por fecha. El manifiesto
+# guarda de cada shard su season, filas, tamaño, hash y último día, que es
+# todo lo que hace falta para numerar los partidos y validar checkpoints
+# sin leerlo.
+CARPETA_SEASONS = "seasons"
+
+def _ruta_seasons(archivo):
+    return resource_path(os.path.join(CARPETA_SEASONS, archivo))
+
+def leer_manifiesto_seasons():
+    """Registra en resultados los shards del manifiesto, sin leerlos."""
+    archivo = _ruta_seasons("manifiesto.json")
+    if not os.path.exists(archivo):
+        return
+    try:
+        with open(archivo, "r", encoding="utf-8") as f:
+            entradas = json.load(f)["seasons"]
+    except Exception as e:
+        print("Error al leer el manifiesto de seasons:", e)
+        return
+    for entrada in entradas:
+        tramo = dict(entrada, season=id_season_por_nombre.get(entrada["season"]),
+                     nombre=entrada["season"], ruta=_ruta_seasons(entrada["archivo"]), partidos=None)
+        if not os.path.exists(tramo["ruta"]):
+            print(f"Falta el shard {tramo['ruta']}")
+            continue
+        if tramo["season"] is None or os.path.getsize(tramo["ruta"]) != tramo["bytes"]:
+            # Season que ya no está en el calendario o shard tocado a mano:
+            # se lee ya para saber cuántos partidos tiene de verdad
+            resultados.cargar(tramo)
+            tramo["filas"] = len(tramo["partidos"])
+        resultados.agregar_archivada(tramo)
+
+def leer_shard(tramo):
+    """Partidos de un shard (y actualiza su hash si no coincide con el manifiesto)."""
+    with open(tramo["ruta"], mode="rb") as file:
+        datos = file.read()
+    huella = hashlib.sha256(datos).hexdigest()
+    if huella != tramo["sha256"]:
+        print(f"Aviso: {tramo['ruta']} no coincide con el manifiesto")
+        tramo.update(sha256=huella, bytes=len(datos))
+    n_jugadores_antes = len(nombre_por_id)
+    partidos = []
+    if tramo["archivo"].endswith(".csv"):
+        # Shard en CSV (de antes del archivo por bloques). Sus filas ilegibles
+        # van al informe como las de resultados.csv (una vez por lectura de los datos)
+        rechazos = []
+        for linea, row in enumerate(csv.DictReader(io.StringIO(datos.decode("utf-8-sig"), newline="")), 2):
+            try:
+                _comprobar_columnas(row)
+                partidos.append(parsear_fila_resultado(row)[0])
+            except Exception as e:
+                rechazos.append(RechazoFila(linea, str(e), tramo["archivo"]))
+        if "rechazos" not in tramo:
+            tramo["rechazos"] = len(rechazos)
+            rechazos_resultados.extend(rechazos)
+    else:
+        for bloque in iterar_bloques(io.BytesIO(datos)):
+            partidos.extend(bloque)
+    if partidos:
+        tramo["ultima_fecha"] = partidos[-1]["fecha"]
+    if len(nombre_por_id) != n_jugadores_antes:
+        guardar_jugadores()
+    return partidos
+
+def _guardar_manifiesto_seasons():
+    entradas = [{"season": t["nombre"], "archivo": t["archivo"], "filas": t["filas"],
+                 "bytes": t["bytes"], "sha256": t["sha256"], "ultima_fecha": t["ultima_fecha"]}
+                for t in resultados.archivadas]
+    persistencia.reemplazar(_ruta_seasons("manifiesto.json"),
+                            json.dumps({"seasons": entradas}, ensure_ascii=False, indent=1))
+
+def archivar_seasons_cerradas():
+    """
+    Pasa a su shard los partidos de resultados.csv de seasons ya cerradas
+    (uniéndolos a los que ya tuviera). Devuelve True si ha movido alguno;
+    entonces los ids de los partidos cambian y resultados.csv hay que reescribirlo.
+    """
+    cerradas = {season for season in {p["season"] for p in resultados.vivos} if season_cerrada(season)}
+    sin_season = [t for t in resultados.archivadas if t["season"] is None]
+    por_season = {t["season"]: t for t in resultados.archivadas if t["season"] is not None}
+    # Los shards que aún están en CSV se pasan al archivo por bloques; si
+    # tienen filas ilegibles se dejan (con su season sin archivar) para no perderlas
+    en_csv = {s for s, t in por_season.items() if t["archivo"].endswith(".csv")}
+    for season in en_csv:
+        resultados.cargar(por_season[season])
+    con_rechazos = {season for season in en_csv if por_season[season]["rechazos"]}
+    en_csv -= con_rechazos
+    cerradas -= con_rechazos
+    if not cerradas and not en_csv:
+        return False
+    os.makedirs(resource_path(CARPETA_SEASONS), exist_ok=True)
+    for season in cerradas | en_csv:
+        anteriores = resultados.cargar(por_season[season]) if season in por_season else []
+        partidos = sorted(anteriores + [p for p in resultados.vivos if p["season"] == season],
+                          key=lambda p: p["fecha"])
+        nombre = nombre_season(season)
+        datos = codificar_archivo(nombre, partidos)
+        archivo = "season_" + "".join(c if c.isalnum() or c in "-_" else "_" for c in nombre) + ".bin"
+        persistencia.reemplazar(_ruta_seasons(archivo), datos)
+        if season in en_csv:
+            persistencia.borrar(por_season[season]["ruta"])
+        por_season[season] = {"season": season, "nombre": nombre, "archivo": archivo,
+                              "ruta": _ruta_seasons(archivo), "filas": len(partidos),
+                              "bytes": len(datos), "sha256": hashlib.sha256(datos).hexdigest(),
+                              "ultima_fecha": partidos[-1]["fecha"], "partidos": partidos}
+    vivos = [p for p in resultados.vivos if p["season"] not in cerradas]
+    resultados.clear()
+    for tramo in sin_season + [por_season[s] for s in sorted(por_season)]:
+        resultados.agregar_archivada(tramo)
+    resultados.vivos = vivos
+    _guardar_manifiesto_seasons()
+    return bool(cerradas)
+
+# ---------------------------------
+# NUEVO: Archivo comprimido por bloques
+# ---------------------------------
+# Formato de los shards de seasons cerradas: cabecera (MAGIA_ARCHIVO y el
+# nombre de la season) seguida de bloques de hasta PARTIDOS_POR_BLOQUE
+# partidos. Cada bloque lleva el número de partidos y su tamaño, y después
+# los registros comprimidos con zlib. Un registro es de esquema fijo: los 9
+# ids (-1 = vacío), tie_breaks y las longitudes de fecha, lugar y
+# puntuaciones, seguidos de esos tres textos en UTF-8. Se puede descomprimir
+# bloque a bloque sin tener nunca la season entera en memoria.
+MAGIA_ARCHIVO = b"PADELSEASON1\n"
+PARTIDOS_POR_BLOQUE = 512
+_REGISTRO = struct.Struct("<10i3H")
+_CABECERA_BLOQUE = struct.Struct("<II")
+
+def _codificar_bloque(partidos):
+    trozos = []
+    for p in partidos:
+        fecha = p["fecha"].encode("utf-8")
+        lugar = p["lugar"].encode("utf-8")
+        puntuaciones = ";".join(p["puntuaciones"]).encode("utf-8")
+        ids = (tuple(p["partido"][0]) + tuple(p["partido"][1]) + tuple(p["ganador_primer_set"]) +
+               tuple(p["ganador_partido"]) + (p["mvp"],))
+        trozos.append(_REGISTRO.pack(*(-1 if j is None else j for j in ids), p["tie_breaks"],
+                                     len(fecha), len(lugar), len(puntuaciones)))
+        trozos += [fecha, lugar, puntuaciones]
+    comprimido = zlib.compress(b"".join(trozos), 9)
+    return _CABECERA_BLOQUE.pack(len(partidos), len(comprimido)) + comprimido
+
+def codificar_archivo(nombre, partidos):
+    """Bytes del archivo por bloques de una season."""
+    nombre = nombre.encode("utf-8")
+    trozos = [MAGIA_ARCHIVO, struct.pack("<H", len(nombre)), nombre]
+    for i in range(0, len(partidos), PARTIDOS_POR_BLOQUE):
+        trozos.append(_codificar_bloque(partidos[i:i + PARTIDOS_POR_BLOQUE]))
+    return b"".join(trozos)
+
+def _decodificar_bloque(datos, n_partidos, season):
+    partidos = []
+    pos = 0
+    max_id = -1
+    for _ in range(n_partidos):
+        *ids, tie_breaks, n_fecha, n_lugar, n_puntuaciones = _REGISTRO.unpack_from(datos, pos)
+        pos += _REGISTRO.size
+        fecha = datos[pos:pos + n_fecha].decode("utf-8")
+        pos += n_fecha
+        lugar = datos[pos:pos + n_lugar].decode("utf-8")
+        pos += n_lugar
+        puntuaciones = datos[pos:pos + n_puntuaciones].decode("utf-8")
+        pos += n_puntuaciones
+        max_id = max(max_id, *ids)
+        j = [None if pid < 0 else pid for pid in ids]
+        partidos.append({
+            "partido": ((j[0], j[1]), (j[2], j[3])),
+            "ganador_primer_set": (j[4], j[5]),
+            "ganador_partido": (j[6], j[7]),
+            "mvp": j[8],
+            "puntuaciones": puntuaciones.split(';') if puntuaciones else [],
+            "tie_breaks": tie_breaks,
+            "lugar": lugar,
+            "fecha": fecha,
+            "season": obtener_season(fecha) if season is None else season
         })
+    # Ids que no están en jugadores.json (como en resolver_jugador)
+    while len(nombre_por_id) <= max_id:
+        internar_jugador(f"#{len(nombre_por_id)}", activo=False)
+    return partidos
+
+def iterar_bloques(file):
+    """Genera los partidos de un archivo por bloques (abierto en binario), una lista por bloque."""
+    if file.read(len(MAGIA_ARCHIVO)) != MAGIA_ARCHIVO:
+        raise ValueError("No es un archivo de season")
+    (n,) = struct.unpack("<H", file.read(2))
+    season = id_season_por_nombre.get(file.read(n).decode("utf-8"))
+    while True:
+        cabecera = file.read(_CABECERA_BLOQUE.size)
+        if not cabecera:
+            return
+        n_partidos, tam = _CABECERA_BLOQUE.unpack(cabecera)
+        yield _decodificar_bloque(zlib.decompress(file.read(tam)), n_partidos, season)
+
+def recorrer_shard(tramo):
+    """Partidos de un shard sin cargarlo entero (los CSV antiguos sí se leen enteros)."""
+    if tramo["archivo"].endswith(".csv"):
+        yield from leer_shard(tramo)
+        return
+    with open(tramo["ruta"], mode="rb") as file:
+        for bloque in iterar_bloques(file):
+            yield from bloque
+
+def informe_archivo_seasons():
+    """
+    Por cada shard: partidos, bytes en disco, bytes que ocuparía en CSV,
+    ratio de compresión y velocidad de lectura (partidos/s y MB/s
+    descomprimidos en CSV equivalente).
+    """
+    informe = []
+    for tramo in resultados.archivadas:
+        with open(tramo["ruta"], mode="rb") as file:
+            datos = file.read()
+        inicio = time.perf_counter()
+        if tramo["archivo"].endswith(".csv"):
+            partidos = leer_shard(tramo)
+        else:
+            partidos = [p for bloque in iterar_bloques(io.BytesIO(datos)) for p in bloque]
+        segundos = max(time.perf_counter() - inicio, 1e-9)
+        bytes_csv = len(lineas_csv(CAMPOS_RESULTADOS, (fila_csv_resultado(p) for p in partidos),
+                                   cabecera=True).encode("utf-8-sig"))
+        informe.append({"season": tramo["nombre"], "partidos": len(partidos),
+                        "bytes": len(datos), "bytes_csv": bytes_csv,
+                        "ratio": bytes_csv / max(len(datos), 1),
+                        "partidos_s": len(partidos) / segundos,
+                        "mb_s": bytes_csv / segundos / 1e6})
+    return informe
+
+def texto_archivo_seasons(informe):
+    lineas = [f"{'Season':<18}{'Partidos':>10}{'Bytes':>12}{'CSV':>12}{'Ratio':>8}{'Part./s':>12}{'MB/s':>8}"]
+    for f in informe:
+        lineas.append(f"{f['season']:<18}{f['partidos']:>10}{f['bytes']:>12}{f['bytes_csv']:>12}"
+                      f"{f['ratio']:>8.2f}{f['partidos_s']:>12.0f}{f['mb_s']:>8.1f}")
+    if informe:
+        total = sum(f["bytes"] for f in informe)
+        total_csv = sum(f["bytes_csv"] for f in informe)
+        lineas.append(f"Total: {total} bytes frente a {total_csv} en CSV (ratio {total_csv / max(total, 1):.2f})")
+    else:
+        lineas.append("No hay seasons archivadas.")
+    return "\n".join(lineas)
+
+# ---------------------------------
+# NUEVO: Registro binario de partidos (mmap)
+# ---------------------------------
+# registro_partidos.bin guarda todos los partidos (archivados y vivos) como
+# registros de tamaño fijo, en el mismo orden que resultados (el registro i
+# es el partido i). Se abre con mmap y NumPy lo ve como un array
+# estructurado sin copiarlo, así que el replay, las estadísticas y el tensor
+# de cruces no tienen que leer ni parsear los shards. Todas las instancias
+# lo mapean en solo lectura y comparten las mismas páginas; la que escribe
+# toma un momento su cerrojo y sube la versión de la cabecera, y las demás,
+# al ver otra versión, lo vuelven a comprobar antes de usarlo. Es una
+# caché: si no cuadra con los datos se reconstruye.
+#
+# Cabecera de TAM_CABECERA_REGISTRO bytes: MAGIA_REGISTRO, número de
+# registros (uint64), huella de los shards (sha256) y versión (uint64). Los
+# nombres de los lugares van aparte, en registro_partidos.json, y el
+# registro guarda su índice.
+MAGIA_REGISTRO = b"PDLREG01"
+TAM_CABECERA_REGISTRO = 64
+POS_VERSION_REGISTRO = 48
+ESPERA_CERROJO_REGISTRO = 1.0   # segundos; si no, esa vez se trabaja sin registro
+MAX_SETS_REGISTRO = 5
+DTYPE_REGISTRO = np.dtype([
+    ("jugadores", "<i4", (4,)),     # eq1, eq1, eq2, eq2 (-1 = vacío)
+    ("mvp", "<i4"),
+    ("dia", "<i4"),                 # ordinal de la fecha (-1 si no es válida)
+    ("season", "<i2"),
+    ("lugar", "<i2"),               # índice en la tabla de lugares
+    ("gana", "u1"),                 # 1 = equipo 1, 2 = equipo 2, 0 = ninguno
+    ("primer_set", "u1"),           # igual, para el ganador del primer set
+    ("tie_breaks", "u1"),
+    ("n_sets", "u1"),               # len(puntuaciones)
+    ("sets", "u1", (MAX_SETS_REGISTRO, 2)),   # games de cada equipo por set
+    ("sets_tie_break", "u1"),       # bit k = el set k se decidió con tie-break
+])
+
+def _lado(ids, partido):
+    ids = set(ids)
+    return 1 if ids == set(partido[0]) else 2 if ids == set(partido[1]) else 0
+
+def _sets_registro(puntuaciones):
+    """(n_sets, games por set, máscara de tie-breaks) de una lista de puntuaciones."""
+    sets = [[0, 0] for _ in range(MAX_SETS_REGISTRO)]
+    tie_breaks_sets = 0
+    for k, set_result in enumerate(puntuaciones[:MAX_SETS_REGISTRO]):
+        marcador, con_tie_break = set_result.split('(')[0], '(' in set_result
+        try:
+            sets[k] = [min(max(int(g), 0), 255) for g in marcador.split('-')]
+        except ValueError:
+            continue
+        tie_breaks_sets |= con_tie_break << k
+    return min(len(puntuaciones), 255), sets, tie_breaks_sets
+
+class RegistroPartidos:
+    """
+    Archivo de registros de tamaño fijo leído con mmap (solo lectura,
+    compartido entre instancias). Las escrituras van con el cerrojo del
+    archivo tomado y suben la versión de la cabecera.
+    """
+    def __init__(self):
+        self.lugares = []
+        self._indice_lugares = {}
+        self._mapa = None
+        self._escribiendo = 0                 # Profundidad del cerrojo tomado por esta instancia
+        self._cerrojo_hilos = threading.RLock()
+        self.version_vista = None             # Versión del archivo que cuadra con lo mapeado
+        self.activo = True   # False si no se puede usar (p. ej. no se puede crear el archivo)
+
+    def rutas(self):
+        return resource_path("registro_partidos.bin"), resource_path("registro_partidos.json")
+
+    @contextmanager
+    def escribiendo(self, espera=None):
+        """
+        Cerrojo entre instancias mientras se comprueba o se escribe (si no
+        llega en espera segundos, TimeoutError). Se puede anidar.
+        """
+        with self._cerrojo_hilos:
+            if self._escribiendo:
+                self._escribiendo += 1
+                try:
+                    yield
+                finally:
+                    self._escribiendo -= 1
+                return
+            with bloqueo_archivos([self.rutas()[0]], ESPERA_CERROJO_REGISTRO if espera is None else espera):
+                self._escribiendo = 1
+                try:
+                    yield
+                finally:
+                    self._escribiendo = 0
+
+    def cerrar(self):
+        self._mapa = None
+
+    def version_en_disco(self):
+        """Versión de la cabecera del archivo (None si no existe o no es un registro)."""
+        try:
+            with open(self.rutas()[0], mode="rb") as file:
+                cabecera = file.read(TAM_CABECERA_REGISTRO)
+        except OSError:
+            return None
+        if len(cabecera) < TAM_CABECERA_REGISTRO or cabecera[:8] != MAGIA_REGISTRO:
+            return None
+        return struct.unpack_from("<Q", cabecera, POS_VERSION_REGISTRO)[0]
+
+    def _subir_version(self, file, n):
+        """Escribe n y la versión siguiente en la cabecera (file abierto en r+b)."""
+        file.seek(POS_VERSION_REGISTRO)
+        version = struct.unpack("<Q", file.read(8))[0] + 1
+        file.seek(POS_VERSION_REGISTRO)
+        file.write(struct.pack("<Q", version))
+        file.seek(8)
+        file.write(struct.pack("<Q", n))
+        file.flush()
+        self.version_vista = version
+
+    def indice_lugar(self, lugar):
+        if lugar not in self._indice_lugares:
+            with self.escribiendo():
+                # Otra instancia puede haber añadido lugares desde la última lectura
+                self._leer_lugares()
+                if lugar not in self._indice_lugares:
+                    self._indice_lugares[lugar] = len(self.lugares)
+                    self.lugares.append(lugar)
+                    self._guardar_lugares()
+        return self._indice_lugares[lugar]
+
+    def _leer_lugares(self):
+        try:
+            with open(self.rutas()[1], "r", encoding="utf-8") as f:
+                lugares = json.load(f)["lugares"]
+        except (OSError, ValueError, KeyError):
+            return
+        self.lugares = lugares
+        self._indice_lugares = {l: i for i, l in enumerate(lugares)}
+
+    def _guardar_lugares(self):
+        ruta = self.rutas()[1]
+        with open(ruta + ".tmp", "w", encoding="utf-8") as f:
+            json.dump({"lugares": self.lugares}, f, ensure_ascii=False)
+        os.replace(ruta + ".tmp", ruta)
+
+    def codificar(self, partidos):
+        """Array de DTYPE_REGISTRO con los partidos (columna a columna)."""
+        filas = np.zeros(len(partidos), dtype=DTYPE_REGISTRO)
+        if not len(partidos):
+            return filas
+        with recolector_en_pausa():
+            return self._codificar(partidos, filas)
+
+    def _codificar(self, partidos, filas):
+        dias, sets_por_texto = {}, {}
+        columnas = {campo: [] for campo in ("jugadores", "mvp", "dia", "season", "lugar", "gana",
+                                            "primer_set", "tie_breaks", "n_sets", "sets", "sets_tie_break")}
+        for p in partidos:
+            partido = p["partido"]
+            columnas["jugadores"].append([-1 if j is None else j for j in partido[0] + partido[1]])
+            columnas["mvp"].append(-1 if p["mvp"] is None else p["mvp"])
+            dia = dias.get(p["fecha"])
+            if dia is None:
+                dia = dias[p["fecha"]] = dia_ordinal(p["fecha"]) or -1
+            columnas["dia"].append(dia)
+            columnas["season"].append(p["season"])
+            columnas["lugar"].append(self.indice_lugar(p["lugar"]))
+            columnas["gana"].append(_lado(p["ganador_partido"], partido))
+            columnas["primer_set"].append(_lado(p["ganador_primer_set"], partido))
+            columnas["tie_breaks"].append(min(max(p["tie_breaks"], 0), 255))
+            # Las mismas puntuaciones se repiten mucho: se convierten una vez
+            clave = tuple(p["puntuaciones"])
+            sets = sets_por_texto.get(clave)
+            if sets is None:
+                sets = sets_por_texto[clave] = _sets_registro(p["puntuaciones"])
+            columnas["n_sets"].append(sets[0])
+            columnas["sets"].append(sets[1])
+            columnas["sets_tie_break"].append(sets[2])
+        for campo, valores in columnas.items():
+            filas[campo] = valores
+        return filas
+
+    def cabecera(self):
+        """
+        (número de registros, huella, versión) del archivo, o None si no
+        existe o no es válido. De paso lee los lugares.
+        """
+        ruta, ruta_lugares = self.rutas()
+        try:
+            with open(ruta, mode="rb") as file:
+                cabecera = file.read(TAM_CABECERA_REGISTRO)
+                tam = os.fstat(file.fileno()).st_size
+            with open(ruta_lugares, "r", encoding="utf-8") as f:
+                lugares = json.load(f)["lugares"]
+        except (OSError, ValueError, KeyError):
+            return None
+        if len(cabecera) < TAM_CABECERA_REGISTRO or cabecera[:8] != MAGIA_REGISTRO:
+            return None
+        n = struct.unpack("<Q", cabecera[8:16])[0]
+        if tam < TAM_CABECERA_REGISTRO + n * DTYPE_REGISTRO.itemsize:
+            return None
+        self.lugares = lugares
+        self._indice_lugares = {l: i for i, l in enumerate(lugares)}
+        return n, cabecera[16:48], struct.unpack_from("<Q", cabecera, POS_VERSION_REGISTRO)[0]
+
+    def mapa(self, n):
+        """Los n primeros registros, mapeados (solo lectura, sin copia)."""
+        if self._mapa is None or len(self._mapa) != n:
+            if n == 0:
+                self._mapa = np.zeros(0, dtype=DTYPE_REGISTRO)
+            else:
+                self._mapa = np.memmap(self.rutas()[0], dtype=DTYPE_REGISTRO, mode="r",
+                                       offset=TAM_CABECERA_REGISTRO, shape=(n,))
+        return self._mapa
+
+    def reconstruir(self, partidos, huella):
+        """
+        Escribe el registro entero desde un iterable de partidos, por trozos.
+        Es un archivo nuevo que sustituye al anterior: quien aún tenga mapeado
+        el viejo lo sigue leyendo entero hasta que vea la versión nueva.
+        """
+        self.cerrar()
+        ruta = self.rutas()[0]
+        version = (self.version_en_disco() or 0) + 1
+        self.lugares = []
+        self._indice_lugares = {}
+        self._guardar_lugares()
+        n = 0
+        with open(ruta + ".tmp", "wb") as file:
+            file.write(bytes(TAM_CABECERA_REGISTRO))
+            trozo = []
+            for p in itertools.chain(partidos, [None]):
+                if p is not None:
+                    trozo.append(p)
+                if len(trozo) >= FILAS_POR_TROZO or (p is None and trozo):
+                    file.write(self.codificar(trozo).tobytes())
+                    n += len(trozo)
+                    trozo = []
+            file.seek(0)
+            file.write(MAGIA_REGISTRO + struct.pack("<Q", n) + huella + struct.pack("<Q", version))
+        os.replace(ruta + ".tmp", ruta)
+        self.version_vista = version
+        return n
+
+    def truncar_y_anexar(self, n, filas):
+        """
+        Deja los n primeros registros y añade filas (array de DTYPE_REGISTRO)
+        detrás. El archivo no se acorta nunca (lo que sobre detrás no cuenta):
+        otra instancia puede tener mapeados más registros.
+        """
+        self.cerrar()
+        with self.escribiendo(), open(self.rutas()[0], "r+b") as file:
+            file.seek(TAM_CABECERA_REGISTRO + n * DTYPE_REGISTRO.itemsize)
+            file.write(filas.tobytes())
+            file.flush()
+            # El número de registros se escribe al final: hasta entonces los nuevos no cuentan
+            self._subir_version(file, n + len(filas))
+        return n + len(filas)
+
+    def sobrescribir(self, idx, filas):
+        """Sustituye los registros desde idx por filas, sin cambiar el número de registros."""
+        with self.escribiendo(), open(self.rutas()[0], "r+b") as file:
+            file.seek(TAM_CABECERA_REGISTRO + idx * DTYPE_REGISTRO.itemsize)
+            file.write(filas.tobytes())
+            file.flush()
+            file.seek(8)
+            self._subir_version(file, struct.unpack("<Q", file.read(8))[0])
+
+registro = RegistroPartidos()
+version_registro = -1
+n_registro = 0
+
+def huella_shards():
+    """Identifica el conjunto de shards (y por tanto la numeración de sus partidos)."""
+    h = hashlib.sha256()
+    for t in resultados.archivadas:
+        h.update(f"{t['nombre']}\x1f{t['sha256']}\x1f{t['filas']}\n".encode("utf-8"))
+    return h.digest()
+
+def asegurar_registro():
+    """
+    Registro mapeado con exactamente len(resultados) partidos, o None si no
+    se puede usar. Los shards se comprueban por su huella y solo se releen
+    si el registro es de otros shards; los partidos vivos se comparan con el
+    registro y se reescribe solo lo que no cuadre. Si otra instancia lo ha
+    cambiado desde la última vez (otra versión) se vuelve a comprobar.
+    """
+    global version_registro, n_registro
+    if not registro.activo:
+        return None
+    if version_registro == version_datos and registro.version_en_disco() == registro.version_vista:
+        return registro.mapa(n_registro)
+    version_registro = -1
+    try:
+        with registro.escribiendo():
+            # Puede ser otro archivo (reconstruido por otra instancia): se vuelve a mapear
+            registro.cerrar()
+            huella = huella_shards()
+            cabecera = registro.cabecera()
+            inicio = resultados.inicio_vivos
+            if cabecera is None or cabecera[1] != huella or cabecera[0] < inicio:
+                registro.reconstruir(resultados.recorrer(), huella)
+                n = len(resultados)
+            else:
+                n, _, registro.version_vista = cabecera
+                vivos = registro.codificar(resultados.vivos)
+                en_disco = registro.mapa(n)[inicio:inicio + len(vivos)]
+                iguales = len(en_disco)
+                if iguales:
+                    distintos = np.flatnonzero(en_disco.view(np.uint8).reshape(iguales, -1) !=
+                                               vivos[:iguales].view(np.uint8).reshape(iguales, -1))
+                    if len(distintos):
+                        iguales = int(distintos[0]) // DTYPE_REGISTRO.itemsize
+                if inicio + iguales != n or iguales != len(vivos):
+                    n = registro.truncar_y_anexar(inicio + iguales, vivos[iguales:])
+    except TimeoutError:
+        # Otra instancia lo está escribiendo: esta vez se trabaja desde memoria
+        return None
+    except OSError:
+        # No se puede crear ni sustituir (carpeta de solo lectura, o en
+        # Windows otra instancia lo tiene mapeado mientras se reconstruye):
+        # esta sesión sigue sin registro, desde los partidos en memoria
+        registro.activo = False
+        return None
+    n_registro = n
+    version_registro = version_datos
+    return registro.mapa(n)
+
+def _anexar_al_registro(idx, partido):
+    """
+    Añade un partido nuevo al registro al día; devuelve False si no se pudo
+    (o si otra instancia lo ha cambiado: entonces se volverá a comprobar).
+    """
+    global n_registro
+    if not registro.activo or n_registro != idx:
+        return False
+    try:
+        with registro.escribiendo():
+            if registro.version_en_disco() != registro.version_vista:
+                return False
+            n_registro = registro.truncar_y_anexar(idx, registro.codificar([partido]))
+    except OSError:
+        return False
+    return True
+
+def _sobrescribir_en_registro(idx, partido):
+    """Sustituye el registro idx (con el registro al día); devuelve False si no se pudo."""
+    if not registro.activo or idx >= n_registro:
+        return False
+    try:
+        with registro.escribiendo():
+            if registro.version_en_disco() != registro.version_vista:
+                return False
+            registro.sobrescribir(idx, registro.codificar([partido]))
+    except OSError:
+        return False
+    return True
+
+def registro_o_partidos(season=None):
+    """
+    Partidos para los agregados: del registro mapeado si se puede (todos o
+    los de una season) y si no de resultados.
+    """
+    mapa = asegurar_registro()
+    if mapa is not None:
+        return mapa if season is None else mapa[mapa["season"] == season]
+    if season is None:
+        return resultados.recorrer()
+    return [r for (_, r) in resultados.partidos_de_season(season)]
+
+def partidos_de_jugadores(partidos, ids):
+    """De lo que devuelve registro_o_partidos, solo los partidos en que juega alguno de ids."""
+    if isinstance(partidos, np.ndarray):
+        return partidos[np.isin(partidos["jugadores"], list(ids)).any(axis=1)]
+    return [r for r in partidos if not ids.isdisjoint(r["partido"][0] + r["partido"][1])]
 
 # ---------------------------------
 # 6. TrueSkill: Cálculos
@@ -203,54 +2005,2368 @@ def actualizar_trueskill_sin_guardar(ratings_local, partido):
         changes[j] = round(new_val - old_values[j], 2)
     return changes
 
-def recalcular_trueskill_por_season():
-    ranking_trueskill_por_season.clear()
-    ts_changes_por_partido.clear()
-    champion_by_season.clear()
-    trofeos_Liga_jugador.clear()
-    segundos_Liga_jugador.clear()
-    terceros_Liga_jugador.clear()
+# ---------------------------------
+# NUEVO: Motores de rating intercambiables
+# ---------------------------------
+# Todos los motores expresan el rating en la escala de TrueSkill (media 25)
+# para que rating_value (mu - 2*sigma), los animales y los gráficos sigan
+# teniendo sentido con cualquiera de ellos.
+RatingMotor = namedtuple("RatingMotor", ["mu", "sigma", "vol"], defaults=(0.0,))
+
+def _cdf_normal(x):
+    return 0.5 * math.erfc(-x / math.sqrt(2))
+
+def _erfc_vector(x):
+    """erfc sobre arrays, con la misma aproximación que usa trueskill."""
+    z = np.abs(x)
+    t = 1.0 / (1.0 + z / 2.0)
+    r = t * np.exp(-z * z - 1.26551223 + t * (1.00002368 + t * (
+        0.37409196 + t * (0.09678418 + t * (-0.18628806 + t * (
+            0.27886807 + t * (-1.13520398 + t * (1.48851587 + t * (
+                -0.82215223 + t * 0.17087277)))))))))
+    return np.where(x < 0, 2.0 - r, r)
+
+def _cdf_normal_vector(x):
+    return 0.5 * _erfc_vector(-x / math.sqrt(2))
+
+def _lotes_independientes(jugadores_partidos):
+    """
+    Parte una secuencia de partidos (array n x 4 de ids) en tramos
+    consecutivos en los que ningún jugador se repite. Los partidos de un
+    tramo no dependen entre sí, así que se pueden actualizar a la vez sin
+    cambiar el resultado de la repetición secuencial.
+    Devuelve una lista de (inicio, fin).
+    """
+    lotes = []
+    inicio = 0
+    vistos = set()
+    for i, fila in enumerate(jugadores_partidos.tolist()):
+        if vistos.intersection(fila):
+            lotes.append((inicio, i))
+            inicio = i
+            vistos = set()
+        vistos.update(fila)
+    if inicio < len(jugadores_partidos):
+        lotes.append((inicio, len(jugadores_partidos)))
+    return lotes
+
+def _partidos_a_arrays(partidos):
+    """Ids de los jugadores (n x 4: eq1, eq1, eq2, eq2) y si ganó el equipo 1."""
+    jugadores_partidos = np.array([p["partido"][0] + p["partido"][1] for p in partidos],
+                                  dtype=np.int64).reshape(-1, 4)
+    gana1 = np.array([set(p["ganador_partido"]) == set(p["partido"][0]) for p in partidos],
+                     dtype=bool)
+    return jugadores_partidos, gana1
+
+class MotorRating:
+    """
+    Interfaz común de los motores de rating. Los ratings se manejan como
+    diccionarios {id_jugador: rating}, donde cada rating tiene .mu y .sigma.
+    """
+    nombre = ""
+    historia_completa = False   # True si un partido nuevo cambia toda la season
+
+    def crear_rating(self):
+        raise NotImplementedError
+
+    def parametros(self):
+        """Tupla con lo que influye en los ratings (forma parte de los hashes)."""
+        raise NotImplementedError
+
+    def actualizar(self, ratings_local, partido):
+        """
+        Aplica un partido sobre ratings_local (en sitio) y devuelve
+        {id_jugador: cambio en rating_value}.
+        """
+        raise NotImplementedError
+
+    def reproducir(self, partidos, n_jugadores, ratings_iniciales=None):
+        """
+        Repite una lista de partidos (ya en orden) desde ratings iniciales
+        (los de ratings_iniciales y, para el resto de jugadores, los de partida).
+        Devuelve (ratings_local, [cambios de cada partido]).
+        """
+        ratings_local = {pid: self.crear_rating() for pid in range(n_jugadores)}
+        if ratings_iniciales:
+            ratings_local.update(ratings_iniciales)
+        lista_cambios = [self.actualizar(ratings_local, p) for p in partidos]
+        return ratings_local, lista_cambios
+
+    def reproducir_arrays(self, jugadores_partidos, gana1, n_jugadores):
+        """Como reproducir, desde los arrays de _partidos_a_arrays (o del registro)."""
+        partidos = []
+        for (a, b, c, d), g in zip(jugadores_partidos.tolist(), gana1.tolist()):
+            partidos.append({"partido": ((a, b), (c, d)), "ganador_partido": (a, b) if g else (c, d)})
+        return self.reproducir(partidos, n_jugadores)
+
+    def prob_victoria(self, equipo1, equipo2):
+        """Probabilidad de que gane el equipo1 (listas de ratings)."""
+        raise NotImplementedError
+
+    def prob_victoria_lote(self, mu1, mu2, var):
+        """
+        prob_victoria sobre arrays de partidos de dos contra dos: mu1 y mu2
+        son las sumas de mu de cada equipo y var la suma de las varianzas de
+        los cuatro (0 con las habilidades ya sorteadas de las simulaciones).
+        """
+        raise NotImplementedError
+
+    def predicciones(self, partidos, n_jugadores):
+        """Probabilidad de victoria del equipo1 calculada antes de cada partido."""
+        ratings_local = {pid: self.crear_rating() for pid in range(n_jugadores)}
+        probs = []
+        for p in partidos:
+            eq1, eq2 = p["partido"]
+            probs.append(self.prob_victoria([ratings_local[j] for j in eq1],
+                                            [ratings_local[j] for j in eq2]))
+            self.actualizar(ratings_local, p)
+        return probs
+
+    def valor(self, rating_obj):
+        """Puntuación conservadora que ordena el ranking."""
+        return rating_value(rating_obj)
+
+    def a_lista(self, rating_obj):
+        return [rating_obj.mu, rating_obj.sigma]
+
+    def desde_lista(self, valores):
+        return RatingMotor(*valores)
+
+class MotorTrueSkill(MotorRating):
+    nombre = "TrueSkill"
+
+    def crear_rating(self):
+        return env.create_rating()
+
+    def parametros(self):
+        return (self.nombre, env.mu, env.sigma, env.beta, env.tau)
+
+    def actualizar(self, ratings_local, partido):
+        return actualizar_trueskill_sin_guardar(ratings_local, partido)
+
+    def _actualizar_lote(self, estado, jugadores_lote, gana1):
+        # Forma cerrada de TrueSkill para dos equipos sin empates, vectorizada
+        # sobre un lote de partidos sin jugadores en común (para simulaciones)
+        mu_a, sigma_a = estado[0], estado[1]
+        mu = mu_a[jugadores_lote]
+        var = sigma_a[jugadores_lote] ** 2 + env.tau ** 2
+        c2 = var.sum(axis=1) + 4 * env.beta ** 2
+        c = np.sqrt(c2)
+        signo = np.where(gana1, 1.0, -1.0)
+        t = signo * (mu[:, :2].sum(axis=1) - mu[:, 2:].sum(axis=1)) / c
+        pdf = np.exp(-t ** 2 / 2) / math.sqrt(2 * math.pi)
+        v = pdf / np.maximum(_cdf_normal_vector(t), 1e-300)
+        w = v * (v + t)
+        lado = np.array([1.0, 1.0, -1.0, -1.0]) * signo[:, None]
+        mu_a[jugadores_lote] = mu + lado * var / c[:, None] * v[:, None]
+        sigma_a[jugadores_lote] = np.sqrt(var * np.maximum(1 - var / c2[:, None] * w[:, None], 1e-12))
+
+    def prob_victoria(self, equipo1, equipo2):
+        delta_mu = sum(r.mu for r in equipo1) - sum(r.mu for r in equipo2)
+        suma_sigma2 = sum(r.sigma ** 2 for r in equipo1 + equipo2)
+        n = len(equipo1) + len(equipo2)
+        return _cdf_normal(delta_mu / math.sqrt(n * env.beta ** 2 + suma_sigma2))
+
+    def prob_victoria_lote(self, mu1, mu2, var):
+        return _cdf_normal_vector((mu1 - mu2) / np.sqrt(4 * env.beta ** 2 + var))
+
+    def desde_lista(self, valores):
+        return env.create_rating(mu=valores[0], sigma=valores[1])
+
+class MotorVectorizado(MotorRating):
+    """
+    Base de los motores implementados con NumPy. El estado son arrays
+    indexados por id de jugador; _actualizar_lote aplica a la vez un lote
+    de partidos sin jugadores en común.
+    """
+    def _estado_inicial(self, n_jugadores):
+        r = self.crear_rating()
+        return [np.full(n_jugadores, float(valor)) for valor in r]
+
+    def _actualizar_lote(self, estado, jugadores_lote, gana1):
+        raise NotImplementedError
+
+    def _valores(self, estado, ids):
+        return estado[0][ids] - 2 * estado[1][ids]
+
+    def actualizar(self, ratings_local, partido):
+        ids = list(partido["partido"][0] + partido["partido"][1])
+        estado = [np.array([float(ratings_local[j][k]) for j in ids])
+                  for k in range(len(self.crear_rating()))]
+        gana1 = np.array([set(partido["ganador_partido"]) == set(partido["partido"][0])])
+        antes = self._valores(estado, slice(None))
+        self._actualizar_lote(estado, np.arange(4).reshape(1, 4), gana1)
+        despues = self._valores(estado, slice(None))
+        for i, j in enumerate(ids):
+            ratings_local[j] = RatingMotor(*(float(e[i]) for e in estado))
+        return {j: round(float(despues[i] - antes[i]), 2) for i, j in enumerate(ids)}
+
+    def reproducir(self, partidos, n_jugadores, ratings_iniciales=None):
+        if not partidos:
+            return self.reproducir_arrays(np.zeros((0, 4), dtype=np.int64), np.zeros(0, dtype=bool),
+                                          n_jugadores, ratings_iniciales)
+        return self.reproducir_arrays(*_partidos_a_arrays(partidos), n_jugadores, ratings_iniciales)
+
+    def reproducir_arrays(self, jugadores_partidos, gana1, n_jugadores, ratings_iniciales=None):
+        estado = self._estado_inicial(n_jugadores)
+        for pid, rating_obj in (ratings_iniciales or {}).items():
+            for e, valor in zip(estado, rating_obj):
+                e[pid] = valor
+        lista_cambios = []
+        if len(jugadores_partidos):
+            for inicio, fin in _lotes_independientes(jugadores_partidos):
+                lote = jugadores_partidos[inicio:fin]
+                antes = self._valores(estado, lote)
+                self._actualizar_lote(estado, lote, gana1[inicio:fin])
+                deltas = np.round(self._valores(estado, lote) - antes, 2)
+                for fila, fila_deltas in zip(lote.tolist(), deltas.tolist()):
+                    lista_cambios.append(dict(zip(fila, fila_deltas)))
+        ratings_local = {pid: RatingMotor(*(float(e[pid]) for e in estado))
+                         for pid in range(n_jugadores)}
+        return ratings_local, lista_cambios
+
+class MotorElo(MotorVectorizado):
+    """
+    Elo por equipos: cada equipo juega con la media de sus jugadores y
+    todos reciben el mismo ajuste. Escala: 60 puntos Elo = 1 unidad.
+    """
+    nombre = "Elo"
+    ESCALA = 60.0
+
+    def __init__(self, k=32.0):
+        self.k = k / self.ESCALA
+        self.d = 400.0 / self.ESCALA
+
+    def crear_rating(self):
+        return RatingMotor(25.0, 0.0)
+
+    def parametros(self):
+        return (self.nombre, self.k, self.d)
+
+    def _esperado(self, r1, r2):
+        return 1.0 / (1.0 + 10.0 ** ((r2 - r1) / self.d))
+
+    def _actualizar_lote(self, estado, jugadores_lote, gana1):
+        mu = estado[0]
+        r1 = mu[jugadores_lote[:, :2]].mean(axis=1)
+        r2 = mu[jugadores_lote[:, 2:]].mean(axis=1)
+        ajuste = self.k * (gana1 - self._esperado(r1, r2))
+        mu[jugadores_lote[:, :2]] += ajuste[:, None]
+        mu[jugadores_lote[:, 2:]] -= ajuste[:, None]
+
+    def prob_victoria(self, equipo1, equipo2):
+        r1 = sum(r.mu for r in equipo1) / len(equipo1)
+        r2 = sum(r.mu for r in equipo2) / len(equipo2)
+        return float(self._esperado(r1, r2))
+
+    def prob_victoria_lote(self, mu1, mu2, var):
+        return self._esperado(mu1 / 2, mu2 / 2)
+
+class MotorGlicko2(MotorVectorizado):
+    """
+    Glicko-2 con cada partido como periodo de rating. Cada jugador se
+    enfrenta a un rival compuesto por la media del equipo contrario.
+    Escala: 1500 -> 25 y 60 puntos Glicko = 1 unidad.
+    """
+    nombre = "Glicko-2"
+    ESCALA = 60.0
+    GLICKO = 173.7178
+
+    def __init__(self, rd=350.0, vol=0.06, tau=0.5):
+        self.rd = rd
+        self.vol = vol
+        self.tau = tau
+
+    def crear_rating(self):
+        return RatingMotor(25.0, self.rd / self.ESCALA, self.vol)
+
+    def parametros(self):
+        return (self.nombre, self.rd, self.vol, self.tau)
+
+    def _internos(self, mu, sigma):
+        factor = self.ESCALA / self.GLICKO
+        return (mu - 25.0) * factor, sigma * factor
+
+    def _g(self, phi):
+        return 1.0 / np.sqrt(1.0 + 3.0 * phi ** 2 / math.pi ** 2)
+
+    def _nueva_volatilidad(self, phi, vol, v, delta):
+        # Algoritmo de Illinois vectorizado (paso 5 del artículo de Glickman)
+        a = np.log(vol ** 2)
+        tau2 = self.tau ** 2
+
+        def f(x):
+            ex = np.exp(x)
+            return (ex * (delta ** 2 - phi ** 2 - v - ex) / (2 * (phi ** 2 + v + ex) ** 2)
+                    - (x - a) / tau2)
+
+        A = a.copy()
+        grande = delta ** 2 > phi ** 2 + v
+        B = np.where(grande, np.log(np.maximum(delta ** 2 - phi ** 2 - v, 1e-300)), a - self.tau)
+        pendientes = ~grande
+        k = 1
+        while pendientes.any():
+            candidato = a - k * self.tau
+            fijo = pendientes & (f(candidato) >= 0)
+            B = np.where(fijo, candidato, B)
+            pendientes &= ~fijo
+            k += 1
+            if k > 100:
+                break
+        fA, fB = f(A), f(B)
+        for _ in range(100):
+            activo = np.abs(B - A) > 1e-6
+            if not activo.any():
+                break
+            # Los que ya han convergido se quedan quietos (y sin dividir por cero)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                C = np.where(activo, A + (A - B) * fA / (fB - fA), B)
+            fC = f(C)
+            cruza = fC * fB <= 0
+            A = np.where(cruza, B, A)
+            fA = np.where(cruza, fB, fA / 2)
+            B, fB = C, fC
+        return np.exp(A / 2)
+
+    def _actualizar_lote(self, estado, jugadores_lote, gana1):
+        mu_ts, sigma_ts, vol = estado
+        n = len(jugadores_lote)
+        mu, phi = self._internos(mu_ts[jugadores_lote], sigma_ts[jugadores_lote])
+        # Rival compuesto de cada jugador: media del otro equipo
+        mu_rival = np.concatenate([np.repeat(mu[:, 2:].mean(axis=1, keepdims=True), 2, axis=1),
+                                   np.repeat(mu[:, :2].mean(axis=1, keepdims=True), 2, axis=1)], axis=1)
+        phi2_eq1 = (phi[:, :2] ** 2).mean(axis=1, keepdims=True)
+        phi2_eq2 = (phi[:, 2:] ** 2).mean(axis=1, keepdims=True)
+        phi_rival = np.sqrt(np.concatenate([np.repeat(phi2_eq2, 2, axis=1),
+                                            np.repeat(phi2_eq1, 2, axis=1)], axis=1))
+        s = np.concatenate([np.repeat(gana1[:, None], 2, axis=1),
+                            np.repeat(~gana1[:, None], 2, axis=1)], axis=1).astype(float)
+        g = self._g(phi_rival)
+        E = 1.0 / (1.0 + np.exp(-g * (mu - mu_rival)))
+        v = 1.0 / (g ** 2 * E * (1 - E))
+        delta = v * g * (s - E)
+        nueva_vol = self._nueva_volatilidad(phi.ravel(), vol[jugadores_lote].ravel(),
+                                            v.ravel(), delta.ravel()).reshape(n, 4)
+        phi_estrella = np.sqrt(phi ** 2 + nueva_vol ** 2)
+        nuevo_phi = 1.0 / np.sqrt(1.0 / phi_estrella ** 2 + 1.0 / v)
+        nuevo_mu = mu + nuevo_phi ** 2 * g * (s - E)
+        factor = self.GLICKO / self.ESCALA
+        mu_ts[jugadores_lote] = 25.0 + nuevo_mu * factor
+        sigma_ts[jugadores_lote] = nuevo_phi * factor
+        vol[jugadores_lote] = nueva_vol
+
+    def prob_victoria(self, equipo1, equipo2):
+        mu1, phi1 = self._internos(np.array([r.mu for r in equipo1]), np.array([r.sigma for r in equipo1]))
+        mu2, phi2 = self._internos(np.array([r.mu for r in equipo2]), np.array([r.sigma for r in equipo2]))
+        phi = np.sqrt(np.mean(phi1 ** 2) + np.mean(phi2 ** 2))
+        return float(1.0 / (1.0 + np.exp(-self._g(phi) * (mu1.mean() - mu2.mean()))))
+
+    def prob_victoria_lote(self, mu1, mu2, var):
+        factor = self.ESCALA / self.GLICKO
+        # Medias de cada equipo y, como en prob_victoria, la suma de la varianza media de cada uno
+        phi = np.sqrt(var / 2) * factor
+        return 1.0 / (1.0 + np.exp(-self._g(phi) * (mu1 - mu2) / 2 * factor))
+
+    def a_lista(self, rating_obj):
+        return [rating_obj.mu, rating_obj.sigma, rating_obj.vol]
+
+class MotorWengLin(MotorVectorizado):
+    """
+    Weng-Lin (modelo Bradley-Terry, como OpenSkill) para dos equipos.
+    """
+    nombre = "Weng-Lin"
+    KAPPA = 1e-4
+
+    def __init__(self, mu=25.0, sigma=25.0 / 3, beta=25.0 / 6):
+        self.mu = mu
+        self.sigma = sigma
+        self.beta = beta
+
+    def crear_rating(self):
+        return RatingMotor(self.mu, self.sigma)
+
+    def parametros(self):
+        return (self.nombre, self.mu, self.sigma, self.beta)
+
+    def _actualizar_lote(self, estado, jugadores_lote, gana1):
+        mu_a, sigma_a = estado[0], estado[1]
+        mu = mu_a[jugadores_lote]
+        sigma2 = sigma_a[jugadores_lote] ** 2
+        mu_eq = np.stack([mu[:, :2].sum(axis=1), mu[:, 2:].sum(axis=1)], axis=1)
+        sigma2_eq = np.stack([sigma2[:, :2].sum(axis=1), sigma2[:, 2:].sum(axis=1)], axis=1)
+        c = np.sqrt(sigma2_eq.sum(axis=1) + 2 * self.beta ** 2)
+        p1 = 1.0 / (1.0 + np.exp((mu_eq[:, 1] - mu_eq[:, 0]) / c))
+        p = np.stack([p1, 1 - p1], axis=1)
+        s = np.stack([gana1, ~gana1], axis=1).astype(float)
+        omega = sigma2_eq / c[:, None] * (s - p)
+        gamma = np.sqrt(sigma2_eq) / c[:, None]
+        delta = gamma * sigma2_eq / c[:, None] ** 2 * p1[:, None] * (1 - p1)[:, None]
+        # Cada jugador recibe la parte proporcional a su varianza en el equipo
+        equipo = np.array([0, 0, 1, 1])
+        proporcion = sigma2 / sigma2_eq[:, equipo]
+        mu_a[jugadores_lote] = mu + proporcion * omega[:, equipo]
+        sigma_a[jugadores_lote] = np.sqrt(sigma2 * np.maximum(1 - proporcion * delta[:, equipo], self.KAPPA))
+
+    def prob_victoria(self, equipo1, equipo2):
+        suma_sigma2 = sum(r.sigma ** 2 for r in equipo1 + equipo2)
+        c = math.sqrt(suma_sigma2 + 2 * self.beta ** 2)
+        delta_mu = sum(r.mu for r in equipo1) - sum(r.mu for r in equipo2)
+        return 1.0 / (1.0 + math.exp(-delta_mu / c))
+
+    def prob_victoria_lote(self, mu1, mu2, var):
+        return 1.0 / (1.0 + np.exp(-(mu1 - mu2) / np.sqrt(var + 2 * self.beta ** 2)))
+
+class MotorHistoriaCompleta(MotorVectorizado):
+    """
+    Whole-History Rating (Coulom), en la línea de TrueSkill Through Time:
+    en lugar de actualizar partido a partido, estima a la vez la trayectoria
+    de cada jugador en toda la season, de modo que los primeros partidos
+    también se valoran con lo que se sabe después y el orden no importa.
+
+    Modelo: cada jugador tiene un rating por día jugado, que deriva como un
+    paseo aleatorio (varianza_diaria por día) y empieza con N(25, sigma_inicial).
+    Un equipo gana con probabilidad logística de la diferencia de sumas.
+    Se resuelve con Newton: el sistema de cada paso se resuelve con gradiente
+    conjugado sobre el hessiano disperso (productos por partido, sin formar
+    la matriz), precondicionado con los bloques tridiagonales de cada
+    jugador, que se resuelven todos a la vez con el algoritmo de Thomas.
+    La última solución de cada season sirve de punto de partida (warm start),
+    así que añadir un partido solo cuesta unas pocas iteraciones.
+    """
+    nombre = "Historia completa"
+    historia_completa = True
+    ESCALA = (400.0 / math.log(10)) / 60.0   # unidad natural -> escala de 25 (60 Elo = 1)
+    ITERACIONES_PREDICCION = 3   # pasos de Newton por día al predecir (partiendo del día anterior)
+
+    def __init__(self, sigma_inicial=3.0, varianza_diaria=0.004, tolerancia=1e-6, max_iteraciones=50):
+        self.sigma_inicial = sigma_inicial
+        self.varianza_diaria = varianza_diaria
+        self.tolerancia = tolerancia
+        self.max_iteraciones = max_iteraciones
+        self._var_inicial = (sigma_inicial / self.ESCALA) ** 2
+        self._var_diaria = varianza_diaria / self.ESCALA ** 2
+        self.iteraciones = 0            # iteraciones de la última resolución
+        self._soluciones = {}           # {clave: {(id_jugador, día): rating natural}}
+        self._cerrojo = threading.Lock()
+
+    def crear_rating(self):
+        return RatingMotor(25.0, self.sigma_inicial)
+
+    def parametros(self):
+        return (self.nombre, self.sigma_inicial, self.varianza_diaria, self.tolerancia)
+
+    def aparte(self):
+        """Motor con los mismos parámetros y sus propios warm starts (para no pisar los del ranking)."""
+        return MotorHistoriaCompleta(self.sigma_inicial, self.varianza_diaria, self.tolerancia,
+                                     self.max_iteraciones)
+
+    def _actualizar_lote(self, estado, jugadores_lote, gana1):
+        # Paso online (aproximación de Laplace) para cuando solo se dispone
+        # de los ratings actuales; la historia completa se obtiene en reproducir
+        mu_a, sigma_a = estado[0], estado[1]
+        r = (mu_a[jugadores_lote] - 25.0) / self.ESCALA
+        var = (sigma_a[jugadores_lote] / self.ESCALA) ** 2 + self._var_diaria
+        p1 = 1.0 / (1.0 + np.exp(-(r[:, :2].sum(axis=1) - r[:, 2:].sum(axis=1))))
+        s = np.concatenate([np.repeat(gana1[:, None], 2, axis=1),
+                            np.repeat(~gana1[:, None], 2, axis=1)], axis=1).astype(float)
+        p_propio = np.concatenate([np.repeat(p1[:, None], 2, axis=1),
+                                   np.repeat(1 - p1[:, None], 2, axis=1)], axis=1)
+        nueva_var = 1.0 / (1.0 / var + (p1 * (1 - p1))[:, None])
+        mu_a[jugadores_lote] = 25.0 + (r + nueva_var * (s - p_propio)) * self.ESCALA
+        sigma_a[jugadores_lote] = np.sqrt(nueva_var) * self.ESCALA
+
+    def prob_victoria(self, equipo1, equipo2):
+        d = (sum(r.mu for r in equipo1) - sum(r.mu for r in equipo2)) / self.ESCALA
+        var = sum(r.sigma ** 2 for r in equipo1 + equipo2) / self.ESCALA ** 2
+        return 1.0 / (1.0 + math.exp(-d / math.sqrt(1 + math.pi * var / 8)))
+
+    def prob_victoria_lote(self, mu1, mu2, var):
+        d = (mu1 - mu2) / self.ESCALA
+        return 1.0 / (1.0 + np.exp(-d / np.sqrt(1 + math.pi * (var / self.ESCALA ** 2) / 8)))
+
+    @staticmethod
+    def _thomas(D, O, G):
+        """
+        Resuelve a la vez varios sistemas tridiagonales simétricos (uno por
+        fila): diagonal D, fuera de la diagonal O (O[:, k] une k y k+1) y
+        término independiente G. Devuelve la solución y los pivotes hacia
+        delante, que sirven luego para las varianzas.
+        """
+        P, K = D.shape
+        cp = np.zeros((P, K))
+        dp = np.zeros((P, K))
+        piv = np.zeros((P, K))
+        for k in range(K):
+            if k == 0:
+                piv[:, 0] = D[:, 0]
+                dp[:, 0] = G[:, 0] / piv[:, 0]
+            else:
+                piv[:, k] = D[:, k] - O[:, k - 1] * cp[:, k - 1]
+                dp[:, k] = (G[:, k] - O[:, k - 1] * dp[:, k - 1]) / piv[:, k]
+            cp[:, k] = O[:, k] / piv[:, k]
+        x = np.zeros((P, K))
+        x[:, K - 1] = dp[:, K - 1]
+        for k in range(K - 2, -1, -1):
+            x[:, k] = dp[:, k] - cp[:, k] * x[:, k + 1]
+        return x, piv
+
+    def _resolver(self, partidos, clave=None, previas=None, max_iteraciones=None):
+        """
+        Trayectorias de máxima verosimilitud a posteriori; previas
+        {id_jugador: rating} da la previa del primer día de esos jugadores
+        (los demás parten de N(25, sigma_inicial)) y max_iteraciones limita
+        los pasos de Newton (por defecto, los del motor). Devuelve
+        (puntos, punto_de_cada_hueco, mu, sigma, primero): puntos es un array
+        (id_jugador, día) ordenado, punto_de_cada_hueco (n x 4) dice qué
+        punto usa cada jugador de cada partido y primero marca el primer día
+        de cada jugador.
+        """
+        jugadores_partidos, gana1 = _partidos_a_arrays(partidos)
+        dias = np.array([dia_ordinal(p["fecha"]) for p in partidos], dtype=np.int64)
+        pares = np.stack([jugadores_partidos.ravel(), np.repeat(dias, 4)], axis=1)
+        puntos, inverso = np.unique(pares, axis=0, return_inverse=True)
+        inverso = inverso.reshape(-1, 4)
+        n = len(puntos)
+
+        # Cadenas (una por jugador) en una matriz rellenada P x K
+        primero = np.r_[True, puntos[1:, 0] != puntos[:-1, 0]]
+        inicios = np.flatnonzero(primero)
+        cadena = np.cumsum(primero) - 1
+        posicion = np.arange(n) - inicios[cadena]
+        P, K = len(inicios), int(posicion.max()) + 1
+        plano = cadena * K + posicion
+        enlace = ~primero[1:]
+        precision = np.where(enlace, 1.0 / (self._var_diaria * np.maximum(np.diff(puntos[:, 1]), 1)), 0.0)
+        signo = np.array([1.0, 1.0, -1.0, -1.0])
+        ganados = gana1.astype(float)
+        # Previa del primer punto de cada jugador: media y precisión (en unidades naturales)
+        media_previa = np.zeros(P)
+        precision_previa = np.full(P, 1.0 / self._var_inicial)
+        for k, pid in enumerate(puntos[primero, 0].tolist()):
+            if previas and pid in previas:
+                media_previa[k] = (previas[pid].mu - 25.0) / self.ESCALA
+                precision_previa[k] = 1.0 / (previas[pid].sigma / self.ESCALA) ** 2
+
+        # Punto de partida: solución anterior, arrastrando hacia delante los días nuevos
+        with self._cerrojo:
+            anterior = self._soluciones.get(clave, {})
+        r = np.array([anterior.get(pt, np.nan) for pt in map(tuple, puntos.tolist())], dtype=float)
+        r[primero] = np.where(np.isnan(r[primero]), media_previa, r[primero])
+        conocidos = np.where(np.isnan(r), 0, np.arange(n))
+        r = r[np.maximum.accumulate(conocidos)]
+
+        def objetivo(r):
+            d = r[inverso] @ signo
+            verosimilitud = -np.sum(np.logaddexp(0.0, np.where(gana1, -d, d)))
+            return (verosimilitud - 0.5 * np.sum(precision * np.diff(r) ** 2)
+                    - 0.5 * np.sum(precision_previa * (r[primero] - media_previa) ** 2))
+
+        def gradiente_y_curvatura(r):
+            d = r[inverso] @ signo
+            p1 = 1.0 / (1.0 + np.exp(-d))
+            peso = p1 * (1 - p1)
+            grad = np.bincount(inverso.ravel(), ((ganados - p1)[:, None] * signo).ravel(), n)
+            diag = np.bincount(inverso.ravel(), np.repeat(peso, 4), n)
+            dif = precision * np.diff(r)
+            grad[:-1] += dif
+            grad[1:] -= dif
+            diag[:-1] += precision
+            diag[1:] += precision
+            grad[primero] -= (r[primero] - media_previa) * precision_previa
+            diag[primero] += precision_previa
+            return grad, diag, peso
+
+        def producto_hessiano(v, peso):
+            # Hessiano completo (cambiado de signo) por un vector, sin formarlo:
+            # incluye el acoplamiento entre compañeros y rivales de cada partido
+            dv = v[inverso] @ signo
+            res = np.bincount(inverso.ravel(), ((peso * dv)[:, None] * signo).ravel(), n)
+            dif = precision * np.diff(v)
+            res[:-1] -= dif
+            res[1:] += dif
+            res[primero] += v[primero] * precision_previa
+            return res
+
+        def matrices(diag, grad):
+            D = np.ones(P * K)
+            O = np.zeros(P * K)
+            G = np.zeros(P * K)
+            D[plano] = diag
+            O[plano[:-1]] = -precision
+            G[plano] = grad
+            return D.reshape(P, K), O.reshape(P, K), G.reshape(P, K)
+
+        def newton(grad, diag, peso):
+            # Gradiente conjugado precondicionado con los bloques tridiagonales
+            D, O, _ = matrices(diag, grad)
+
+            def precondicionar(v):
+                G = np.zeros(P * K)
+                G[plano] = v
+                return self._thomas(D, O, G.reshape(P, K))[0].ravel()[plano]
+
+            x = np.zeros(n)
+            resto = grad.copy()
+            z = precondicionar(resto)
+            direccion = z.copy()
+            rz = resto @ z
+            limite = (1e-10 * np.linalg.norm(grad)) ** 2
+            for _ in range(n):
+                if resto @ resto <= limite:
+                    break
+                Ad = producto_hessiano(direccion, peso)
+                alfa = rz / (direccion @ Ad)
+                x += alfa * direccion
+                resto -= alfa * Ad
+                z = precondicionar(resto)
+                rz, rz_anterior = resto @ z, rz
+                direccion = z + (rz / rz_anterior) * direccion
+            return x
+
+        actual = objetivo(r)
+        self.iteraciones = 0
+        for self.iteraciones in range(1, (max_iteraciones or self.max_iteraciones) + 1):
+            paso = newton(*gradiente_y_curvatura(r))
+            # Búsqueda lineal: el objetivo es cóncavo, basta con no empeorar
+            for _ in range(30):
+                nuevo = objetivo(r + paso)
+                if nuevo >= actual - 1e-12:
+                    break
+                paso /= 2
+            r = r + paso
+            actual = nuevo
+            if np.max(np.abs(paso)) < self.tolerancia:
+                break
+
+        # Varianzas: diagonal de la inversa de cada bloque tridiagonal
+        _, diag, _ = gradiente_y_curvatura(r)
+        D, O, _ = matrices(diag, np.zeros(n))
+        piv_delante = self._thomas(D, O, np.zeros_like(D))[1]
+        piv_detras = self._thomas(D[:, ::-1], np.roll(O[:, ::-1], -1, axis=1), np.zeros_like(D))[1][:, ::-1]
+        varianza = (1.0 / (piv_delante + piv_detras - D)).ravel()[plano]
+
+        with self._cerrojo:
+            self._soluciones[clave] = dict(zip(map(tuple, puntos.tolist()), r.tolist()))
+        return puntos, inverso, 25.0 + r * self.ESCALA, np.sqrt(varianza) * self.ESCALA, primero
+
+    def reproducir(self, partidos, n_jugadores, ratings_iniciales=None):
+        # ratings_iniciales no se suman partido a partido: son la previa del
+        # primer día de cada jugador en la resolución conjunta
+        ratings_local = {pid: self.crear_rating() for pid in range(n_jugadores)}
+        if ratings_iniciales:
+            ratings_local.update(ratings_iniciales)
+        if not partidos:
+            return ratings_local, []
+        puntos, inverso, mu, sigma, primero = self._resolver(partidos, partidos[0]["season"], ratings_iniciales)
+        valores = mu - 2 * sigma
+        ultimo = np.r_[primero[1:], True]
+        valor_inicial = np.array([rating_value(ratings_local[pid]) for pid in puntos[primero, 0].tolist()])
+        for pid, m, sg in zip(puntos[ultimo, 0].tolist(), mu[ultimo].tolist(), sigma[ultimo].tolist()):
+            ratings_local[pid] = RatingMotor(m, sg)
+        # El cambio de cada día se reparte entre los partidos jugados ese día
+        previo = np.r_[0.0, valores[:-1]]
+        previo[primero] = valor_inicial
+        partidos_del_punto = np.bincount(inverso.ravel(), minlength=len(puntos))
+        deltas = np.round(((valores - previo) / partidos_del_punto)[inverso], 2)
+        ids = puntos[inverso, 0]
+        lista_cambios = [dict(zip(fila, fila_deltas))
+                         for fila, fila_deltas in zip(ids.tolist(), deltas.tolist())]
+        return ratings_local, lista_cambios
+
+    def trayectorias(self, partidos):
+        """{id_jugador: [(día ordinal, rating_value)]} suavizados de una season."""
+        if not partidos:
+            return {}
+        puntos, _, mu, sigma, _ = self._resolver(partidos, partidos[0]["season"])
+        tray = defaultdict(list)
+        for (pid, dia), valor in zip(puntos.tolist(), (mu - 2 * sigma).tolist()):
+            tray[pid].append((dia, valor))
+        return tray
+
+    def predicciones(self, partidos, n_jugadores):
+        # Cada día se predice con la historia completa de los días anteriores
+        # y, dentro del día, sumando con el paso online los partidos ya jugados.
+        # Cada resolución parte de la del día anterior (con su propia clave,
+        # para no tocar la del ranking) y da solo unos pocos pasos de Newton:
+        # hay una por día en lugar de una completa por partido.
+        if not partidos:
+            return []
+        clave = ("predicciones", partidos[0]["season"])
+        ratings_local = {pid: self.crear_rating() for pid in range(n_jugadores)}
+        probs = []
+        resueltos = 0
+        try:
+            for i, p in enumerate(partidos):
+                if i and p["fecha"] != partidos[i - 1]["fecha"]:
+                    puntos, _, mu, sigma, primero = self._resolver(
+                        partidos[:i], clave, max_iteraciones=self.ITERACIONES_PREDICCION if resueltos else None)
+                    resueltos += 1
+                    ultimo = np.r_[primero[1:], True]
+                    ratings_local = {pid: self.crear_rating() for pid in range(n_jugadores)}
+                    for pid, m, sg in zip(puntos[ultimo, 0].tolist(), mu[ultimo].tolist(), sigma[ultimo].tolist()):
+                        ratings_local[pid] = RatingMotor(m, sg)
+                eq1, eq2 = p["partido"]
+                probs.append(self.prob_victoria([ratings_local[j] for j in eq1],
+                                                [ratings_local[j] for j in eq2]))
+                self.actualizar(ratings_local, p)
+        finally:
+            with self._cerrojo:
+                self._soluciones.pop(clave, None)
+        return probs
+
+MOTORES_RATING = {m.nombre: m for m in (MotorTrueSkill(), MotorElo(), MotorGlicko2(), MotorWengLin(),
+                                        MotorHistoriaCompleta())}
+motor_actual = MOTORES_RATING["TrueSkill"]
+
+def actualizar_rating_sin_guardar(ratings_local, partido):
+    return motor_actual.actualizar(ratings_local, partido)
+
+def cambiar_motor_rating(nombre):
+    global motor_actual
+    motor_actual = MOTORES_RATING[nombre]
+    marcar_datos_modificados()
+    publicar_cambio("todo")
+
+def benchmark_motores(partidos=None, repeticiones=3):
+    """
+    Compara los motores sobre el historial: partidos por segundo al repetir
+    todas las seasons y calidad predictiva (log-loss, Brier y acierto) de la
+    probabilidad de victoria calculada antes de cada partido.
+    Devuelve {nombre_motor: {métrica: valor}}.
+    """
+    if partidos is None:
+        # Una season cada vez, sin dejar cargados los shards archivados
+        grupos = ([p for _, p in lista] for _, lista in resultados.recorrer_por_season())
+    else:
+        por_season = defaultdict(list)
+        for p in partidos:
+            por_season[p["season"]].append(p)
+        grupos = por_season.values()
+    n_jugadores = len(nombre_por_id)
+    n_partidos = 0
+    segundos = defaultdict(float)
+    probs = defaultdict(list)
+    aciertos = []
+    for lista in grupos:
+        lista.sort(key=lambda p: p["fecha"])
+        n_partidos += len(lista)
+        aciertos.extend(set(p["ganador_partido"]) == set(p["partido"][0]) for p in lista)
+        for nombre, motor in MOTORES_RATING.items():
+            inicio = time.perf_counter()
+            for _ in range(repeticiones):
+                motor.reproducir(lista, n_jugadores)
+            segundos[nombre] += (time.perf_counter() - inicio) / repeticiones
+            probs[nombre].extend(motor.predicciones(lista, n_jugadores))
+    aciertos = np.array(aciertos, dtype=float)
+    informe = {}
+    for nombre in MOTORES_RATING:
+        p_motor = np.clip(np.array(probs[nombre], dtype=float), 1e-9, 1 - 1e-9)
+        informe[nombre] = {
+            "partidos_por_segundo": n_partidos / segundos[nombre] if segundos[nombre] > 0 else float("inf"),
+            "log_loss": float(-np.mean(aciertos * np.log(p_motor) + (1 - aciertos) * np.log(1 - p_motor)))
+                        if n_partidos else 0.0,
+            "brier": float(np.mean((p_motor - aciertos) ** 2)) if n_partidos else 0.0,
+            "acierto": float(np.mean((p_motor > 0.5) == (aciertos == 1))) if n_partidos else 0.0,
+        }
+    return informe
+
+# Checkpoints de seasons cerradas, por motor de rating:
+# {motor: {season: {"hash", "ratings", "cambios", "podio", "participantes"}}}
+# Se cargan una vez del disco y se reescriben solo cuando cambian.
+checkpoints_seasons = None
+
+def _cargar_checkpoints():
+    global checkpoints_seasons
+    if checkpoints_seasons is None:
+        checkpoints_seasons = {}
+        archivo = resource_path("checkpoints_seasons.json")
+        if os.path.exists(archivo):
+            try:
+                with open(archivo, "r", encoding="utf-8") as f:
+                    checkpoints_seasons = json.load(f)
+            except Exception as e:
+                print("Error al leer checkpoints:", e)
+        if any("hash" in v for v in checkpoints_seasons.values()):
+            # Formato anterior (solo TrueSkill, sin separar por motor): se regenera
+            checkpoints_seasons = {}
+    return checkpoints_seasons.setdefault(motor_actual.nombre, {})
+
+def _guardar_checkpoints():
+    persistencia.reemplazar(resource_path("checkpoints_seasons.json"),
+                            json.dumps(checkpoints_seasons, separators=(",", ":")))
+
+def hash_partidos_season(lista_partidos):
+    """
+    Huella del contenido de una season (en orden de repetición) y de los
+    parámetros del motor de rating; si cualquiera cambia el checkpoint no vale.
+    """
+    h = hashlib.sha256()
+    h.update(repr(motor_actual.parametros()).encode())
+    for (_, p) in lista_partidos:
+        fila = fila_csv_resultado(p)
+        h.update("\x1f".join(str(fila[c]) for c in CAMPOS_RESULTADOS).encode("utf-8"))
+        h.update(b"\n")
+    return h.hexdigest()
+
+def hash_shard_season(tramo):
+    """Como hash_partidos_season, pero desde el hash del shard (sin leerlo)."""
+    h = hashlib.sha256()
+    h.update(repr(motor_actual.parametros()).encode())
+    h.update(tramo["sha256"].encode())
+    return h.hexdigest()
+
+def season_cerrada(season):
+    if season == SEASON_DESCONOCIDA or season >= len(temporadas):
+        return False
+    return temporadas[season]["fin"] < date.today().toordinal()
+
+class Clasificacion:
+    """
+    Ranking ordenado de una season por claves (-rating_value, id_jugador),
+    así que el orden coincide con ordenar por rating_value de mayor a menor
+    deshaciendo empates por id. Las claves van repartidas en cubetas
+    ordenadas de hasta 2 * TAM_CUBETA (como sortedcontainers): encontrar una
+    clave son dos búsquedas binarias (la cubeta, por su máximo, y la posición
+    dentro) y sacarla o meterla solo desplaza su cubeta. Mover a un jugador
+    cuesta O(log n + TAM_CUBETA) en vez del O(n) de una lista única; posicion
+    suma además el tamaño de las cubetas anteriores (O(n / TAM_CUBETA)).
+    """
+    TAM_CUBETA = 64
+
+    def __init__(self, ratings=None):
+        self._clave_de = {}
+        for pid, rating_obj in (ratings or {}).items():
+            self._clave_de[pid] = (-rating_value(rating_obj), pid)
+        claves = sorted(self._clave_de.values())
+        self._cubetas = [claves[i:i + self.TAM_CUBETA] for i in range(0, len(claves), self.TAM_CUBETA)]
+        self._maximos = [cubeta[-1] for cubeta in self._cubetas]
+
+    def _localizar(self, clave):
+        """Índice de la cubeta donde está (o iría) clave."""
+        return min(bisect_left(self._maximos, clave), len(self._cubetas) - 1)
+
+    def actualizar(self, pid, rating_obj):
+        """Coloca (o recoloca) a pid según su rating."""
+        self.quitar(pid)
+        clave = (-rating_value(rating_obj), pid)
+        self._clave_de[pid] = clave
+        if not self._cubetas:
+            self._cubetas.append([clave])
+            self._maximos.append(clave)
+            return
+        k = self._localizar(clave)
+        cubeta = self._cubetas[k]
+        insort(cubeta, clave)
+        self._maximos[k] = cubeta[-1]
+        if len(cubeta) > 2 * self.TAM_CUBETA:
+            # Se parte en dos para que ninguna crezca sin límite
+            self._cubetas[k:k + 1] = [cubeta[:self.TAM_CUBETA], cubeta[self.TAM_CUBETA:]]
+            self._maximos[k:k + 1] = [cubeta[self.TAM_CUBETA - 1], cubeta[-1]]
+
+    def quitar(self, pid):
+        clave = self._clave_de.pop(pid, None)
+        if clave is None:
+            return
+        k = self._localizar(clave)
+        cubeta = self._cubetas[k]
+        del cubeta[bisect_left(cubeta, clave)]
+        if cubeta:
+            self._maximos[k] = cubeta[-1]
+        else:
+            del self._cubetas[k]
+            del self._maximos[k]
+
+    def posicion(self, pid):
+        """Posición de pid (1 = primero) o None si no está."""
+        clave = self._clave_de.get(pid)
+        if clave is None:
+            return None
+        k = self._localizar(clave)
+        return sum(len(c) for c in self._cubetas[:k]) + bisect_left(self._cubetas[k], clave) + 1
+
+    def _recorrer_claves(self):
+        return itertools.chain.from_iterable(self._cubetas)
+
+    def rango(self, desde, hasta):
+        """[(id_jugador, rating_value)] de las posiciones desde..hasta (incluidas)."""
+        return [(pid, -negativo) for negativo, pid in
+                itertools.islice(self._recorrer_claves(), max(desde - 1, 0), max(hasta, 0))]
+
+    def top(self, k=None):
+        return self.rango(1, len(self) if k is None else k)
+
+    def podio(self):
+        return [pid for _, pid in itertools.islice(self._recorrer_claves(), 3)]
+
+    def __len__(self):
+        return len(self._clave_de)
+
+    def __iter__(self):
+        return (pid for _, pid in self._recorrer_claves())
+
+def _clasificar(season, final_dict):
+    """Crea la clasificación ordenada de la season y devuelve su podio."""
+    clasificacion = Clasificacion(final_dict)
+    clasificacion_por_season[season] = clasificacion
+    return clasificacion.podio()
+
+# Seasons repetidas partido a partido: ids en orden de repetición (fecha, id)
+# y los ratings antes de cada bloque de PARTIDOS_POR_CONTROL partidos
+# (controles[k] va antes de orden[k * PARTIDOS_POR_CONTROL]; None = ratings
+# de partida). Al editar un partido solo se repite desde el control anterior.
+# {season: {"orden": [...], "controles": [...]}}
+PARTIDOS_POR_CONTROL = 64
+repeticiones_season = {}
+
+def _orden_season(season):
+    return [idx for idx, _ in sorted(resultados.partidos_de_season(season), key=lambda x: x[1]["fecha"])]
+
+def _clave_orden(idx):
+    return (resultados[idx]["fecha"], idx)
+
+def _repetir_season(season, orden, desde=0):
+    """
+    Repite los partidos de orden desde la posición desde, partiendo del
+    último control anterior (los partidos de antes no pueden haber cambiado).
+    Guarda los cambios de cada partido y los controles nuevos, y devuelve
+    los ratings finales.
+    """
+    anterior = repeticiones_season.get(season)
+    if anterior is None:
+        k, controles = 0, [None]
+    else:
+        k = min(desde // PARTIDOS_POR_CONTROL, len(anterior["controles"]) - 1)
+        controles = anterior["controles"][:k + 1]
+    ratings_local = controles[k]
+    n_jugadores = len(nombre_por_id)
+    for inicio in range(k * PARTIDOS_POR_CONTROL, len(orden), PARTIDOS_POR_CONTROL):
+        if inicio > k * PARTIDOS_POR_CONTROL:
+            controles.append(ratings_local)
+        ids = orden[inicio:inicio + PARTIDOS_POR_CONTROL]
+        ratings_local, lista_cambios = motor_actual.reproducir([resultados[i] for i in ids], n_jugadores,
+                                                               ratings_local)
+        for idx, cambios in zip(ids, lista_cambios):
+            ts_changes_por_partido[idx] = cambios
+    repeticiones_season[season] = {"orden": orden, "controles": controles}
+    if ratings_local is None:
+        ratings_local = {pid: motor_actual.crear_rating() for pid in range(n_jugadores)}
+    return ratings_local
+
+def _limpiar_rankings():
+    repeticiones_season.clear()
+    ranking_trueskill_por_season.clear()
+    clasificacion_por_season.clear()
+    ts_changes_por_partido.clear()
+    champion_by_season.clear()
+    podio_por_season.clear()
+    ultima_fecha_por_season.clear()
+    trofeos_Liga_jugador.clear()
+    segundos_Liga_jugador.clear()
+    terceros_Liga_jugador.clear()
+
+def recalcular_trueskill_por_season():
+    global version_rankings
+    _limpiar_rankings()
+
+    # Solo se recorren los partidos en memoria; los shards se leen si hace falta
+    seasons_en_memoria = {p["season"] for p in resultados.iterar_cargados()}
+
+    checkpoints = _cargar_checkpoints()
+    checkpoints_modificados = False
+    for season in sorted(resultados.seasons()):
+        tramo = resultados.tramo_de_season(season)
+        participantes = set(ids_activos())
+        cerrada = season_cerrada(season)
+        if tramo is not None and season not in seasons_en_memoria:
+            # Season entera en su shard (ya ordenado por fecha): la huella
+            # sale del manifiesto y con checkpoint no hace falta leerlo
+            lista_partidos = None
+            ids_partidos = range(tramo["inicio"], tramo["inicio"] + tramo["filas"])
+            huella = hash_shard_season(tramo) if cerrada else None
+            ultima_fecha = tramo["ultima_fecha"]
+        else:
+            lista_partidos = resultados.partidos_de_season(season)
+            # Ordenamos por fecha para que se actualice en orden cronológico
+            lista_partidos.sort(key=lambda x: x[1]["fecha"])
+            ids_partidos = [idx for (idx, _) in lista_partidos]
+            huella = hash_partidos_season(lista_partidos) if cerrada else None
+            ultima_fecha = lista_partidos[-1][1]["fecha"]
+        # En disco los checkpoints van por nombre: sobreviven a reordenar el calendario
+        checkpoint = checkpoints.get(nombre_season(season))
+
+        if checkpoint is not None and checkpoint["hash"] == huella:
+            # Season cerrada sin cambios: no hace falta repetirla
+            ratings_local = {int(pid): motor_actual.desde_lista(valores)
+                             for pid, valores in checkpoint["ratings"].items()}
+            for idx, cambios in zip(ids_partidos, checkpoint["cambios"]):
+                ts_changes_por_partido[idx] = {int(pid): d for pid, d in cambios.items()}
+            participantes.update(ratings_local)
+            final_dict = {pid: ratings_local[pid] if pid in ratings_local else motor_actual.crear_rating()
+                          for pid in sorted(participantes)}
+            podio = checkpoint["podio"]
+            podio_ordenado = _clasificar(season, final_dict)
+            if set(final_dict) != set(checkpoint["participantes"]):
+                # Han cambiado los jugadores activos: el podio se recalcula
+                podio = podio_ordenado
+        else:
+            mapa = None
+            if lista_partidos is None and not motor_actual.historia_completa:
+                # Season entera en su shard: se repite desde el registro mapeado, sin leerlo
+                mapa = asegurar_registro()
+            # Partimos de un rating inicial para cada jugador (también los
+            # eliminados, que pueden aparecer en partidos antiguos)
+            if mapa is not None:
+                tramo_registro = mapa[ids_partidos.start:ids_partidos.stop]
+                ratings_local, lista_cambios = motor_actual.reproducir_arrays(
+                    tramo_registro["jugadores"].astype(np.int64), tramo_registro["gana"] == 1, len(nombre_por_id))
+                for idx, cambios in zip(ids_partidos, lista_cambios):
+                    ts_changes_por_partido[idx] = cambios
+            else:
+                if lista_partidos is None:
+                    lista_partidos = resultados.partidos_de_season(season)
+                    ids_partidos = [idx for (idx, _) in lista_partidos]
+                if motor_actual.historia_completa:
+                    ratings_local, lista_cambios = motor_actual.reproducir(
+                        [p for (_, p) in lista_partidos], len(nombre_por_id))
+                    for idx, cambios in zip(ids_partidos, lista_cambios):
+                        ts_changes_por_partido[idx] = cambios
+                else:
+                    # Con controles cada PARTIDOS_POR_CONTROL partidos, para poder editar
+                    ratings_local = _repetir_season(season, ids_partidos)
+            jugaron = set()
+            for idx in ids_partidos:
+                jugaron.update(ts_changes_por_partido[idx])
+            participantes.update(jugaron)
+            final_dict = {pid: ratings_local[pid] for pid in sorted(participantes)}
+            podio = _clasificar(season, final_dict)
+            if cerrada:
+                checkpoints[nombre_season(season)] = {
+                    "hash": huella,
+                    "ratings": {pid: motor_actual.a_lista(ratings_local[pid])
+                                for pid in sorted(jugaron)},
+                    "cambios": [ts_changes_por_partido[idx] for idx in ids_partidos],
+                    "podio": podio,
+                    "participantes": sorted(final_dict),
+                }
+                checkpoints_modificados = True
+        ranking_trueskill_por_season[season] = final_dict
+        ultima_fecha_por_season[season] = ultima_fecha
+        _actualizar_podio(season, podio)
+
+    if checkpoints_modificados:
+        # Ida y vuelta por JSON para que las claves queden igual que al leer
+        checkpoints_seasons[motor_actual.nombre] = json.loads(json.dumps(checkpoints))
+        _guardar_checkpoints()
+    version_rankings = version_datos
+
+def _actualizar_podio(season, podio):
+    """Sustituye el podio de la season y ajusta los contadores de puestos."""
+    contadores = (trofeos_Liga_jugador, segundos_Liga_jugador, terceros_Liga_jugador)
+    for contador, jug in zip(contadores, podio_por_season.get(season, [])):
+        contador[jug] -= 1
+    for contador, jug in zip(contadores, podio):
+        contador[jug] += 1
+    podio_por_season[season] = list(podio)
+    if podio:
+        champion_by_season[season] = podio[0]
+
+def asegurar_rankings():
+    """Recalcula los rankings solo si los datos han cambiado desde la última vez."""
+    if version_rankings != version_datos:
+        recalcular_trueskill_por_season()
+
+def _aplicar_partido_a_rankings(idx, partido):
+    """
+    Aplica un partido nuevo sobre los ratings ya calculados de su season.
+    Solo es válido si llega en orden cronológico; devuelve False si hace
+    falta repetir la season entera.
+    """
+    season = partido["season"]
+    if motor_actual.historia_completa:
+        return _rehacer_season_historia_completa(season)
+    repeticion = repeticiones_season.get(season)
+    if season in ultima_fecha_por_season and partido["fecha"] < ultima_fecha_por_season[season]:
+        if repeticion is None:
+            return False
+        # Llega fuera de orden: se repite la season solo desde donde encaja
+        orden = repeticion["orden"]
+        desde = bisect_left(orden, _clave_orden(idx), key=_clave_orden)
+        orden.insert(desde, idx)
+        return _rehacer_season_desde(season, orden, desde)
+    final_dict = ranking_trueskill_por_season.get(season)
+    if final_dict is None:
+        final_dict = {pid: motor_actual.crear_rating() for pid in sorted(ids_activos())}
+        ranking_trueskill_por_season[season] = final_dict
+        _clasificar(season, final_dict)
+        repeticion = repeticiones_season[season] = {"orden": [], "controles": [None]}
+    if repeticion is not None:
+        if repeticion["orden"] and len(repeticion["orden"]) % PARTIDOS_POR_CONTROL == 0:
+            repeticion["controles"].append(dict(final_dict))
+        repeticion["orden"].append(idx)
+    for pid in partido["partido"][0] + partido["partido"][1]:
+        if pid not in final_dict:
+            final_dict[pid] = motor_actual.crear_rating()
+    ts_changes_por_partido[idx] = actualizar_rating_sin_guardar(final_dict, partido)
+    ultima_fecha_por_season[season] = partido["fecha"]
+    # Solo se mueven los cuatro jugadores del partido
+    clasificacion = clasificacion_por_season[season]
+    for pid in partido["partido"][0] + partido["partido"][1]:
+        clasificacion.actualizar(pid, final_dict[pid])
+    podio = clasificacion.podio()
+    if podio != podio_por_season.get(season):
+        _actualizar_podio(season, podio)
+    return True
+
+def _quitar_season_de_rankings(season):
+    """La season se ha quedado sin partidos."""
+    _actualizar_podio(season, [])
+    for diccionario in (ranking_trueskill_por_season, clasificacion_por_season, podio_por_season,
+                        champion_by_season, ultima_fecha_por_season, repeticiones_season):
+        diccionario.pop(season, None)
+
+def _rehacer_season_desde(season, orden, desde):
+    """
+    Repite la season (con orden ya corregido) desde la posición desde y
+    actualiza su ranking, clasificación, podio y última fecha.
+    """
+    if not orden:
+        _quitar_season_de_rankings(season)
+        return True
+    if motor_actual.historia_completa:
+        return _rehacer_season_historia_completa(season)
+    ratings_local = _repetir_season(season, orden, desde)
+    participantes = set(ids_activos())
+    for idx in orden:
+        participantes.update(ts_changes_por_partido[idx])
+    final_dict = {pid: ratings_local[pid] for pid in sorted(participantes)}
+    ranking_trueskill_por_season[season] = final_dict
+    ultima_fecha_por_season[season] = resultados[orden[-1]]["fecha"]
+    _actualizar_podio(season, _clasificar(season, final_dict))
+    return True
+
+def _rehacer_season_historia_completa(season):
+    """
+    Con un motor de historia completa un partido nuevo cambia toda la
+    trayectoria de la season: se vuelve a resolver solo esa season, partiendo
+    de la solución anterior, y se sustituyen sus ratings y cambios.
+    """
+    lista_partidos = sorted(resultados.partidos_de_season(season), key=lambda x: x[1]["fecha"])
+    ratings_local, lista_cambios = motor_actual.reproducir(
+        [p for (_, p) in lista_partidos], len(nombre_por_id))
+    participantes = set(ids_activos())
+    for (idx, _), cambios in zip(lista_partidos, lista_cambios):
+        ts_changes_por_partido[idx] = cambios
+        participantes.update(cambios)
+    final_dict = {pid: ratings_local[pid] for pid in sorted(participantes)}
+    ranking_trueskill_por_season[season] = final_dict
+    ultima_fecha_por_season[season] = lista_partidos[-1][1]["fecha"]
+    _actualizar_podio(season, _clasificar(season, final_dict))
+    return True
+
+def incorporar_partido(resultado):
+    """
+    Añade un partido nuevo al estado en memoria. Si los rankings estaban
+    al día se actualizan solo con ese partido en lugar de recalcularlo todo.
+    Devuelve el índice del partido.
+    """
+    global version_rankings, version_cruces, version_indices, version_forma, version_registro, version_huellas
+    al_dia = version_rankings == version_datos
+    cruces_al_dia = version_cruces == version_datos
+    indices_al_dia = version_indices == version_datos
+    forma_al_dia = version_forma == version_datos
+    registro_al_dia = version_registro == version_datos
+    huellas_al_dia = version_huellas == version_datos
+    season = resultado["season"]
+    # Fuera de orden (o con historia completa) se repite la season: cambian más ratings
+    repite = motor_actual.historia_completa or (season in ultima_fecha_por_season and
+                                                resultado["fecha"] < ultima_fecha_por_season[season])
+    idx = len(resultados)
+    resultados.append(resultado)
+    marcar_datos_modificados()
+    publicar_cambio("nuevo", idx, [resultado], repite=repite)
+    if huellas_al_dia:
+        _contar_huella(resultado, 1)
+        version_huellas = version_datos
+    if registro_al_dia and _anexar_al_registro(idx, resultado):
+        version_registro = version_datos
+    if al_dia and _aplicar_partido_a_rankings(idx, resultado):
+        version_rankings = version_datos
+    if cruces_al_dia:
+        _sumar_partido_a_cruces(resultado)
+        version_cruces = version_datos
+    if indices_al_dia:
+        _indexar_partido(idx, resultado)
+        version_indices = version_datos
+    if forma_al_dia and version_rankings == version_datos and _anotar_forma_si_en_orden(idx, resultado):
+        version_forma = version_datos
+    return idx
+
+# ---------------------------------
+# NUEVO: Edición y borrado de partidos
+# ---------------------------------
+# Solo se pueden tocar los partidos de resultados.csv (los de los shards son
+# de seasons cerradas y archivadas). Al editar, borrar o reinsertar un
+# partido su season se repite desde el control anterior al partido, y el
+# resto de estructuras se corrige solo en lo que depende de él. Borrar e
+# insertar renumeran los partidos posteriores. Cada operación guarda la
+# inversa para poder deshacerla.
+
+MAX_DESHACER = 50
+deshacer_partidos = deque(maxlen=MAX_DESHACER)   # [(tipo, idx, partido)] operaciones inversas
+
+def _desplazar_ids(desde, delta):
+    """Renumera los partidos >= desde en delta (+1 al insertar, -1 al borrar)."""
+    for k in sorted((k for k in ts_changes_por_partido if k >= desde), reverse=delta > 0):
+        ts_changes_por_partido[k + delta] = ts_changes_por_partido.pop(k)
+    for repeticion in repeticiones_season.values():
+        repeticion["orden"] = [i + delta if i >= desde else i for i in repeticion["orden"]]
+
+def _desplazar_bits(datos, idx, delta):
+    """
+    Abre un hueco en el bit idx (delta = +1) o lo quita (delta = -1) moviendo
+    en su sitio solo los bytes desde idx. Devuelve el array (otro si ha
+    tenido que crecer para no perder el último bit).
+    """
+    byte, desde = idx >> 3, idx & 7
+    if byte >= len(datos):
+        return datos
+    if delta > 0 and datos[-1] >> 7:
+        datos = _ampliar_bits(datos, 8 * len(datos) + 1)
+    cola = datos[byte:]
+    bajos = int(cola[0]) & ((1 << desde) - 1)
+    acarreo = np.zeros_like(cola)
+    if delta > 0:
+        acarreo[1:] = cola[:-1] >> 7
+        np.left_shift(cola, 1, out=cola)
+        altos = (0xFF << (desde + 1)) & 0xFF
+    else:
+        acarreo[:-1] = (cola[1:] & 1) << 7
+        np.right_shift(cola, 1, out=cola)
+        altos = (0xFF << desde) & 0xFF
+    cola |= acarreo
+    cola[0] = bajos | (int(cola[0]) & altos)
+    return datos
+
+def _anotar_repeticion(afectadas, season, desde):
+    """Anota que season se ha de repetir desde esa posición (None = entera)."""
+    if desde is None:
+        # Se repetirá entera desde _orden_season: su orden ya no se mantiene
+        repeticiones_season.pop(season, None)
+        afectadas[season] = None
+    elif season not in afectadas:
+        afectadas[season] = desde
+    elif afectadas[season] is not None:
+        afectadas[season] = min(afectadas[season], desde)
+
+def _repetir_afectadas(afectadas):
+    global version_rankings
+    repetidas = True
+    for season, desde in afectadas.items():
+        if desde is None:
+            orden, desde = _orden_season(season), 0
+        else:
+            orden = repeticiones_season[season]["orden"]
+        repetidas = _rehacer_season_desde(season, orden, desde) and repetidas
+    if repetidas:
+        version_rankings = version_datos
+
+def _cambiar_partido(tipo, idx, nuevo=None, afectadas=None):
+    """
+    tipo "editar" sustituye el partido idx por nuevo, "borrar" lo quita e
+    "insertar" pone nuevo en la posición idx. Devuelve el partido anterior
+    (None al insertar). Para varios cambios seguidos se pasa un dict en
+    afectadas: ahí se anotan las seasons a repetir y se repiten una sola vez
+    al final con _repetir_afectadas.
+    """
+    global version_cruces, version_indices, version_registro, version_huellas
+    ultimo = len(resultados) if tipo == "insertar" else len(resultados) - 1
+    if idx > ultimo or idx < 0:
+        raise ValueError(f"No existe el partido {idx}.")
+    if idx < resultados.inicio_vivos:
+        raise ValueError("El partido es de una season archivada y no se puede modificar.")
+    en_lote = afectadas is not None
+    al_dia = en_lote or version_rankings == version_datos
+    cruces_al_dia = version_cruces == version_datos
+    indices_al_dia = version_indices == version_datos
+    registro_al_dia = version_registro == version_datos
+    huellas_al_dia = version_huellas == version_datos
+    anterior = None if tipo == "insertar" else resultados[idx]
+
+    # Seasons que hay que repetir y desde qué posición (None = entera)
+    if not en_lote:
+        afectadas = {}
+    if al_dia and anterior is not None:
+        repeticion = repeticiones_season.get(anterior["season"])
+        desde = None
+        if repeticion is not None:
+            desde = repeticion["orden"].index(idx)
+            del repeticion["orden"][desde]
+        _anotar_repeticion(afectadas, anterior["season"], desde)
+
+    posicion = idx - resultados.inicio_vivos
+    if tipo == "editar":
+        resultados.vivos[posicion] = nuevo
+    elif tipo == "borrar":
+        del resultados.vivos[posicion]
+        ts_changes_por_partido.pop(idx, None)
+        _desplazar_ids(idx + 1, -1)
+    else:
+        _desplazar_ids(idx, 1)
+        resultados.vivos.insert(posicion, nuevo)
+    marcar_datos_modificados()
+    publicar_cambio({"editar": "editado", "borrar": "borrado", "insertar": "insertado"}[tipo], idx,
+                    [p for p in (anterior, nuevo) if p is not None], repite=True)
+
+    if al_dia and nuevo is not None:
+        repeticion = repeticiones_season.get(nuevo["season"])
+        desde = None
+        if repeticion is not None:
+            desde = bisect_left(repeticion["orden"], _clave_orden(idx), key=_clave_orden)
+            repeticion["orden"].insert(desde, idx)
+        _anotar_repeticion(afectadas, nuevo["season"], desde)
+    if al_dia and not en_lote:
+        _repetir_afectadas(afectadas)
+
+    if cruces_al_dia:
+        if anterior is not None:
+            _sumar_partido_a_cruces(anterior, -1)
+        if nuevo is not None:
+            _sumar_partido_a_cruces(nuevo)
+        version_cruces = version_datos
+    if indices_al_dia:
+        if anterior is not None:
+            _indexar_partido(idx, anterior, quitar=True)
+        if tipo != "editar":
+            for indice_bits in indices_partidos.values():
+                for clave, bits in indice_bits.items():
+                    indice_bits[clave] = _desplazar_bits(bits, idx, 1 if tipo == "insertar" else -1)
+        if nuevo is not None:
+            _indexar_partido(idx, nuevo)
+        version_indices = version_datos
+    if huellas_al_dia:
+        if anterior is not None:
+            _contar_huella(anterior, -1)
+        if nuevo is not None:
+            _contar_huella(nuevo, 1)
+        version_huellas = version_datos
+    # Al borrar o insertar, asegurar_registro reescribirá el registro desde idx
+    if tipo == "editar" and registro_al_dia and _sobrescribir_en_registro(idx, nuevo):
+        version_registro = version_datos
+    return anterior
+
+def _aplicar_y_guardar(tipo, idx, nuevo=None):
+    # Antes, las filas de otros equipos: el archivo se reescribe entero
+    comprobar_resultados_externos()
+    anterior = _cambiar_partido(tipo, idx, nuevo)
+    reescribir_resultados_csv()
+    return anterior
+
+def editar_partido(idx, nuevo):
+    anterior = _aplicar_y_guardar("editar", idx, nuevo)
+    deshacer_partidos.append(("editar", idx, anterior))
+
+def borrar_partido(idx):
+    anterior = _aplicar_y_guardar("borrar", idx)
+    deshacer_partidos.append(("insertar", idx, anterior))
+
+def deshacer_edicion():
+    """Deshace la última edición o borrado. Devuelve False si no había nada."""
+    if not deshacer_partidos:
+        return False
+    tipo, idx, partido = deshacer_partidos.pop()
+    _aplicar_y_guardar(tipo, idx, partido)
+    return True
+
+# ---------------------------------
+# NUEVO: Partidos duplicados
+# ---------------------------------
+# La huella de un partido resume fecha, parejas (ordenadas), sets y lugar,
+# así que no depende del orden en que se apuntaron los equipos. Se cuentan
+# por season en Counters ({season: Counter(huella)}), que se construyen al
+# consultar una season y luego se actualizan con cada alta, edición o borrado.
+
+huellas_por_season = {}
+version_huellas = -1
+
+def _invertir_set(set_str):
+    """Da la vuelta a un set: 6-4 -> 4-6, 7-6(5) -> 6-7(5)."""
+    juegos = set_str.split("(")[0]
+    a, guion, b = juegos.partition("-")
+    if not guion:
+        return set_str
+    return f"{b.strip()}-{a.strip()}{set_str[len(juegos):]}"
+
+def huella_partido(p):
+    equipos = [tuple(sorted(-1 if j is None else j for j in eq)) for eq in p["partido"]]
+    sets = [t.strip() for t in p["puntuaciones"]]
+    if equipos[1] < equipos[0]:
+        # Orden canónico: los sets se leen desde el equipo que queda primero
+        equipos.reverse()
+        sets = [_invertir_set(t) for t in sets]
+    texto = "\x1f".join([p["fecha"], repr(equipos), ";".join(sets), p["lugar"]])
+    return hashlib.blake2b(texto.encode("utf-8"), digest_size=16).digest()
+
+def huellas_season(season):
+    global version_huellas
+    if version_huellas != version_datos:
+        huellas_por_season.clear()
+        version_huellas = version_datos
+    if season not in huellas_por_season:
+        huellas_por_season[season] = Counter(huella_partido(p) for _, p in resultados.partidos_de_season(season))
+    return huellas_por_season[season]
+
+def es_duplicado(partido):
+    """True si ya hay registrado un partido con la misma huella."""
+    return huellas_season(partido["season"])[huella_partido(partido)] > 0
+
+def _contar_huella(partido, delta):
+    """Ajusta el contador de la season del partido, si ya estaba construido."""
+    contador = huellas_por_season.get(partido["season"])
+    if contador is not None:
+        h = huella_partido(partido)
+        contador[h] += delta
+        if contador[h] <= 0:
+            del contador[h]
+
+def buscar_duplicados():
+    """
+    Ids de los partidos de resultados.csv iguales a otro anterior (de
+    resultados.csv o de los shards); el primero de cada grupo se queda.
+    """
+    vistos = set()
+    for season in {p["season"] for p in resultados.vivos}:
+        tramo = resultados.tramo_de_season(season)
+        if tramo is not None:
+            vistos.update(huella_partido(p) for p in resultados.cargar(tramo))
+    duplicados = []
+    for k, p in enumerate(resultados.vivos):
+        h = huella_partido(p)
+        if h in vistos:
+            duplicados.append(resultados.inicio_vivos + k)
+        else:
+            vistos.add(h)
+    return duplicados
+
+def quitar_duplicados(ids):
+    """Borra los partidos ids (se pueden deshacer uno a uno) y reescribe resultados.csv."""
+    # Las seasons tocadas se repiten una sola vez, desde el primer partido borrado
+    afectadas = {} if version_rankings == version_datos else None
+    for idx in sorted(ids, reverse=True):
+        deshacer_partidos.append(("insertar", idx, _cambiar_partido("borrar", idx, afectadas=afectadas)))
+    if afectadas is not None:
+        _repetir_afectadas(afectadas)
+    reescribir_resultados_csv()
+
+# ---------------------------------
+# NUEVO: Seguimiento de resultados.csv compartido
+# ---------------------------------
+# Varias personas registran partidos en el mismo resultados.csv desde otros
+# equipos. Se recuerda hasta qué byte se ha leído y solo se parsean las
+# filas añadidas después; si el archivo se ha truncado o reescrito se
+# recarga entero.
+INTERVALO_SEGUIMIENTO_MS = 3000
+TAM_FIRMA = 256
+cabecera_resultados = list(CAMPOS_RESULTADOS)
+# generacion: la de resultados.csv cuando se leyó (ver _generacion_resultados)
+estado_seguimiento = {"offset": 0, "cabeza": b"", "cola": b"", "generacion": 0}
+# Filas que hemos escrito nosotros (bytes de la línea): al leerlas del archivo se saltan
+filas_propias = Counter()
+# Avisos del hilo de escritura (reescrituras que chocaron con las de otra instancia)
+conflictos_escritura = []
+
+def _mtime_jugadores():
+    archivo_jugadores = resource_path("jugadores.json")
+    return os.path.getmtime(archivo_jugadores) if os.path.exists(archivo_jugadores) else None
+
+def _marcar_leido_hasta(datos, tam=None, cola=None):
+    """Leído hasta el final de datos (o, sin tenerlos enteros, hasta tam con su cabeza y cola)."""
+    estado_seguimiento["offset"] = len(datos) if tam is None else tam
+    estado_seguimiento["cabeza"] = datos[:TAM_FIRMA]
+    estado_seguimiento["cola"] = (datos if cola is None else cola)[-TAM_FIRMA:]
+
+def _ruta_generacion():
+    return resource_path("resultados.csv.version")
+
+def _generacion_resultados():
+    """
+    Cuántas veces se ha reescrito resultados.csv, por cualquier instancia.
+    Añadir filas no la cambia; si difiere de la que teníamos al leer, lo
+    leído ya no vale. (El inodo no sirve: el sistema lo reutiliza enseguida.)
+    """
+    try:
+        with open(_ruta_generacion(), "r", encoding="utf-8") as f:
+            return int(f.read() or 0)
+    except (OSError, ValueError):
+        return 0
+
+def _marcar_leido_archivo(ruta, tam, generacion=None):
+    """Leído resultados.csv hasta el byte tam (0 = vacío o inexistente), de esa generación."""
+    estado_seguimiento["generacion"] = _generacion_resultados() if generacion is None else generacion
+    if not tam:
+        _marcar_leido_hasta(b"")
+        return
+    with open(ruta, mode="rb") as file:
+        cabeza = file.read(min(TAM_FIRMA, tam))
+        file.seek(max(tam - TAM_FIRMA, 0))
+        _marcar_leido_hasta(cabeza, tam, file.read(tam - file.tell()))
+
+def _archivo_reescrito(file, tam, estado=estado_seguimiento):
+    offset = estado["offset"]
+    cabeza = estado["cabeza"]
+    cola = estado["cola"]
+    # La cabeza y la cola cubren además los cambios hechos a mano
+    if _generacion_resultados() != estado["generacion"]:
+        return True
+    if tam < offset:
+        return True
+    file.seek(0)
+    if file.read(len(cabeza)) != cabeza:
+        return True
+    file.seek(offset - len(cola))
+    return file.read(len(cola)) != cola
+
+def _releer_jugadores_si_cambiaron():
+    """Relee jugadores.json si otra instancia lo ha escrito; devuelve si lo ha hecho."""
+    if _mtime_jugadores() == estado_seguimiento.get("mtime_jugadores"):
+        return False
+    n_ids = len(nombre_por_id)
+    leer_jugadores()
+    while len(nombre_por_id) < n_ids:
+        internar_jugador(f"#{len(nombre_por_id)}", activo=False)
+    publicar_cambio("jugadores")
+    return True
+
+def comprobar_resultados_externos():
+    """
+    Incorpora las filas añadidas a resultados.csv por otras instancias.
+    Devuelve el número de partidos nuevos, o -1 si hubo que recargar todo.
+    """
+    archivo_resultados = resource_path("resultados.csv")
+    if persistencia.pendiente(archivo_resultados) or persistencia.pendiente(resource_path("jugadores.json")):
+        # Nuestras escrituras aún no están en disco: se mira en la próxima vuelta
+        return 0
+    if _releer_jugadores_si_cambiaron():
+        marcar_datos_modificados()
+        notificar_cambios()
+    if not os.path.exists(archivo_resultados):
+        return 0
+    with open(archivo_resultados, mode='rb') as file:
+        tam = os.fstat(file.fileno()).st_size
+        offset = estado_seguimiento["offset"]
+        recargar = offset == 0 or _archivo_reescrito(file, tam)
+        if not recargar:
+            if tam == offset:
+                return 0
+            file.seek(offset)
+            pendiente = file.read(tam - offset)
+    if recargar:
+        filas_propias.clear()
+        # Los ids de los partidos pueden haber cambiado
+        deshacer_partidos.clear()
+        leer_jugadores()
+        leer_resultados()
+        publicar_cambio("todo")
+        notificar_cambios()
+        return -1
+
+    # Solo líneas completas: la última puede estar escribiéndose todavía
+    fin = pendiente.rfind(b"\n") + 1
+    if fin == 0:
+        return 0
+    nuevos = pendiente[:fin]
+    estado_seguimiento["offset"] += fin
+    estado_seguimiento["cola"] = (estado_seguimiento["cola"] + nuevos)[-TAM_FIRMA:]
+
+    # Otra instancia puede haber dado de alta jugadores que salen en las filas nuevas
+    _releer_jugadores_si_cambiaron()
+    externas = []
+    for linea in nuevos.split(b"\n")[:-1]:
+        clave = linea.rstrip(b"\r")
+        if filas_propias[clave] > 0:
+            filas_propias[clave] -= 1
+            continue
+        externas.append(linea + b"\n")
+    reader = csv.DictReader(io.StringIO(b"".join(externas).decode('utf-8'), newline=''),
+                            fieldnames=cabecera_resultados)
+    n_nuevos = 0
+    for row in reader:
+        try:
+            _comprobar_columnas(row)
+            resultado, _ = parsear_fila_resultado(row)
+        except Exception as e:
+            # Sin número de línea: la fila llega por el seguimiento, no en una lectura completa
+            rechazos_resultados.append(RechazoFila(None, str(e)))
+            continue
+        incorporar_partido(resultado)
+        n_nuevos += 1
+    if n_nuevos:
+        notificar_cambios()
+    return n_nuevos
+
+# ---------------------------------
+# NUEVO: Instantánea de los datos cargados
+# ---------------------------------
+# instantanea.bin guarda, junto a los datos, todo lo que deja el arranque:
+# jugadores, partidos de resultados.csv, torneos y los rankings con sus
+# cambios y podios. Su clave es la huella (tamaño, mtime y sha256) de los
+# archivos de los que sale, el motor de rating y la versión de Python. Si al
+# arrancar la clave cuadra se carga de golpe con marshal sin parsear ni
+# repetir nada; si no, se hace la carga normal y la instantánea se reescribe
+# en segundo plano. Es una caché: borrarla solo cuesta un arranque lento.
+
+MAGIA_INSTANTANEA = b"PDLSNAP1"
+FORMATO_INSTANTANEA = 2
+ARCHIVOS_FUENTE = ("jugadores.json", "resultados.csv", "torneos.csv", "temporadas.json")
+# version_datos que refleja instantanea.bin (-1 = ninguna)
+version_instantanea = -1
+
+def _huella_archivo(ruta):
+    """[tamaño, mtime_ns, sha256] del archivo, o None si no existe."""
+    try:
+        info = os.stat(ruta)
+        h = hashlib.sha256()
+        with open(ruta, "rb") as f:
+            for bloque in iter(lambda: f.read(1 << 20), b""):
+                h.update(bloque)
+    except OSError:
+        return None
+    return [info.st_size, info.st_mtime_ns, h.hexdigest()]
+
+def clave_instantanea():
+    fuentes = {nombre: _huella_archivo(resource_path(nombre)) for nombre in ARCHIVOS_FUENTE}
+    carpeta = resource_path(CARPETA_SEASONS)
+    if os.path.isdir(carpeta):
+        for nombre in sorted(os.listdir(carpeta)):
+            if not nombre.endswith(".tmp"):
+                fuentes[f"{CARPETA_SEASONS}/{nombre}"] = _huella_archivo(os.path.join(carpeta, nombre))
+    return {
+        "formato": FORMATO_INSTANTANEA,
+        "python": [marshal.version, *sys.version_info[:2]],
+        # Al cambiar de season hay que archivar la anterior: carga normal
+        "season_actual": season_actual(),
+        "motor": motor_actual.nombre,
+        "parametros": repr(motor_actual.parametros()),
+        "fuentes": fuentes,
+    }
+
+def _estado_instantanea():
+    return {
+        "nombres": list(nombre_por_id),
+        "activos": list(activo_por_id),
+        "cabecera": list(cabecera_resultados),
+        "partidos": resultados.vivos,
+        "rechazos": [tuple(r) for r in rechazos_resultados],
+        "torneos": list(torneo_winners),
+        "ratings": {season: {pid: motor_actual.a_lista(r) for pid, r in final_dict.items()}
+                    for season, final_dict in ranking_trueskill_por_season.items()},
+        "cambios": ts_changes_por_partido,
+        "podios": podio_por_season,
+        "ultima_fecha": ultima_fecha_por_season,
+        "repeticiones": {season: {"orden": r["orden"],
+                                  "controles": [None if c is None else
+                                                {pid: motor_actual.a_lista(v) for pid, v in c.items()}
+                                                for c in r["controles"]]}
+                         for season, r in repeticiones_season.items()},
+    }
+
+def _seguimiento_al_dia():
+    """True si lo que hay en memoria es justo lo que hay en resultados.csv y jugadores.json."""
+    archivo_resultados = resource_path("resultados.csv")
+    tam = os.path.getsize(archivo_resultados) if os.path.exists(archivo_resultados) else 0
+    return (tam == estado_seguimiento["offset"]
+            and _mtime_jugadores() == estado_seguimiento.get("mtime_jugadores"))
+
+def guardar_instantanea(en_segundo_plano=False):
+    """
+    Serializa el estado actual y lo escribe en instantanea.bin. La huella de
+    los archivos se toma cuando ya está en disco todo lo pendiente; si mientras
+    tanto han cambiado los datos, o hay filas de otros equipos aún sin leer,
+    no se escribe (ya se hará al cerrar).
+    """
+    asegurar_rankings()
+    version = version_datos
+    estado = marshal.dumps(_estado_instantanea())
+
+    def escribir():
+        global version_instantanea
+        persistencia.vaciar()
+        if version != version_datos or not _seguimiento_al_dia():
+            return
+        clave = json.dumps(clave_instantanea(), separators=(",", ":")).encode()
+        if version != version_datos:
+            return
+        persistencia.reemplazar(resource_path("instantanea.bin"),
+                                MAGIA_INSTANTANEA + struct.pack("<I", len(clave)) + clave + estado)
+        version_instantanea = version
+
+    if en_segundo_plano:
+        threading.Thread(target=escribir, name="instantanea", daemon=True).start()
+    else:
+        escribir()
+
+def cargar_instantanea():
+    """Carga el estado de instantanea.bin si su clave cuadra con los archivos. Devuelve si lo ha hecho."""
+    global version_rankings, version_instantanea
+    try:
+        with open(resource_path("instantanea.bin"), "rb") as f:
+            if f.read(len(MAGIA_INSTANTANEA)) != MAGIA_INSTANTANEA:
+                return False
+            (tam_clave,) = struct.unpack("<I", f.read(4))
+            if json.loads(f.read(tam_clave)) != clave_instantanea():
+                return False
+            with recolector_en_pausa(congelar=True):
+                estado = marshal.loads(f.read())
+    except (OSError, ValueError, EOFError, TypeError, struct.error):
+        return False
+
+    nombre_por_id[:] = estado["nombres"]
+    activo_por_id[:] = estado["activos"]
+    id_por_nombre.clear()
+    id_por_nombre.update((nombre, pid) for pid, nombre in enumerate(nombre_por_id))
+    refrescar_lista_jugadores()
+    jugadores_modificados.clear()
+    estado_seguimiento["mtime_jugadores"] = _mtime_jugadores()
+
+    resultados.clear()
+    leer_manifiesto_seasons()
+    resultados.vivos = estado["partidos"]
+    cabecera_resultados[:] = estado["cabecera"]
+    rechazos_resultados[:] = [RechazoFila(*r) for r in estado["rechazos"]]
+    filas_propias.clear()
+    archivo_resultados = resource_path("resultados.csv")
+    _marcar_leido_archivo(archivo_resultados,
+                          os.path.getsize(archivo_resultados) if os.path.exists(archivo_resultados) else 0)
+    torneo_winners[:] = estado["torneos"]
+
+    _limpiar_rankings()
+    ts_changes_por_partido.update(estado["cambios"])
+    for season, ratings in estado["ratings"].items():
+        final_dict = {pid: motor_actual.desde_lista(valores) for pid, valores in ratings.items()}
+        ranking_trueskill_por_season[season] = final_dict
+        _clasificar(season, final_dict)
+        ultima_fecha_por_season[season] = estado["ultima_fecha"][season]
+        _actualizar_podio(season, estado["podios"][season])
+    for season, r in estado["repeticiones"].items():
+        repeticiones_season[season] = {
+            "orden": r["orden"],
+            "controles": [None if c is None else
+                          {pid: motor_actual.desde_lista(v) for pid, v in c.items()}
+                          for c in r["controles"]],
+        }
+    marcar_datos_modificados()
+    version_rankings = version_instantanea = version_datos
+    return True
+
+def cargar_datos():
+    """
+    Carga jugadores, partidos, torneos y rankings: de la instantánea si vale
+    y, si no, leyendo los archivos (y rehaciendo la instantánea en segundo
+    plano). Devuelve las filas rechazadas de resultados.csv.
+    """
+    if not cargar_instantanea():
+        leer_jugadores()
+        leer_resultados()
+        leer_torneos()
+        asegurar_rankings()
+        guardar_instantanea(en_segundo_plano=True)
+    return rechazos_resultados
+
+# ---------------------------------
+# NUEVO: Sinergia de parejas
+# ---------------------------------
+# La sinergia de una pareja es lo que rinde por encima de lo que predicen
+# los ratings individuales de sus dos jugadores, en unidades logit:
+#   P(gana eq1) = sigmoide(logit(p_motor) + sinergia(eq1) - sinergia(eq2))
+# Se ajusta por season con regresión logística regularizada (L2) sobre las
+# parejas que han jugado juntas, que son las únicas que se guardan.
+PRECISION_SINERGIA = 4.0   # prior N(0, 0.5²) sobre cada sinergia
+
+sinergias_por_season = {}  # {season: {(id_a, id_b): (sinergia, partidos_juntos)}}
+version_sinergias = -1
+
+def _clave_pareja(equipo):
+    return tuple(sorted(equipo))
+
+def ajustar_sinergias(partidos, ratings_season, tolerancia=1e-8):
+    """
+    Ajusta la sinergia de cada pareja que aparece en partidos con Newton
+    sobre la verosimilitud logística. El sistema de cada paso se resuelve
+    con gradiente conjugado sin formar la matriz (cada partido toca solo dos
+    parejas), así que el coste crece con los partidos y no con N².
+    """
+    if not partidos:
+        return {}
+
+    def rating_de(pid):
+        return ratings_season[pid] if pid in ratings_season else motor_actual.crear_rating()
+
+    indice = {}
+    col1 = np.empty(len(partidos), dtype=np.int64)
+    col2 = np.empty(len(partidos), dtype=np.int64)
+    base = np.empty(len(partidos))
+    y = np.empty(len(partidos))
+    for k, p in enumerate(partidos):
+        eq1, eq2 = p["partido"]
+        col1[k] = indice.setdefault(_clave_pareja(eq1), len(indice))
+        col2[k] = indice.setdefault(_clave_pareja(eq2), len(indice))
+        prob = motor_actual.prob_victoria([rating_de(j) for j in eq1], [rating_de(j) for j in eq2])
+        prob = min(max(prob, 1e-9), 1 - 1e-9)
+        base[k] = math.log(prob / (1 - prob))
+        y[k] = set(p["ganador_partido"]) == set(eq1)
+    n = len(indice)
+
+    def X(v):
+        return v[col1] - v[col2]
+
+    def Xt(u):
+        return np.bincount(col1, u, n) - np.bincount(col2, u, n)
+
+    beta = np.zeros(n)
+    for _ in range(50):
+        prob = 1.0 / (1.0 + np.exp(-(base + X(beta))))
+        peso = prob * (1 - prob)
+        grad = Xt(y - prob) - PRECISION_SINERGIA * beta
+        diag = np.bincount(col1, peso, n) + np.bincount(col2, peso, n) + PRECISION_SINERGIA
+
+        def hess(v):
+            return Xt(peso * X(v)) + PRECISION_SINERGIA * v
+
+        # Gradiente conjugado con precondicionador diagonal
+        paso = np.zeros(n)
+        resto = grad.copy()
+        z = resto / diag
+        direccion = z.copy()
+        rz = resto @ z
+        for _ in range(n):
+            if np.max(np.abs(resto)) < tolerancia * 1e-2:
+                break
+            Hd = hess(direccion)
+            alfa = rz / (direccion @ Hd)
+            paso += alfa * direccion
+            resto -= alfa * Hd
+            z = resto / diag
+            rz, rz_anterior = resto @ z, rz
+            direccion = z + (rz / rz_anterior) * direccion
+        beta += paso
+        if np.max(np.abs(paso)) < tolerancia:
+            break
+
+    juntos = np.bincount(col1, minlength=n) + np.bincount(col2, minlength=n)
+    return {pareja: (round(float(beta[i]), 4), int(juntos[i])) for pareja, i in indice.items()}
+
+def asegurar_sinergias():
+    """Recalcula las sinergias de todas las seasons si los datos han cambiado."""
+    global version_sinergias
+    if version_sinergias == version_datos:
+        return
+    asegurar_rankings()
+    sinergias_por_season.clear()
+    # Una season cada vez: los shards archivados no se quedan en memoria
+    for season, lista in resultados.recorrer_por_season():
+        sinergias_por_season[season] = ajustar_sinergias([p for _, p in lista],
+                                                         ranking_trueskill_por_season.get(season, {}))
+    version_sinergias = version_datos
+
+def mejores_parejas(season, k=5, peores=False, min_partidos=1):
+    """
+    Las k parejas con más (o menos, si peores) sinergia de la season.
+    Devuelve [((id_a, id_b), sinergia, partidos_juntos)].
+    """
+    asegurar_sinergias()
+    candidatas = ((pareja, sin, n) for pareja, (sin, n) in sinergias_por_season.get(season, {}).items()
+                  if n >= min_partidos)
+    elegir = heapq.nsmallest if peores else heapq.nlargest
+    return elegir(k, candidatas, key=lambda x: x[1])
+
+def nombre_pareja(pareja):
+    return "{} & {}".format(nombre_jugador(pareja[0]), nombre_jugador(pareja[1]))
+
+# ---------------------------------
+# NUEVO: Tensor de aliados y rivales
+# ---------------------------------
+# cruces[a, b, k] cuenta, desde el punto de vista del jugador a, los
+# partidos con b en cada situación k. Se construye de una pasada y luego
+# cada partido nuevo solo suma 12 casillas.
+ALIADO_GANA, ALIADO_PIERDE, RIVAL_GANA, RIVAL_PIERDE = range(4)
+# RIVAL_GANA: b le ganó a a; RIVAL_PIERDE: a le ganó a b
+
+cruces = np.zeros((0, 0, 4), dtype=np.int32)
+version_cruces = -1
+
+# Para cada hueco del partido (eq1, eq1, eq2, eq2): su compañero y sus rivales
+_HUECO_ALIADO = np.array([1, 0, 3, 2])
+_HUECOS_RIVALES = np.array([[2, 3], [2, 3], [0, 1], [0, 1]])
+
+def _indices_cruces(jugadores_partidos, gana1):
+    """Índices planos de cruces que suma cada partido (n x 12)."""
+    n = len(jugadores_partidos)
+    gana = np.concatenate([np.repeat(gana1[:, None], 2, axis=1),
+                           np.repeat(~gana1[:, None], 2, axis=1)], axis=1)
+    N = cruces.shape[0]
+    yo = jugadores_partidos[:, :, None]
+    aliado = jugadores_partidos[:, _HUECO_ALIADO][:, :, None]
+    rivales = jugadores_partidos[:, _HUECOS_RIVALES.ravel()].reshape(n, 4, 2)
+    k_aliado = np.where(gana, ALIADO_GANA, ALIADO_PIERDE)[:, :, None]
+    k_rival = np.where(gana, RIVAL_PIERDE, RIVAL_GANA)[:, :, None]
+    planos_aliado = (yo * N + aliado) * 4 + k_aliado
+    planos_rival = (yo * N + rivales) * 4 + k_rival
+    return np.concatenate([planos_aliado, planos_rival], axis=2).reshape(n, 12)
+
+def reconstruir_cruces():
+    """Cuenta todo el historial de una vez (vectorizado)."""
+    global cruces, version_cruces
+    N = len(nombre_por_id)
+    cruces = np.zeros((N, N, 4), dtype=np.int32)
+    if resultados:
+        mapa = asegurar_registro()
+        if mapa is not None:
+            jugadores_partidos, gana1 = mapa["jugadores"].astype(np.int64), mapa["gana"] == 1
+        else:
+            jugadores_partidos, gana1 = _partidos_a_arrays(resultados)
+        cuentas = np.bincount(_indices_cruces(jugadores_partidos, gana1).ravel(), minlength=cruces.size)
+        cruces = cuentas.astype(np.int32).reshape(N, N, 4)
+    version_cruces = version_datos
+
+def _sumar_partido_a_cruces(partido, signo=1):
+    global cruces
+    ids = partido["partido"][0] + partido["partido"][1]
+    if max(ids) >= cruces.shape[0]:
+        # Jugador nuevo: se amplía el tensor (al doble, para no copiar a cada alta)
+        N = max(max(ids) + 1, 2 * cruces.shape[0])
+        ampliado = np.zeros((N, N, 4), dtype=np.int32)
+        viejo = cruces.shape[0]
+        ampliado[:viejo, :viejo] = cruces
+        cruces = ampliado
+    jugadores_partidos, gana1 = _partidos_a_arrays([partido])
+    cruces.reshape(-1)[_indices_cruces(jugadores_partidos, gana1).ravel()] += signo
+
+def asegurar_cruces():
+    if version_cruces != version_datos:
+        reconstruir_cruces()
+    return cruces
+
+def fila_cruces(pid):
+    """Cuentas (N x 4) del jugador pid frente a todos los demás."""
+    tabla = asegurar_cruces()
+    if pid >= tabla.shape[0]:
+        return np.zeros((0, 4), dtype=np.int32)
+    return tabla[pid]
+
+# ---------------------------------
+# NUEVO: Índices de bits sobre los partidos
+# ---------------------------------
+# Cada índice es un bitset guardado como array de bytes (bits empaquetados,
+# orden little): el bit i está a 1 si el partido i (su posición en
+# resultados) cumple la condición. Se actualiza en su sitio al añadir,
+# editar o borrar partidos; las consultas lo leen como entero de Python y se
+# resuelven con & / | y bit_count, sin recorrer resultados.
+indices_partidos = {
+    "jugador": {},   # id_jugador -> partidos jugados
+    "equipo1": {},   # id_jugador -> partidos en el equipo 1
+    "equipo2": {},   # id_jugador -> partidos en el equipo 2
+    "ganador": {},   # id_jugador -> partidos ganados
+    "mvp": {},       # id_jugador -> partidos como MVP
+    "lugar": {},     # lugar -> partidos jugados allí
+    "season": {},    # season -> partidos de la season
+}
+version_indices = -1
+
+def _bits_de_posiciones(posiciones, n):
+    """Array de bits con los de posiciones (array de enteros) a 1."""
+    marcas = np.zeros(n, dtype=bool)
+    marcas[posiciones] = True
+    return np.packbits(marcas, bitorder="little")
+
+def _ampliar_bits(datos, n_bits):
+    """Copia de datos con sitio para n_bits (al menos el doble, para amortizar)."""
+    nuevo = np.zeros(max((n_bits + 7) // 8, 2 * len(datos)), dtype=np.uint8)
+    nuevo[:len(datos)] = datos
+    return nuevo
+
+def reconstruir_indices():
+    """Construye todos los índices recorriendo resultados una sola vez."""
+    global version_indices
+    posiciones = {nombre: defaultdict(list) for nombre in indices_partidos}
+    # Los shards se leen de paso, sin quedarse en memoria
+    for idx, p in enumerate(resultados.recorrer()):
+        eq1, eq2 = p["partido"]
+        for j in eq1:
+            posiciones["equipo1"][j].append(idx)
+        for j in eq2:
+            posiciones["equipo2"][j].append(idx)
+        for j in eq1 + eq2:
+            posiciones["jugador"][j].append(idx)
+        for j in p["ganador_partido"]:
+            posiciones["ganador"][j].append(idx)
+        if p["mvp"] is not None:
+            posiciones["mvp"][p["mvp"]].append(idx)
+        posiciones["lugar"][p["lugar"]].append(idx)
+        posiciones["season"][p["season"]].append(idx)
+    n = len(resultados)
+    for nombre, indice in indices_partidos.items():
+        indice.clear()
+        for clave, lista in posiciones[nombre].items():
+            indice[clave] = _bits_de_posiciones(lista, n)
+    version_indices = version_datos
+
+def _indexar_partido(idx, p, quitar=False):
+    """Pone (o quita) el bit idx en todos los índices del partido p."""
+    byte, bit = idx >> 3, 1 << (idx & 7)
+    eq1, eq2 = p["partido"]
+    claves = ([("equipo1", j) for j in eq1] + [("equipo2", j) for j in eq2] +
+              [("jugador", j) for j in eq1 + eq2] + [("ganador", j) for j in p["ganador_partido"]] +
+              [("lugar", p["lugar"]), ("season", p["season"])])
+    if p["mvp"] is not None:
+        claves.append(("mvp", p["mvp"]))
+    for nombre, clave in claves:
+        indice_bits = indices_partidos[nombre]
+        datos = indice_bits.get(clave)
+        if not quitar:
+            if datos is None or byte >= len(datos):
+                datos = indice_bits[clave] = _ampliar_bits(datos if datos is not None else
+                                                           np.zeros(0, dtype=np.uint8), idx + 1)
+            datos[byte] |= bit
+        elif datos is not None:
+            if byte < len(datos):
+                datos[byte] &= 0xFF ^ bit
+            if not datos.any():
+                # Sin partidos la clave desaparece, como al reconstruir
+                del indice_bits[clave]
+
+def indice(nombre, clave):
+    """Bitset de un índice como entero (0 si la clave no aparece nunca)."""
+    if version_indices != version_datos:
+        reconstruir_indices()
+    datos = indices_partidos[nombre].get(clave)
+    return 0 if datos is None else int.from_bytes(datos.tobytes(), "little")
+
+def todos_los_partidos():
+    return (1 << len(resultados)) - 1
+
+def partidos_juntos(a, b):
+    """Partidos en los que a y b jugaron en el mismo equipo."""
+    return ((indice("equipo1", a) & indice("equipo1", b)) |
+            (indice("equipo2", a) & indice("equipo2", b)))
+
+def partidos_contra(a, c):
+    """Partidos en los que a jugó contra un equipo con c."""
+    return ((indice("equipo1", a) & indice("equipo2", c)) |
+            (indice("equipo2", a) & indice("equipo1", c)))
+
+def partidos_pareja_contra(a, b, c):
+    """Partidos en los que a y b fueron pareja contra un equipo con c."""
+    return partidos_juntos(a, b) & partidos_contra(a, c)
+
+def balance(jugador, bits):
+    """(victorias, derrotas) de jugador en los partidos de bits."""
+    bits &= indice("jugador", jugador)
+    victorias = (bits & indice("ganador", jugador)).bit_count()
+    return victorias, bits.bit_count() - victorias
+
+def indices_lugares():
+    if version_indices != version_datos:
+        reconstruir_indices()
+    return list(indices_partidos["lugar"])
+
+def posiciones_de_bits(bits):
+    """Índices de los partidos marcados en bits, en orden."""
+    if not bits:
+        return []
+    datos = np.frombuffer(bits.to_bytes((bits.bit_length() + 7) // 8, "little"), dtype=np.uint8)
+    return np.flatnonzero(np.unpackbits(datos, bitorder="little")).tolist()
+
+# ---------------------------------
+# NUEVO: Forma reciente y rachas
+# ---------------------------------
+# Para cada jugador (en total y por season) se guardan los últimos
+# VENTANA_FORMA partidos en buffers circulares con sus sumas, de modo que
+# cada partido nuevo actualiza la forma en O(1) sin recorrer resultados.
+VENTANA_FORMA = 5
+
+class FormaJugador:
+    """Forma reciente de un jugador en orden cronológico de partidos."""
+    def __init__(self, ventana=VENTANA_FORMA):
+        self.ultimos = deque(maxlen=ventana)   # 1 victoria, 0 derrota
+        self.deltas = deque(maxlen=ventana)    # cambio de rating de cada partido
+        self.games = deque(maxlen=ventana)     # diferencia de games de cada partido
+        self.victorias = 0
+        self.suma_deltas = 0.0
+        self.suma_games = 0
+        self.racha = 0          # > 0: victorias seguidas; < 0: derrotas seguidas
+        self.mejor_racha = 0
+        self.peor_racha = 0
+
+    @staticmethod
+    def _empujar(buffer, valor):
+        """Añade valor y devuelve el que se sale por el otro extremo (0 si ninguno)."""
+        saliente = buffer[0] if len(buffer) == buffer.maxlen else 0
+        buffer.append(valor)
+        return saliente
+
+    def anotar(self, gano, delta, dif_games):
+        self.victorias += gano - self._empujar(self.ultimos, int(gano))
+        self.suma_deltas += delta - self._empujar(self.deltas, delta)
+        self.suma_games += dif_games - self._empujar(self.games, dif_games)
+        if gano:
+            self.racha = self.racha + 1 if self.racha > 0 else 1
+            self.mejor_racha = max(self.mejor_racha, self.racha)
+        else:
+            self.racha = self.racha - 1 if self.racha < 0 else -1
+            self.peor_racha = max(self.peor_racha, -self.racha)
+
+    def porcentaje(self):
+        return self.victorias / len(self.ultimos) * 100 if self.ultimos else 0
+
+    def texto_ultimos(self):
+        return "".join("V" if g else "D" for g in self.ultimos)
+
+    def texto_racha(self):
+        if self.racha == 0:
+            return "-"
+        return f"V{self.racha}" if self.racha > 0 else f"D{-self.racha}"
+
+# {season o None (todas): {id_jugador: FormaJugador}}
+forma_jugadores = defaultdict(dict)
+version_forma = -1
+_ultima_fecha_forma = ""
+
+def _games_del_partido(r):
+    """Games ganados por (equipo1, equipo2) en el partido."""
+    g1 = g2 = 0
+    for set_result in r["puntuaciones"]:
+        s1, s2 = map(int, set_result.split('(')[0].split('-'))
+        g1 += s1
+        g2 += s2
+    return g1, g2
+
+def _anotar_forma(idx, r):
+    global _ultima_fecha_forma
+    eq1, eq2 = r["partido"]
+    g1, g2 = _games_del_partido(r)
+    gana1 = set(r["ganador_partido"]) == set(eq1)
+    cambios = ts_changes_por_partido.get(idx, {})
+    for equipo, gano, dif in ((eq1, gana1, g1 - g2), (eq2, not gana1, g2 - g1)):
+        for jug in equipo:
+            for clave in (None, r["season"]):
+                if jug not in forma_jugadores[clave]:
+                    forma_jugadores[clave][jug] = FormaJugador()
+                forma_jugadores[clave][jug].anotar(gano, cambios.get(jug, 0.0), dif)
+    _ultima_fecha_forma = max(_ultima_fecha_forma, r["fecha"])
+
+def _anotar_forma_si_en_orden(idx, r):
+    """
+    Suma un partido nuevo a la forma. Solo vale si es el más reciente y sus
+    cambios de rating son definitivos; si no, hay que reconstruir.
+    """
+    if r["fecha"] < _ultima_fecha_forma or motor_actual.historia_completa:
+        return False
+    _anotar_forma(idx, r)
+    return True
+
+def asegurar_forma():
+    """Reconstruye la forma de todos los jugadores si los datos han cambiado."""
+    global version_forma, _ultima_fecha_forma
+    if version_forma == version_datos:
+        return forma_jugadores
+    asegurar_rankings()
+    forma_jugadores.clear()
+    _ultima_fecha_forma = ""
+    # Las seasons no se solapan en el calendario: recorriéndolas en orden, cada
+    # una por fecha, sale el orden cronológico sin cargar los shards archivados
+    for _, lista in resultados.recorrer_por_season():
+        for idx, r in sorted(lista, key=lambda x: x[1]["fecha"]):
+            _anotar_forma(idx, r)
+    version_forma = version_datos
+    return forma_jugadores
+
+# ---------------------------------
+# NUEVO: Proyección Monte Carlo de final de season
+# ---------------------------------
+# Se simulan muchas veces los partidos que faltan (partidos aleatorios entre
+# jugadores activos) partiendo de los ratings actuales. La habilidad real de
+# cada jugador se sortea una vez por simulación a partir de N(mu, sigma) y
+# cada partido se decide con el modelo de victoria del motor activo
+# (prob_victoria_lote con esas habilidades, sin incertidumbre): la normal con
+# ruido beta en TrueSkill, la logística de Elo, Glicko-2 o Weng-Lin...
+# Las simulaciones se reparten en trozos de tamaño fijo, cada uno con su
+# semilla derivada de la principal, así que el resultado solo depende de la
+# semilla y no del número de procesos.
+SIMULACIONES_POR_TROZO = 2000
+
+# Hilo de fondo para cálculos largos lanzados desde la interfaz
+_calculo_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="calculo")
+
+def _repartir_simulaciones(funcion, argumentos, n_total, semilla, procesos=None,
+                           tam_trozo=SIMULACIONES_POR_TROZO):
+    """
+    Ejecuta funcion(*argumentos, semilla_trozo, n_trozo) por trozos de
+    tam_trozo en un pool de procesos y devuelve la lista de resultados en
+    orden de trozo.
+    """
+    trozos = [min(tam_trozo, n_total - i) for i in range(0, n_total, tam_trozo)]
+    semillas = np.random.SeedSequence(semilla).spawn(len(trozos))
+    llamadas = [argumentos + (sem, n) for sem, n in zip(semillas, trozos)]
+    if procesos == 1 or len(trozos) == 1:
+        return [funcion(*a) for a in llamadas]
+    if not _procesos_disponibles():
+        with ThreadPoolExecutor(max_workers=procesos) as pool:
+            return list(pool.map(funcion, *zip(*llamadas)))
+    try:
+        with ProcessPoolExecutor(max_workers=procesos) as pool:
+            return list(pool.map(funcion, *zip(*llamadas)))
+    except BrokenProcessPool:
+        # El ejecutable no ha podido arrancar los procesos: se hace aquí
+        return [funcion(*a) for a in llamadas]
 
-    seasons_dict = defaultdict(list)
-    for idx, partido in enumerate(resultados):
-        season = partido["season"]
-        seasons_dict[season].append((idx, partido))
+def _procesos_disponibles():
+    """
+    Si se pueden lanzar procesos de cálculo. Empaquetada (PyInstaller), la
+    app solo arranca como proceso auxiliar en Windows, gracias a
+    freeze_support(), o si los procesos se crean con fork; si no, cada
+    proceso volvería a abrir la interfaz.
+    """
+    if not getattr(sys, "frozen", False):
+        return True
+    return os.name == "nt" or multiprocessing.get_start_method() == "fork"
 
-    def season_sort_key(s):
-        if s == "Season 0":
-            return 0
-        try:
-            return int(s.split()[1])
-        except:
-            return 9999
+def _estado_desde_ratings(ratings, ids):
+    """Arrays (mu, sigma, vol) de los ratings de ids, en ese orden."""
+    return [np.array([float(ratings[j].mu) for j in ids]),
+            np.array([float(ratings[j].sigma) for j in ids]),
+            np.array([float(getattr(ratings[j], "vol", 0.0)) for j in ids])]
 
-    sorted_seasons = sorted(seasons_dict.keys(), key=season_sort_key)
-    for season in sorted_seasons:
-        # Creamos un rating inicial para cada jugador
-        ratings_local = {j: env.create_rating() for j in jugadores}
-        lista_partidos = seasons_dict[season]
-        # Ordenamos por fecha para que se actualice en orden cronológico
-        lista_partidos.sort(key=lambda x: x[1]["fecha"])
-        for (idx, p) in lista_partidos:
-            cambios = actualizar_trueskill_sin_guardar(ratings_local, p)
-            ts_changes_por_partido[idx] = cambios
-        final_dict = {j: ratings_local[j] for j in jugadores}
-        ranking_trueskill_por_season[season] = final_dict
+def _simular_trozo(nombre_motor, estado, activos, partidos, semilla, n_sim):
+    """
+    Simula n_sim finales de season (en un proceso aparte). estado son los
+    arrays iniciales de los N jugadores de la season y activos las
+    posiciones de los que pueden jugar. Devuelve las veces que cada jugador
+    queda 1º, 2º y 3º (array 3 x N).
+    """
+    motor = MOTORES_RATING[nombre_motor]
+    rng = np.random.default_rng(semilla)
+    N = len(estado[0])
+    # Estado de todas las simulaciones seguidas: simulación s, jugador j -> s*N + j
+    sim = [np.tile(e, n_sim) for e in estado]
+    habilidad = rng.normal(sim[0], sim[1]).reshape(n_sim, N)
+    desplazamiento = (np.arange(n_sim) * N)[:, None]
+    for _ in range(partidos):
+        elegidos = activos[np.argpartition(rng.random((n_sim, len(activos))), 3, axis=1)[:, :4]]
+        fuerza = np.take_along_axis(habilidad, elegidos, axis=1)
+        prob1 = motor.prob_victoria_lote(fuerza[:, 0] + fuerza[:, 1], fuerza[:, 2] + fuerza[:, 3], 0.0)
+        gana1 = rng.random(n_sim) < prob1
+        # Cada simulación juega un partido: no comparten jugadores, es un lote
+        motor._actualizar_lote(sim, elegidos + desplazamiento, gana1)
+    valores = (sim[0] - 2 * sim[1]).reshape(n_sim, N)
+    orden = np.argsort(-valores, axis=1, kind="stable")[:, :3]
+    return np.stack([np.bincount(orden[:, k], minlength=N) for k in range(3)])
+
+def estimar_partidos_restantes(season):
+    """Partidos que faltan hasta el último día de la season al ritmo llevado hasta hoy."""
+    if season == SEASON_DESCONOCIDA or season >= len(temporadas):
+        return 0
+    hoy = date.today().toordinal()
+    inicio, fin = temporadas[season]["inicio"], temporadas[season]["fin"]
+    if hoy >= fin:
+        return 0
+    jugados = indice("season", season).bit_count()
+    dias = max(hoy - inicio + 1, 1)
+    return int(round(jugados / dias * (fin - hoy)))
+
+def proyectar_season(season=None, n_simulaciones=20000, partidos_restantes=None,
+                     semilla=None, procesos=None):
+    """
+    Probabilidad de que cada jugador termine 1º, 2º o 3º la season. Si no se
+    indica partidos_restantes se estima con el ritmo de partidos de la
+    season. Devuelve (partidos_restantes, {id_jugador: (p1, p2, p3)}).
+    """
+    asegurar_rankings()
+    season = season_actual() if season is None else season
+    if partidos_restantes is None:
+        partidos_restantes = estimar_partidos_restantes(season)
+    ratings = dict(ranking_trueskill_por_season.get(season, {}))
+    for pid in ids_activos():
+        if pid not in ratings:
+            ratings[pid] = motor_actual.crear_rating()
+    ids = sorted(ratings)
+    if not ids:
+        return partidos_restantes, {}
+    estado = _estado_desde_ratings(ratings, ids)
+    posicion = {pid: i for i, pid in enumerate(ids)}
+    activos = np.array([posicion[pid] for pid in ids_activos()], dtype=np.int64)
+    if len(activos) < 4:
+        partidos_restantes = 0
+
+    cuentas = _repartir_simulaciones(_simular_trozo, (motor_actual.nombre, estado, activos, partidos_restantes),
+                                     n_simulaciones, semilla, procesos)
+    total = np.sum(cuentas, axis=0) / n_simulaciones
+    return partidos_restantes, {pid: tuple(float(x) for x in total[:, i]) for i, pid in enumerate(ids)}
 
-        # Determinamos campeón, 2º y 3º
-        ranking_ordenado = sorted(final_dict.items(),
-                                  key=lambda x: rating_value(x[1]),
-                                  reverse=True)
-        for i, (jug, _) in enumerate(ranking_ordenado):
-            if i == 0:
-                champion_by_season[season] = jug
-                trofeos_Liga_jugador[jug] += 1
-            elif i == 1:
-                segundos_Liga_jugador[jug] += 1
-            elif i == 2:
-                terceros_Liga_jugador[jug] += 1
-            else:
-                break
+# ---------------------------------
+# NUEVO: Intervalos bootstrap del ranking
+# ---------------------------------
+# Con pocos partidos por jugador muchas posiciones vecinas no se distinguen.
+# Se remuestrean con reemplazo los partidos de la season (manteniendo el
+# orden cronológico), se repite el rating de cada réplica y se mira cuánto
+# se mueve cada jugador. Las réplicas se repiten a la vez: el partido k de
+# todas ellas forma un lote sin jugadores en común.
+
+def _bootstrap_trozo(nombre_motor, partidos, jugadores_partidos, gana1, N, semilla, n_rep):
+    """Valores finales (n_rep x N) de rating_value en n_rep réplicas."""
+    motor = MOTORES_RATING[nombre_motor]
+    rng = np.random.default_rng(semilla)
+    n = len(jugadores_partidos)
+    muestras = np.sort(rng.integers(0, n, size=(n_rep, n)), axis=1)
+    if motor.historia_completa:
+        # El orden no cuenta y no hay paso por lotes: cada réplica se resuelve
+        # entera, con un motor propio para no tocar la solución del ranking
+        motor = motor.aparte()
+        valores = np.empty((n_rep, N))
+        for r, muestra in enumerate(muestras):
+            ratings_local = motor.reproducir([partidos[i] for i in muestra], N)[0]
+            valores[r] = [rating_value(ratings_local[j]) for j in range(N)]
+        return valores
+    inicial = motor.crear_rating()
+    sim = [np.full(n_rep * N, float(getattr(inicial, campo, 0.0))) for campo in ("mu", "sigma", "vol")]
+    desplazamiento = (np.arange(n_rep) * N)[:, None]
+    for k in range(n):
+        elegidos = muestras[:, k]
+        motor._actualizar_lote(sim, jugadores_partidos[elegidos] + desplazamiento, gana1[elegidos])
+    return (sim[0] - 2 * sim[1]).reshape(n_rep, N)
+
+def bootstrap_ranking(season, n_replicas=2000, semilla=None, procesos=None, confianza=0.95):
+    """
+    Intervalos de confianza de la posición de cada jugador en la season.
+    Devuelve (ids, posiciones_ic, prob_encima): ids en el orden del ranking
+    actual, posiciones_ic [(pos_min, pos_max)] alineado con ids y
+    prob_encima[a, b] = P(ids[a] acaba por encima de ids[b]). Las réplicas
+    se reparten en tantos trozos como procesos, así que la misma semilla da
+    el mismo resultado con el mismo número de procesos.
+    """
+    asegurar_rankings()
+    ids = list(clasificacion_por_season.get(season, []))
+    partidos = sorted((p for (_, p) in resultados.partidos_de_season(season)), key=lambda p: p["fecha"])
+    if not ids or not partidos:
+        return ids, [(i + 1, i + 1) for i in range(len(ids))], np.eye(len(ids))
+    jugadores_partidos, gana1 = _partidos_a_arrays(partidos)
+    N = len(nombre_por_id)
+    # Al menos un trozo por proceso: con trozos de tamaño fijo unas pocas
+    # réplicas cabrían en uno solo y no se repartirían
+    tam_trozo = max(1, -(-n_replicas // (procesos or os.cpu_count() or 1)))
+    trozos = _repartir_simulaciones(_bootstrap_trozo,
+                                    (motor_actual.nombre, partidos, jugadores_partidos, gana1, N),
+                                    n_replicas, semilla, procesos, tam_trozo)
+    valores = np.concatenate(trozos)[:, ids]
+    # Posición de cada jugador en cada réplica (1 = primero)
+    posiciones = np.empty_like(valores, dtype=np.int64)
+    orden = np.argsort(-valores, axis=1, kind="stable")
+    np.put_along_axis(posiciones, orden, np.arange(1, len(ids) + 1)[None, :].repeat(len(valores), 0), axis=1)
+    cola = (1 - confianza) / 2 * 100
+    bajo = np.percentile(posiciones, cola, axis=0, method="lower")
+    alto = np.percentile(posiciones, 100 - cola, axis=0, method="higher")
+    prob_encima = np.empty((len(ids), len(ids)))
+    for a in range(len(ids)):
+        prob_encima[a] = np.mean(valores[:, a, None] > valores, axis=0)
+    return ids, list(zip(bajo.tolist(), alto.tolist())), prob_encima
 
 # ---------------------------------
 # 7. Animales / Badges / Títulos y Banner
@@ -320,9 +4436,9 @@ def get_banner_for_player(player):
 # 8. Mostrar Ranking (Seasons)
 # ---------------------------------
 def mostrar_ranking_elo():
-    recalcular_trueskill_por_season()
+    asegurar_rankings()
     ranking_window = tk.Toplevel()
-    ranking_window.title("Ranking TrueSkill (por Seasons)")
+    ranking_window.title(f"Ranking {motor_actual.nombre} (por Seasons)")
     ranking_window.geometry("1000x650")
 
     style = ttk.Style(ranking_window)
@@ -340,28 +4456,14 @@ def mostrar_ranking_elo():
     notebook = ttk.Notebook(ranking_window)
     notebook.pack(expand=True, fill="both")
 
-    current_season = obtener_season(datetime.today().strftime('%Y-%m-%d'))
+    current_season = season_actual()
+    trees = {}
+    seasons_pestanas = []
 
-    def season_sort_key(s):
-        if s == "Season 0":
-            return 0
-        try:
-            return int(s.split()[1])
-        except:
-            return 9999
-
-    sorted_seasons = sorted(ranking_trueskill_por_season.keys(), key=season_sort_key)
-
-    for season in sorted_seasons:
+    def crear_pestana(season):
         frame = tk.Frame(notebook)
-        notebook.add(frame, text=season)
-
-        ranking_local = ranking_trueskill_por_season[season]
-        ranking_ordenado = sorted(
-            ranking_local.items(),
-            key=lambda x: rating_value(x[1]),
-            reverse=True
-        )
+        notebook.add(frame, text=nombre_season(season))
+        seasons_pestanas.append(season)
 
         tree = ttk.Treeview(
             frame,
@@ -389,9 +4491,16 @@ def mostrar_ranking_elo():
         tree.configure(yscrollcommand=scrollbar_y.set)
         scrollbar_y.pack(side='right', fill='y')
         tree.pack(expand=True, fill='both')
+        trees[season] = tree
+
+    # {season: {id: (values, tags)}} de lo que hay pintado en cada pestaña
+    mostradas = defaultdict(dict)
 
-        pos = 1
-        for (jug, r_obj) in ranking_ordenado:
+    def rellenar_pestana(season):
+        ranking_local = ranking_trueskill_por_season[season]
+        filas = []
+        for pos, jug in enumerate(clasificacion_por_season[season], start=1):
+            r_obj = ranking_local[jug]
             ts_val = rating_value(r_obj)
             sigma_val = r_obj.sigma
             animal = asignar_animal_por_ts(ts_val)
@@ -402,21 +4511,71 @@ def mostrar_ranking_elo():
             else:
                 pos_display = str(pos)
 
-            values = (pos_display, jug, f"{ts_val:.2f}", f"{sigma_val:.2f}", animal)
+            values = (pos_display, nombre_jugador(jug), f"{ts_val:.2f}", f"{sigma_val:.2f}", animal)
+            tags = ()
+            if season == current_season and pos <= 3:
+                tags = (("first", "second", "third")[pos - 1],)
+            filas.append((str(jug), values, tags))
+        # Tras un partido solo cambian sus cuatro jugadores y los que se cruzan con ellos
+        sincronizar_filas(trees[season], filas, mostradas[season])
+
+    def refrescar(cambios=None):
+        asegurar_rankings()
+        afectadas = seasons_afectadas(cambios)
+        for season in sorted(ranking_trueskill_por_season.keys()):
+            if season not in trees:
+                crear_pestana(season)
+            elif afectadas is not None and season not in afectadas:
+                continue
+            rellenar_pestana(season)
+
+    refrescar()
+    suscribir_ventana(ranking_window, refrescar)
+
+    def abrir_bootstrap():
+        if seasons_pestanas:
+            mostrar_bootstrap_ranking(seasons_pestanas[notebook.index("current")])
+
+    ttk.Button(ranking_window, text="Intervalos de confianza (bootstrap)",
+               command=abrir_bootstrap).pack(pady=5)
+
+def mostrar_bootstrap_ranking(season):
+    win = tk.Toplevel()
+    win.title(f"Intervalos de confianza - {nombre_season(season)}")
+    win.geometry("750x500")
 
-            if season == current_season:
-                if pos == 1:
-                    tree.insert("", tk.END, values=values, tags=("first",))
-                elif pos == 2:
-                    tree.insert("", tk.END, values=values, tags=("second",))
-                elif pos == 3:
-                    tree.insert("", tk.END, values=values, tags=("third",))
-                else:
-                    tree.insert("", tk.END, values=values)
-            else:
-                tree.insert("", tk.END, values=values)
+    estado_label = tk.Label(win, text="Remuestreando partidos...")
+    estado_label.pack(pady=5)
+    columnas = ("Pos", "Jugador", "TS Rating", "IC posición (95%)", "P(por encima del siguiente)")
+    tree = ttk.Treeview(win, columns=columnas, show='headings')
+    for col in columnas:
+        tree.heading(col, text=col)
+        tree.column(col, anchor='center', width=130)
+    tree.pack(fill='both', expand=True, padx=10, pady=5)
+
+    n_replicas = 2000
+    ranking_local = dict(ranking_trueskill_por_season.get(season, {}))
+    futuro = _calculo_executor.submit(bootstrap_ranking, season, n_replicas)
+
+    def comprobar():
+        if not win.winfo_exists():
+            return
+        if not futuro.done():
+            win.after(100, comprobar)
+            return
+        try:
+            ids, intervalos, prob_encima = futuro.result()
+        except Exception as e:
+            estado_label.config(text=f"Error en el bootstrap: {e}")
+            return
+        estado_label.config(text=f"{n_replicas} réplicas remuestreando los partidos de la season")
+        for i, (pid, (bajo, alto)) in enumerate(zip(ids, intervalos)):
+            siguiente = f"{prob_encima[i, i + 1]:.0%}" if i + 1 < len(ids) else "-"
+            ts_val = f"{rating_value(ranking_local[pid]):.2f}" if pid in ranking_local else "-"
+            tree.insert("", tk.END, values=(i + 1, nombre_jugador(pid), ts_val,
+                                            f"{bajo}º - {alto}º", siguiente))
 
-            pos += 1
+    comprobar()
 
 # ---------------------------------
 # NUEVO: Añadir ganadores de torneo
@@ -445,6 +4604,7 @@ def añadir_ganadores_torneo():
         if not g1 or not g2:
             messagebox.showerror("Error", "Selecciona ambos ganadores.")
             return
+        g1, g2 = id_por_nombre[g1], id_por_nombre[g2]
         fecha_torneo = fecha_torneo_var.get_date().strftime('%Y-%m-%d')
         torneo_winners.append((fecha_torneo, g1, g2))
         torneos_jugador[g1] += 1
@@ -465,7 +4625,7 @@ def contar_torneos():
         torneos_jugador[g1] += 1
         torneos_jugador[g2] += 1
 def mostrar_campeones():
-    recalcular_trueskill_por_season()
+    asegurar_rankings()
     contar_torneos()  # Para actualizar el conteo
 
     # Recontar torneos_jugador si quieres que sume a la "copa total" de cada jugador
@@ -491,25 +4651,16 @@ def mostrar_campeones():
     tree1.column("RatingFinal", anchor="center", width=100)
     tree1.column("Vict%", anchor="center", width=80)
 
-    def season_sort_key(s):
-        if s == "Season 0":
-            return 0
-        try:
-            return int(s.split()[1])
-        except:
-            return 9999
-
-    sorted_seasons = sorted(champion_by_season.keys(), key=season_sort_key)
+    sorted_seasons = sorted(champion_by_season.keys())
     for season in sorted_seasons:
         champ = champion_by_season[season]
         rating_dict = ranking_trueskill_por_season[season]
         champ_rating_obj = rating_dict.get(champ, None)
         champ_rating_val = rating_value(champ_rating_obj) if champ_rating_obj else 0.0
-        # % de victorias
-        matches = [r for r in resultados if r["season"] == season and (champ in r["partido"][0] or champ in r["partido"][1])]
-        wins = [r for r in matches if champ in r["ganador_partido"]]
-        vict_exact = (len(wins) / len(matches) * 100) if matches else 0.0
-        tree1.insert("", tk.END, values=(season, champ, f"{champ_rating_val:.2f}", f"{vict_exact:.1f}%"))
+        # % de victorias (de los índices de bits: no lee los shards)
+        victorias, derrotas = balance(champ, indice("season", season))
+        vict_exact = (victorias / (victorias + derrotas) * 100) if victorias + derrotas else 0.0
+        tree1.insert("", tk.END, values=(nombre_season(season), nombre_jugador(champ), f"{champ_rating_val:.2f}", f"{vict_exact:.1f}%"))
 
     tree1.pack(expand=True, fill="both")
 
@@ -527,7 +4678,7 @@ def mostrar_campeones():
     tree2.pack(expand=True, fill="both")
 
     for idx, (fecha, g1, g2) in enumerate(torneo_winners, start=1):
-        tree2.insert("", tk.END, values=(f"Torneo {idx} - {fecha}", g1, g2))
+        tree2.insert("", tk.END, values=(f"Torneo {idx} - {fecha}", nombre_jugador(g1), nombre_jugador(g2)))
 
     # Botón para añadir ganadores del torneo
     btn = tk.Button(frame2, text="Añadir ganadores del torneo",
@@ -537,8 +4688,116 @@ def mostrar_campeones():
 # ---------------------------------
 # 10. Mostrar Partidos (Seasons) con filtro de fechas
 # ---------------------------------
+def editar_partido_dialogo(parent, idx):
+    """Ventana para corregir el partido idx (se guarda con editar_partido)."""
+    r = resultados[idx]
+    win = tk.Toplevel(parent)
+    win.title("Editar Partido")
+    win.transient(parent)
+
+    tk.Label(win, text="Fecha (YYYY-mm-dd):").grid(row=0, column=0, sticky='e')
+    fecha_var = DateEntry(win, width=12, background='darkblue', foreground='white',
+                          borderwidth=2, date_pattern='y-mm-dd')
+    fecha_var.set_date(datetime.strptime(r["fecha"], "%Y-%m-%d").date())
+    fecha_var.grid(row=0, column=1, pady=5, padx=5)
+
+    # Los jugadores del partido pueden estar ya eliminados: también se ofrecen
+    nombres = jugadores + [nombre_jugador(j) for j in r["partido"][0] + r["partido"][1]
+                           if nombre_jugador(j) not in jugadores]
+    etiquetas = ["Equipo 1 - Jugador 1:", "Equipo 1 - Jugador 2:",
+                 "Equipo 2 - Jugador 1:", "Equipo 2 - Jugador 2:"]
+    jugador_vars = []
+    for fila, (etiqueta, pid) in enumerate(zip(etiquetas, r["partido"][0] + r["partido"][1]), start=1):
+        tk.Label(win, text=etiqueta).grid(row=fila, column=0, sticky='e')
+        var = tk.StringVar(value=nombre_jugador(pid))
+        ttk.Combobox(win, textvariable=var, values=nombres, state='readonly').grid(row=fila, column=1, pady=5, padx=5)
+        jugador_vars.append(var)
+
+    def equipo_de(ganador):
+        return "Equipo 1" if set(ganador) == set(r["partido"][0]) else "Equipo 2"
+
+    tk.Label(win, text="Ganador 1er Set:").grid(row=5, column=0, sticky='e')
+    primer_set_var = tk.StringVar(value=equipo_de(r["ganador_primer_set"]))
+    ttk.Combobox(win, textvariable=primer_set_var, values=["Equipo 1", "Equipo 2"],
+                 state='readonly').grid(row=5, column=1, pady=5, padx=5)
+    tk.Label(win, text="Ganador Partido:").grid(row=6, column=0, sticky='e')
+    ganador_var = tk.StringVar(value=equipo_de(r["ganador_partido"]))
+    ttk.Combobox(win, textvariable=ganador_var, values=["Equipo 1", "Equipo 2"],
+                 state='readonly').grid(row=6, column=1, pady=5, padx=5)
+    tk.Label(win, text="MVP:").grid(row=7, column=0, sticky='e')
+    mvp_var = tk.StringVar(value=nombre_jugador(r["mvp"]) if r["mvp"] is not None else "")
+    ttk.Combobox(win, textvariable=mvp_var, values=nombres, state='readonly').grid(row=7, column=1, pady=5, padx=5)
+    tk.Label(win, text="Sets (ej: 6-4; 7-6(5)):").grid(row=8, column=0, sticky='e')
+    sets_entry = ttk.Entry(win, width=30)
+    sets_entry.insert(0, "; ".join(r["puntuaciones"]))
+    sets_entry.grid(row=8, column=1, pady=5, padx=5)
+    tk.Label(win, text="Lugar del Partido:").grid(row=9, column=0, sticky='e')
+    lugar_var = tk.StringVar(value=r["lugar"])
+    ttk.Combobox(win, textvariable=lugar_var, state='readonly',
+                 values=LUGARES_ESTADISTICAS + ([r["lugar"]] if r["lugar"] not in LUGARES_ESTADISTICAS else [])
+                 ).grid(row=9, column=1, pady=5, padx=5)
+
+    def guardar():
+        lista_jug = [v.get() for v in jugador_vars]
+        if len(set(lista_jug)) != 4:
+            messagebox.showerror("Error", "No se pueden repetir jugadores en el mismo partido.", parent=win)
+            return
+        if not mvp_var.get():
+            messagebox.showerror("Error", "Selecciona un MVP.", parent=win)
+            return
+        ids = [id_por_nombre[n] for n in lista_jug]
+        equipo1, equipo2 = tuple(ids[:2]), tuple(ids[2:])
+        puntuaciones = [t.strip() for t in sets_entry.get().split(";") if t.strip()]
+        for i, set_str in enumerate(puntuaciones, start=1):
+            try:
+                s1, s2 = map(int, set_str.split("(")[0].split("-"))
+            except ValueError:
+                messagebox.showerror("Error", f"Set {i} inválido. Usa formato n-n.", parent=win)
+                return
+        fecha_str = fecha_var.get_date().strftime('%Y-%m-%d')
+        nuevo = {
+            "partido": (equipo1, equipo2),
+            "ganador_primer_set": equipo1 if primer_set_var.get() == "Equipo 1" else equipo2,
+            "ganador_partido": equipo1 if ganador_var.get() == "Equipo 1" else equipo2,
+            "mvp": id_por_nombre[mvp_var.get()],
+            "puntuaciones": puntuaciones,
+            "tie_breaks": sum("(" in set_str for set_str in puntuaciones),
+            "lugar": lugar_var.get(),
+            "fecha": fecha_str,
+            "season": obtener_season(fecha_str),
+        }
+        try:
+            editar_partido(idx, nuevo)
+        except ValueError as e:
+            messagebox.showerror("Error", str(e), parent=win)
+            return
+        win.destroy()
+        notificar_cambios()
+
+    ttk.Button(win, text="Guardar", command=guardar).grid(row=10, column=0, pady=10)
+    ttk.Button(win, text="Cancelar", command=win.destroy).grid(row=10, column=1, pady=10)
+
+def quitar_duplicados_interfaz():
+    comprobar_resultados_externos()
+    ids = buscar_duplicados()
+    if not ids:
+        messagebox.showinfo("Duplicados", "No hay partidos duplicados en resultados.csv.")
+        return
+    lineas = []
+    for idx in ids[:10]:
+        r = resultados[idx]
+        lineas.append(f"{r['fecha']}: " + " & ".join(nombre_jugador(j) for j in r["partido"][0]) +
+                      " vs " + " & ".join(nombre_jugador(j) for j in r["partido"][1]) +
+                      f" ({'; '.join(r['puntuaciones'])}, {r['lugar']})")
+    if len(ids) > 10:
+        lineas.append(f"... y {len(ids) - 10} más")
+    if messagebox.askyesno("Duplicados", f"Hay {len(ids)} partidos repetidos (se deja el primero de cada uno):\n\n"
+                           + "\n".join(lineas) + "\n\n¿Borrarlos?"):
+        quitar_duplicados(ids)
+        notificar_cambios()
+
 def mostrar_partidos():
-    recalcular_trueskill_por_season()
+    asegurar_rankings()
     partidos_window = tk.Toplevel()
     partidos_window.title("Lista de Partidos")
     partidos_window.geometry("1200x700")
@@ -567,13 +4826,9 @@ def mostrar_partidos():
     fecha_desde_var.grid(row=0, column=3, padx=5)
     
     # Establecer "Fecha Desde" al primer día de la temporada actual
-    today = datetime.today()
-    current_season = obtener_season(today.strftime('%Y-%m-%d'))
-    if current_season != "Season 0":
-        if today.month <= 6:
-            season_start = datetime(today.year, 1, 1)
-        else:
-            season_start = datetime(today.year, 7, 1)
+    current_season = season_actual()
+    if current_season != SEASON_DESCONOCIDA:
+        season_start = date.fromordinal(temporadas[current_season]["inicio"])
         fecha_desde_var.set_date(season_start)
 
 
@@ -586,35 +4841,52 @@ def mostrar_partidos():
     filtrar_button = ttk.Button(filtro_frame, text="Filtrar", command=lambda: actualizar_partidos())
     filtrar_button.grid(row=0, column=6, padx=10)
 
+    # Combinaciones: compañero, rival, lugar y resultado (sobre los índices de bits)
+    tk.Label(filtro_frame, text="Con compañero:", font=('Helvetica', 12)).grid(row=1, column=0, padx=5)
+    companero_var = tk.StringVar(value="Todos")
+    companero_combobox = ttk.Combobox(filtro_frame, textvariable=companero_var,
+                                      values=lista_jugadores_filtro, state='readonly')
+    companero_combobox.grid(row=1, column=1, padx=5)
+    tk.Label(filtro_frame, text="Contra:", font=('Helvetica', 12)).grid(row=1, column=2, padx=5)
+    rival_var = tk.StringVar(value="Todos")
+    rival_combobox = ttk.Combobox(filtro_frame, textvariable=rival_var,
+                                  values=lista_jugadores_filtro, state='readonly', width=12)
+    rival_combobox.grid(row=1, column=3, padx=5)
+    tk.Label(filtro_frame, text="Lugar:", font=('Helvetica', 12)).grid(row=1, column=4, padx=5)
+    lugar_var = tk.StringVar(value="Todos")
+    lugar_combobox = ttk.Combobox(filtro_frame, textvariable=lugar_var, state='readonly', width=12,
+                                  values=["Todos"] + sorted(l for l in indices_lugares() if l))
+    lugar_combobox.grid(row=1, column=5, padx=5)
+    resultado_var = tk.StringVar(value="Todos")
+    resultado_combobox = ttk.Combobox(filtro_frame, textvariable=resultado_var, state='readonly', width=10,
+                                      values=["Todos", "Victorias", "Derrotas", "MVP"])
+    resultado_combobox.grid(row=1, column=6, padx=5)
+    resumen_label = tk.Label(filtro_frame, text="", font=('Helvetica', 11))
+    resumen_label.grid(row=2, column=0, columnspan=7, pady=(5, 0))
+
     # Podemos poner "fecha hasta" = hoy
     fecha_hasta_var.set_date(datetime.today().date())
 
     notebook = ttk.Notebook(partidos_window)
     notebook.pack(expand=True, fill='both')
 
-    seasons_dict = defaultdict(list)
-    for idx, r in enumerate(resultados):
-        season = r["season"]
-        seasons_dict[season].append((idx, r))
-
-    def season_sort_key(s):
-        if s == "Season 0":
-            return 0
-        else:
-            try:
-                return int(s.split()[1])
-            except:
-                return 9999
-
-    sorted_seasons = sorted(seasons_dict.keys(), key=season_sort_key)
+    # Las pestañas salen de resultados.seasons() (sin leer shards); los
+    # partidos de una season se leen la primera vez que se abre su pestaña
+    seasons_dict = {}       # {season: [(idx, partido)]} de las seasons ya leídas
+    pendientes = set()      # Pestañas que hay que volver a pintar cuando se abran
     treeviews = {}
 
     columnas = ["Fecha", "Equipo 1", "Equipo 2", "Puntuaciones",
                 "Ganador", "MVP", "Tie-breaks", "Lugar", "Δ Rating"]
 
-    for season in sorted_seasons:
+    def clave_fila(fila):
+        # Por fecha y, en la misma fecha, en el orden en que se registraron
+        idx, r = fila
+        return (r["fecha"], idx)
+
+    def crear_pestana(season):
         frame = tk.Frame(notebook)
-        notebook.add(frame, text=season)
+        notebook.add(frame, text=nombre_season(season))
 
         tree = ttk.Treeview(frame, columns=columnas, show='headings')
         for col in columnas:
@@ -628,82 +4900,318 @@ def mostrar_partidos():
         tree.configure(yscrollcommand=scrollbar_y.set)
 
         treeviews[season] = tree
-
-    def actualizar_partidos():
+        pendientes.add(season)
+
+    def construir_pestanas():
+        seasons_dict.clear()
+        for season in sorted(resultados.seasons()):
+            if season not in treeviews:
+                crear_pestana(season)
+        pendientes.update(treeviews)
+
+    def partidos_de_pestana(season):
+        if season not in seasons_dict:
+            seasons_dict[season] = sorted(resultados.partidos_de_season(season), key=clave_fila)
+        return seasons_dict[season]
+
+    def season_visible():
+        pestana = notebook.select()
+        for season, tree in treeviews.items():
+            if str(tree.master) == pestana:
+                return season
+        return None
+
+    construir_pestanas()
+    if treeviews:
+        # Se abre en la última season: las archivadas no se leen hasta que se miran
+        notebook.select(treeviews[max(treeviews)].master)
+
+    def seleccion_por_indices(filtro_jugador):
+        """Bitset de los partidos que cumplen los filtros de jugadores, lugar y resultado."""
+        bits = todos_los_partidos()
+        companero = companero_var.get()
+        rival = rival_var.get()
+        if filtro_jugador != "Todos":
+            bits &= indice("jugador", filtro_jugador)
+            if companero != "Todos":
+                bits &= partidos_juntos(filtro_jugador, id_por_nombre[companero])
+            if rival != "Todos":
+                bits &= partidos_contra(filtro_jugador, id_por_nombre[rival])
+            resultado = resultado_var.get()
+            if resultado == "Victorias":
+                bits &= indice("ganador", filtro_jugador)
+            elif resultado == "Derrotas":
+                bits &= ~indice("ganador", filtro_jugador)
+            elif resultado == "MVP":
+                bits &= indice("mvp", filtro_jugador)
+        else:
+            if companero != "Todos":
+                bits &= indice("jugador", id_por_nombre[companero])
+            if rival != "Todos":
+                bits &= indice("jugador", id_por_nombre[rival])
+        if lugar_var.get() != "Todos":
+            bits &= indice("lugar", lugar_var.get())
+        return bits
+
+    def leer_filtros():
+        """
+        (jugador filtrado o "Todos", bitset de la selección, día desde, día
+        hasta). De paso pone al día el resumen, que sale del bitset.
+        """
         filtro_jugador = jugador_filtro_var.get()
-        fecha_desde = fecha_desde_var.get_date()
-        fecha_hasta = fecha_hasta_var.get_date()
+        if filtro_jugador != "Todos":
+            filtro_jugador = id_por_nombre[filtro_jugador]
+        bits = seleccion_por_indices(filtro_jugador)
+        if filtro_jugador != "Todos":
+            victorias, derrotas = balance(filtro_jugador, bits)
+            resumen_label.config(text=f"{bits.bit_count()} partidos: {victorias} victorias, {derrotas} derrotas")
+        else:
+            resumen_label.config(text=f"{bits.bit_count()} partidos")
+        return (filtro_jugador, bits,
+                fecha_desde_var.get_date().toordinal(), fecha_hasta_var.get_date().toordinal())
+
+    def en_fechas(r, filtros):
+        dia = dia_ordinal(r["fecha"])
+        return dia is not None and filtros[2] <= dia <= filtros[3]
+
+    def fila_partido(idx, r, filtro_jugador):
+        eq1_str = " & ".join(nombre_jugador(j) for j in r["partido"][0])
+        eq2_str = " & ".join(nombre_jugador(j) for j in r["partido"][1])
+        puntuaciones = "; ".join(r["puntuaciones"]) if r["puntuaciones"] else "N/A"
+        ganador = " & ".join(nombre_jugador(j) for j in r["ganador_partido"])
+        mvp = nombre_jugador(r["mvp"])
+        tie_breaks = r["tie_breaks"]
+        lugar = r["lugar"]
+
+        # Calculamos Δ Rating solo si estamos filtrando un jugador concreto
+        delta_rating = ""
+        if filtro_jugador != "Todos":
+            cambios = ts_changes_por_partido.get(idx, {})
+            if filtro_jugador in cambios:
+                diff = cambios[filtro_jugador]
+                delta_rating = f"+{diff}" if diff >= 0 else str(diff)
+
+        return (
+            r["fecha"],
+            eq1_str,
+            eq2_str,
+            puntuaciones,
+            ganador,
+            mvp,
+            tie_breaks,
+            lugar,
+            delta_rating
+        )
 
-        for season in sorted_seasons:
+    def rellenar_seasons(seasons, filtros):
+        """
+        Vuelve a pintar enteras las pestañas de esas seasons; la que no está
+        a la vista se queda pendiente hasta que se abra.
+        """
+        visible = season_visible()
+        seleccionados = None
+        for season in seasons:
+            if season != visible:
+                pendientes.add(season)
+                continue
+            if seleccionados is None:
+                seleccionados = set(posiciones_de_bits(filtros[1]))
+            pendientes.discard(season)
             tree = treeviews[season]
             tree.delete(*tree.get_children())
 
-            lista_partidos = seasons_dict[season]
-            lista_partidos.sort(key=lambda x: x[1]["fecha"])
+            # Una season puede quedarse sin partidos al borrar
+            for (idx, r) in partidos_de_pestana(season):
+                if idx in seleccionados and en_fechas(r, filtros):
+                    tree.insert("", tk.END, iid=str(idx), values=fila_partido(idx, r, filtros[0]))
+
+    def colocar(season, idx, filtros):
+        """Pone, actualiza o quita la fila del partido idx en la pestaña de season."""
+        tree = treeviews[season]
+        iid = str(idx)
+        r = resultados[idx]
+        if r["season"] != season or not (filtros[1] >> idx & 1 and en_fechas(r, filtros)):
+            if tree.exists(iid):
+                tree.delete(iid)
+            return
+        # Va justo delante de la siguiente fila de la season que esté a la vista
+        lista_partidos = seasons_dict[season]
+        siguiente = ""
+        for otro, _ in lista_partidos[bisect_right(lista_partidos, clave_fila((idx, r)), key=clave_fila):]:
+            if tree.exists(str(otro)):
+                siguiente = str(otro)
+                break
+        values = fila_partido(idx, r, filtros[0])
+        if tree.exists(iid):
+            tree.item(iid, values=values)
+            if tree.next(iid) == siguiente:
+                return
+            tree.detach(iid)
+        posicion = tree.index(siguiente) if siguiente else tk.END
+        if tree.exists(iid):
+            tree.move(iid, "", posicion)
+        else:
+            tree.insert("", posicion, iid=iid, values=values)
 
-            for (idx, r) in lista_partidos:
-                match_date = datetime.strptime(r["fecha"], '%Y-%m-%d').date()
-                # Filtro por rango de fecha
-                if not (fecha_desde <= match_date <= fecha_hasta):
-                    continue
+    def actualizar_partidos():
+        rellenar_seasons(list(treeviews), leer_filtros())
 
-                eq1_str = " & ".join(r["partido"][0])
-                eq2_str = " & ".join(r["partido"][1])
-                puntuaciones = "; ".join(r["puntuaciones"]) if r["puntuaciones"] else "N/A"
-                ganador = " & ".join(r["ganador_partido"])
-                mvp = r["mvp"]
-                tie_breaks = r["tie_breaks"]
-                lugar = r["lugar"]
-
-                # Filtro por jugador
-                jug_partido = list(r["partido"][0]) + list(r["partido"][1])
-                if filtro_jugador != "Todos" and filtro_jugador not in jug_partido:
-                    continue
+    def al_cambiar_pestana(event=None):
+        if season_visible() in pendientes:
+            rellenar_seasons([season_visible()], leer_filtros())
 
-                # Calculamos Δ Rating solo si estamos filtrando un jugador concreto
-                delta_rating = ""
-                if filtro_jugador != "Todos":
-                    cambios = ts_changes_por_partido.get(idx, {})
-                    if filtro_jugador in cambios:
-                        diff = cambios[filtro_jugador]
-                        delta_rating = f"+{diff}" if diff >= 0 else str(diff)
-
-                tree.insert("", tk.END, values=(
-                    r["fecha"],
-                    eq1_str,
-                    eq2_str,
-                    puntuaciones,
-                    ganador,
-                    mvp,
-                    tie_breaks,
-                    lugar,
-                    delta_rating
-                ))
-
-    jugador_filtro_combobox.bind("<<ComboboxSelected>>", lambda e: actualizar_partidos())
+    notebook.bind("<<NotebookTabChanged>>", al_cambiar_pestana)
+    for combobox in (jugador_filtro_combobox, companero_combobox, rival_combobox,
+                     lugar_combobox, resultado_combobox):
+        combobox.bind("<<ComboboxSelected>>", lambda e: actualizar_partidos())
     actualizar_partidos()
 
-    ttk.Button(partidos_window, text="Cerrar", command=partidos_window.destroy).pack(pady=5)
+    def revisar_filtros():
+        """Pone al día los jugadores de los filtros; True si se ha quitado alguno que ya no está."""
+        opciones = ["Todos"] + jugadores
+        quitado = False
+        for combobox, var in ((jugador_filtro_combobox, jugador_filtro_var),
+                              (companero_combobox, companero_var), (rival_combobox, rival_var)):
+            combobox.configure(values=opciones)
+            if var.get() not in opciones:
+                var.set("Todos")
+                quitado = True
+        return quitado
+
+    def refrescar(cambios=None):
+        asegurar_rankings()
+        lugar_combobox.configure(values=["Todos"] + sorted(l for l in indices_lugares() if l))
+        if cambios is None or any(c.tipo == "todo" for c in cambios):
+            revisar_filtros()
+            construir_pestanas()
+            actualizar_partidos()
+            return
+        renombrados = set()
+        if any(c.tipo == "jugadores" for c in cambios):
+            renombrados = jugadores_afectados([c for c in cambios if c.tipo == "jugadores"])
+            if renombrados is None or revisar_filtros():
+                actualizar_partidos()
+                return
+        de_partidos = [c for c in cambios if c.tipo != "jugadores"]
+        filtros = leer_filtros()
+        if any(c.tipo in ("borrado", "insertado") for c in de_partidos):
+            # Los ids desde el primer borrado o inserción se han renumerado:
+            # se rehacen solo las seasons que tienen partidos a partir de ahí
+            desde = min(c.idx for c in de_partidos)
+            rehacer = seasons_afectadas(de_partidos)
+            rehacer |= {season for season, lista in seasons_dict.items() if any(idx >= desde for idx, _ in lista)}
+            rehacer |= {r["season"] for r in resultados.vivos[max(desde - resultados.inicio_vivos, 0):]}
+            for season in rehacer:
+                # Las seasons sin leer se leerán ya renumeradas al abrirlas
+                seasons_dict.pop(season, None)
+                if season not in treeviews:
+                    crear_pestana(season)
+            rellenar_seasons(rehacer, filtros)
+        else:
+            repintar = set()
+            for c in de_partidos:
+                if c.tipo == "editado":
+                    for season in c.seasons & seasons_dict.keys():
+                        seasons_dict[season] = [fila for fila in seasons_dict[season] if fila[0] != c.idx]
+                r = resultados[c.idx]
+                if r["season"] in seasons_dict:
+                    insort(seasons_dict[r["season"]], (c.idx, r), key=clave_fila)
+                if r["season"] not in treeviews:
+                    crear_pestana(r["season"])
+                if c.repite and filtros[0] != "Todos":
+                    # Cambian los Δ Rating del resto de partidos de la season
+                    repintar |= c.seasons
+                else:
+                    for season in c.seasons:
+                        if season in seasons_dict and season not in pendientes:
+                            colocar(season, c.idx, filtros)
+                        else:
+                            pendientes.add(season)
+            rellenar_seasons(repintar, filtros)
+        if renombrados:
+            bits = 0
+            for pid in renombrados:
+                bits |= indice("jugador", pid)
+            for idx in posiciones_de_bits(bits & filtros[1]):
+                for tree in treeviews.values():
+                    if tree.exists(str(idx)):
+                        tree.item(str(idx), values=fila_partido(idx, resultados[idx], filtros[0]))
+
+    suscribir_ventana(partidos_window, refrescar)
+
+    def partido_seleccionado():
+        """Id del partido seleccionado en la pestaña visible (o None)."""
+        pestana = notebook.select()
+        for tree in treeviews.values():
+            if str(tree.master) == pestana and tree.selection():
+                return int(tree.selection()[0])
+        messagebox.showinfo("Partidos", "Selecciona un partido.", parent=partidos_window)
+        return None
+
+    def editar():
+        idx = partido_seleccionado()
+        if idx is not None:
+            editar_partido_dialogo(partidos_window, idx)
+
+    def borrar():
+        idx = partido_seleccionado()
+        if idx is None:
+            return
+        r = resultados[idx]
+        descripcion = (f"{r['fecha']}: " + " & ".join(nombre_jugador(j) for j in r["partido"][0]) +
+                       " vs " + " & ".join(nombre_jugador(j) for j in r["partido"][1]))
+        if not messagebox.askyesno("Confirmar", f"¿Borrar el partido {descripcion}?", parent=partidos_window):
+            return
+        try:
+            borrar_partido(idx)
+        except ValueError as e:
+            messagebox.showerror("Error", str(e), parent=partidos_window)
+            return
+        notificar_cambios()
+
+    def deshacer():
+        if deshacer_edicion():
+            notificar_cambios()
+        else:
+            messagebox.showinfo("Partidos", "No hay nada que deshacer.", parent=partidos_window)
+
+    botones = tk.Frame(partidos_window)
+    botones.pack(pady=5)
+    ttk.Button(botones, text="Editar Partido", command=editar).pack(side='left', padx=5)
+    ttk.Button(botones, text="Borrar Partido", command=borrar).pack(side='left', padx=5)
+    ttk.Button(botones, text="Deshacer", command=deshacer).pack(side='left', padx=5)
+    ttk.Button(botones, text="Cerrar", command=partidos_window.destroy).pack(side='left', padx=5)
 
 # ---------------------------------
 # 11. Estadísticas Generales y Gráficos
 # ---------------------------------
-def calcular_estadisticas(resultados_filtrar):
-    lugares = ["Ibaiondo", "Bakh", "Otro"]
+LUGARES_ESTADISTICAS = ["Ibaiondo", "Bakh", "Otro"]
+
+def _estadisticas_vacias(lugares=LUGARES_ESTADISTICAS):
+    return {
+        "partidos_jugados": 0,
+        "victorias": 0,
+        "mvp": 0,
+        "sets_jugados": 0,
+        "sets_ganados": 0,
+        "tie_breaks": 0,
+        "primer_set_ganado": 0,
+        "games_ganados": 0,
+        "games_perdidos": 0,
+        "victorias_por_lugar": {l: 0 for l in lugares}
+    }
+
+def calcular_estadisticas(resultados_filtrar, lugares=LUGARES_ESTADISTICAS):
+    """
+    Estadísticas por jugador de una lista (o iterable) de partidos, o de un
+    array del registro binario (entonces se calculan vectorizadas). Las
+    victorias por lugar se cuentan para los de lugares.
+    """
+    if isinstance(resultados_filtrar, np.ndarray):
+        return _completar_estadisticas(_estadisticas_desde_registro(resultados_filtrar, lugares))
     estadisticas = {}
-    for j in jugadores:
-        estadisticas[j] = {
-            "partidos_jugados": 0,
-            "victorias": 0,
-            "mvp": 0,
-            "sets_jugados": 0,
-            "sets_ganados": 0,
-            "tie_breaks": 0,
-            "primer_set_ganado": 0,
-            "games_ganados": 0,
-            "games_perdidos": 0,
-            "victorias_por_lugar": {l: 0 for l in lugares}
-        }
+    for j in ids_activos_ordenados():
+        estadisticas[j] = _estadisticas_vacias(lugares)
     for r in resultados_filtrar:
         eq1, eq2 = r["partido"]
         ganador = r["ganador_partido"]
@@ -712,18 +5220,7 @@ def calcular_estadisticas(resultados_filtrar):
         sets_jugados = len(r["puntuaciones"])
         for jug in eq1 + eq2:
             if jug not in estadisticas:
-                estadisticas[jug] = {
-                    "partidos_jugados": 0,
-                    "victorias": 0,
-                    "mvp": 0,
-                    "sets_jugados": 0,
-                    "sets_ganados": 0,
-                    "tie_breaks": 0,
-                    "primer_set_ganado": 0,
-                    "games_ganados": 0,
-                    "games_perdidos": 0,
-                    "victorias_por_lugar": {l: 0 for l in lugares}
-                }
+                estadisticas[jug] = _estadisticas_vacias(lugares)
         for jug in eq1 + eq2:
             estadisticas[jug]["partidos_jugados"] += 1
             estadisticas[jug]["sets_jugados"] += sets_jugados
@@ -757,6 +5254,67 @@ def calcular_estadisticas(resultados_filtrar):
                 estadisticas[jug]["games_perdidos"] += s1
         if mvp in estadisticas:
             estadisticas[mvp]["mvp"] += 1
+    return _completar_estadisticas(estadisticas)
+
+def _estadisticas_desde_registro(registros, lugares=LUGARES_ESTADISTICAS):
+    """Los mismos contadores que calcular_estadisticas, con bincount sobre el registro."""
+    estadisticas = {j: _estadisticas_vacias(lugares) for j in ids_activos_ordenados()}
+    if len(registros) == 0:
+        return estadisticas
+    jugadores = registros["jugadores"].astype(np.int64)
+    planos = jugadores.ravel()
+    validos = planos >= 0
+    # Los jugadores que no están activos entran en el orden en que aparecen
+    presentes, primera = np.unique(planos[validos], return_index=True)
+    for pid in presentes[np.argsort(primera)].tolist():
+        if pid not in estadisticas:
+            estadisticas[pid] = _estadisticas_vacias(lugares)
+    N = int(planos.max()) + 1
+
+    def por_jugador(pesos):
+        pesos = np.broadcast_to(pesos, jugadores.shape).ravel()[validos]
+        return np.bincount(planos[validos], weights=pesos, minlength=N)
+
+    en_eq1 = np.array([True, True, False, False])[None, :]
+    gano = np.where(en_eq1, registros["gana"][:, None] == 1, registros["gana"][:, None] == 2)
+    primer_set = np.where(en_eq1, registros["primer_set"][:, None] == 1, registros["primer_set"][:, None] == 2)
+    # Solo los sets que hay de verdad (n_sets), hasta MAX_SETS_REGISTRO
+    contados = np.arange(MAX_SETS_REGISTRO)[None, :] < registros["n_sets"][:, None]
+    g1 = registros["sets"][:, :, 0].astype(np.int64) * contados
+    g2 = registros["sets"][:, :, 1].astype(np.int64) * contados
+    sets_eq1 = ((g1 > g2) & contados).sum(axis=1)
+    sets_eq2 = contados.sum(axis=1) - sets_eq1
+    con_tie_break = (registros["sets_tie_break"][:, None] >> np.arange(MAX_SETS_REGISTRO)[None, :]) & 1
+    tie_breaks = (con_tie_break * contados).sum(axis=1)
+    games1, games2 = g1.sum(axis=1), g2.sum(axis=1)
+
+    totales = {
+        "partidos_jugados": por_jugador(1),
+        "victorias": por_jugador(gano),
+        "sets_jugados": por_jugador(registros["n_sets"].astype(np.int64)[:, None]),
+        "sets_ganados": por_jugador(np.where(en_eq1, sets_eq1[:, None], sets_eq2[:, None])),
+        "tie_breaks": por_jugador(tie_breaks[:, None]),
+        "primer_set_ganado": por_jugador(primer_set),
+        "games_ganados": por_jugador(np.where(en_eq1, games1[:, None], games2[:, None])),
+        "games_perdidos": por_jugador(np.where(en_eq1, games2[:, None], games1[:, None])),
+    }
+    mvps = registros["mvp"][registros["mvp"] >= 0]
+    totales["mvp"] = np.bincount(mvps, minlength=N)[:N] if len(mvps) else np.zeros(N)
+    por_lugar = {}
+    for lugar in lugares:
+        i = registro._indice_lugares.get(lugar)
+        por_lugar[lugar] = np.zeros(N) if i is None else por_jugador(gano & (registros["lugar"] == i)[:, None])
+    for pid, st in estadisticas.items():
+        if pid >= N:
+            continue
+        for clave, valores in totales.items():
+            st[clave] = int(valores[pid])
+        for lugar, valores in por_lugar.items():
+            st["victorias_por_lugar"][lugar] = int(valores[pid])
+    return estadisticas
+
+def _completar_estadisticas(estadisticas):
+    """Porcentajes y diferencia de games a partir de los contadores."""
     for jug, st in estadisticas.items():
         pj = st["partidos_jugados"]
         if pj > 0:
@@ -778,28 +5336,32 @@ def leer_torneos():
     global torneo_winners
     archivo_torneos = resource_path("torneos.csv")
     torneo_winners.clear()
+    hay_nombres = False
     if os.path.exists(archivo_torneos):
         with open(archivo_torneos, mode='r', newline='', encoding='utf-8-sig') as file:
             reader = csv.DictReader(file)
             for row in reader:
                 fecha = row["fecha"].strip()
-                g1 = row["ganador1"].strip()
-                g2 = row["ganador2"].strip()
+                g1, nombre1 = resolver_jugador(row["ganador1"])
+                g2, nombre2 = resolver_jugador(row["ganador2"])
+                hay_nombres = hay_nombres or nombre1 or nombre2
                 torneo_winners.append((fecha, g1, g2))
+    if hay_nombres:
+        # Migración única de nombres a ids
+        guardar_jugadores()
+        filas = ({"fecha": fecha, "ganador1": g1, "ganador2": g2} for (fecha, g1, g2) in torneo_winners)
+        persistencia.reemplazar(archivo_torneos, lineas_csv(["fecha", "ganador1", "ganador2"], filas, cabecera=True),
+                                encoding="utf-8-sig")
 
 def guardar_torneo_csv(fecha, g1, g2):
     """
     Añade una nueva entrada de torneo (fecha, ganador1, ganador2) en torneos.csv.
     """
-    archivo_torneos = resource_path("torneos.csv")
-    file_exists = os.path.exists(archivo_torneos)
     fieldnames = ["fecha", "ganador1", "ganador2"]
-
-    with open(archivo_torneos, mode='a', newline='', encoding='utf-8-sig') as file:
-        writer = csv.DictWriter(file, fieldnames=fieldnames)
-        if not file_exists:
-            writer.writeheader()  # Escribe la cabecera si el archivo no existía
-        writer.writerow({"fecha": fecha, "ganador1": g1, "ganador2": g2})
+    # La cabecera solo se escribe si el archivo no existía
+    persistencia.anexar(resource_path("torneos.csv"),
+                        [lineas_csv(fieldnames, [{"fecha": fecha, "ganador1": g1, "ganador2": g2}])],
+                        cabecera=lineas_csv(fieldnames, [], cabecera=True))
 
 def añadir_ganadores_torneo():
     win = tk.Toplevel()
@@ -830,6 +5392,7 @@ def añadir_ganadores_torneo():
             messagebox.showerror("Error", "Selecciona ambos ganadores.")
             return
         
+        g1, g2 = id_por_nombre[g1], id_por_nombre[g2]
         fecha_str = fecha_var.get_date().strftime('%Y-%m-%d')
         # Añadimos en la lista en memoria
         torneo_winners.append((fecha_str, g1, g2))
@@ -844,50 +5407,56 @@ def añadir_ganadores_torneo():
 def mostrar_estadisticas():
     stats_window = tk.Toplevel()
     stats_window.title("Estadísticas de Jugadores")
-    stats_window.geometry("1000x600")
+    stats_window.geometry("1500x600")
 
     filtro_frame = ttk.Frame(stats_window)
     filtro_frame.pack(pady=5)
 
     tk.Label(filtro_frame, text="Selecciona Season:", font=('Helvetica', 10)).grid(row=0, column=0, padx=5)
-    recalcular_trueskill_por_season()
+    asegurar_rankings()
 
-    def season_sort_key(s):
-        if s == "Season 0":
-            return 0
-        try:
-            return int(s.split()[1])
-        except:
-            return 9999
-
-    all_seasons = sorted(ranking_trueskill_por_season.keys(), key=season_sort_key)
-    seasons_combo = ["Todas"] + all_seasons
+    all_seasons = sorted(ranking_trueskill_por_season.keys())
+    seasons_combo = ["Todas"] + [nombre_season(sid) for sid in all_seasons]
     season_var = tk.StringVar(value="Todas")
     combo_season = ttk.Combobox(filtro_frame, textvariable=season_var, values=seasons_combo, state='readonly')
     combo_season.grid(row=0, column=1, padx=5)
 
     columnas = ("Jugador", "PJ", "Vict", "%Vict", "SetsJug", "SetsGan",
-                "GamesGan", "GamesPer", "DifGames", "MVP", "TieBreaks", "%PrimerSet", "Títulos")
+                "GamesGan", "GamesPer", "DifGames", "MVP", "TieBreaks", "%PrimerSet", "Títulos",
+                f"Últ.{VENTANA_FORMA}", f"%Últ.{VENTANA_FORMA}", "Racha", "MáxV", "MáxD",
+                f"ΔRating{VENTANA_FORMA}", f"DifGames{VENTANA_FORMA}")
 
     tree = ttk.Treeview(stats_window, columns=columnas, show='headings')
     for col in columnas:
         tree.heading(col, text=col)
-        tree.column(col, anchor='center', width=80)
+        tree.column(col, anchor='center', width=72)
     tree.pack(side='left', fill='both', expand=True)
 
     scrollbar_y = ttk.Scrollbar(stats_window, orient='vertical', command=tree.yview)
     scrollbar_y.pack(side='right', fill='y')
     tree.configure(yscrollcommand=scrollbar_y.set)
 
-    def cargar_estadisticas():
-        tree.delete(*tree.get_children())
+    # {id: (values, tags)} de las filas pintadas
+    mostradas = {}
+
+    def cargar_estadisticas(solo=None):
+        """Pinta las estadísticas de la season elegida; con solo, únicamente las de esos jugadores."""
         sel_season = season_var.get()
         if sel_season == "Todas":
-            resultados_filtrar = resultados
+            resultados_filtrar = registro_o_partidos()
+            forma = asegurar_forma()[None]
         else:
-            resultados_filtrar = [r for r in resultados if r["season"] == sel_season]
+            sel_season = id_season_por_nombre.get(sel_season, SEASON_DESCONOCIDA)
+            resultados_filtrar = registro_o_partidos(sel_season)
+            forma = asegurar_forma().get(sel_season, {})
+        if solo is not None:
+            # Los totales de un jugador solo dependen de sus partidos
+            resultados_filtrar = partidos_de_jugadores(resultados_filtrar, solo)
         stats = calcular_estadisticas(resultados_filtrar)
+        filas = {}
         for jug, st in stats.items():
+            if solo is not None and jug not in solo:
+                continue
             pj = st["partidos_jugados"]
             vict = st["victorias"]
             porc_vict = f"{st['porcentaje_victorias']:.1f}%"
@@ -900,137 +5469,354 @@ def mostrar_estadisticas():
             tie_b = st["tie_breaks"]
             porc_pset = f"{st['porcentaje_primer_set']:.1f}%"
             titulos = trofeos_Liga_jugador[jug]
-            tree.insert("", tk.END, values=(
-                jug, pj, vict, porc_vict, sets_jug, sets_gan,
+            f = forma.get(jug) or FormaJugador()
+            filas[str(jug)] = ((
+                nombre_jugador(jug), pj, vict, porc_vict, sets_jug, sets_gan,
                 games_gan, games_per, dif_games, mvp, tie_b, porc_pset,
-                titulos
-            ))
+                titulos,
+                f.texto_ultimos() or "-", f"{f.porcentaje():.0f}%", f.texto_racha(),
+                f.mejor_racha, f.peor_racha, f"{f.suma_deltas:+.2f}", f.suma_games
+            ), ())
+        if solo is not None:
+            if any(iid not in mostradas for iid in filas):
+                # Aparece una fila nueva: su sitio sale de la tabla completa
+                return cargar_estadisticas()
+            filas = {iid: filas.get(iid, mostradas[iid]) for iid in tree.get_children()}
+        sincronizar_filas(tree, [(iid, values, tags) for iid, (values, tags) in filas.items()], mostradas)
 
     combo_season.bind("<<ComboboxSelected>>", lambda e: cargar_estadisticas())
     cargar_estadisticas()
 
-def mostrar_grafico_jugadores():
-    recalcular_trueskill_por_season()
-    if not ranking_trueskill_por_season:
-        messagebox.showinfo("Info", "No hay datos de TrueSkill para mostrar.")
-        return
+    def refrescar(cambios=None):
+        asegurar_rankings()
+        combo_season.configure(values=["Todas"] + [nombre_season(sid) for sid in
+                                                   sorted(ranking_trueskill_por_season.keys())])
+        afectadas = seasons_afectadas(cambios)
+        if (afectadas is not None and season_var.get() != "Todas" and
+                id_season_por_nombre.get(season_var.get(), SEASON_DESCONOCIDA) not in afectadas):
+            return
+        # Con jugadores renombrados o dados de baja cambia el orden de las filas
+        solo = None if cambios is None or any(c.tipo == "jugadores" for c in cambios) else jugadores_afectados(cambios)
+        if solo is not None:
+            # Un podio nuevo cambia los títulos de quien lo pierde
+            solo |= {int(iid) for iid, (values, _) in mostradas.items()
+                     if values[12] != trofeos_Liga_jugador[int(iid)]}
+        cargar_estadisticas(solo)
+
+    suscribir_ventana(stats_window, refrescar)
+
+def mostrar_sinergias_parejas():
+    win = tk.Toplevel()
+    win.title("Sinergia de Parejas")
+    win.geometry("700x500")
+
+    filtro_frame = ttk.Frame(win)
+    filtro_frame.pack(pady=5)
+    tk.Label(filtro_frame, text="Selecciona Season:", font=('Helvetica', 10)).grid(row=0, column=0, padx=5)
+    tk.Label(filtro_frame, text="Mín. partidos juntos:", font=('Helvetica', 10)).grid(row=0, column=2, padx=5)
+    season_var = tk.StringVar()
+    combo_season = ttk.Combobox(filtro_frame, textvariable=season_var, state='readonly')
+    combo_season.grid(row=0, column=1, padx=5)
+    minimo_var = tk.IntVar(value=2)
+    tk.Spinbox(filtro_frame, from_=1, to=50, width=4, textvariable=minimo_var).grid(row=0, column=3, padx=5)
+
+    columnas = ("Pareja", "Sinergia", "Partidos juntos")
+    arboles = []
+    for titulo in ("Mejores parejas", "Peores parejas"):
+        tk.Label(win, text=titulo, font=('Helvetica', 11, 'bold')).pack(pady=(10, 0))
+        tree = ttk.Treeview(win, columns=columnas, show='headings', height=8)
+        for col in columnas:
+            tree.heading(col, text=col)
+            tree.column(col, anchor='center', width=200)
+        tree.pack(fill='x', padx=10)
+        arboles.append(tree)
 
-    def season_sort_key(s):
-        if s == "Season 0":
-            return 0
+    def cargar():
+        season = id_season_por_nombre.get(season_var.get(), SEASON_DESCONOCIDA)
         try:
-            return int(s.split()[1])
-        except:
-            return 9999
+            minimo = minimo_var.get()
+        except tk.TclError:
+            minimo = 1
+        for tree, peores in zip(arboles, (False, True)):
+            tree.delete(*tree.get_children())
+            for pareja, sinergia, n in mejores_parejas(season, k=10, peores=peores, min_partidos=minimo):
+                tree.insert("", tk.END, values=(nombre_pareja(pareja), f"{sinergia:+.2f}", n))
+
+    def refrescar(cambios=None):
+        afectadas = seasons_afectadas(cambios)
+        if (afectadas is not None and afectadas <= sinergias_por_season.keys() and
+                id_season_por_nombre.get(season_var.get()) not in afectadas):
+            # Las sinergias de una season solo dependen de sus partidos
+            return
+        asegurar_sinergias()
+        nombres = [nombre_season(sid) for sid in sorted(sinergias_por_season)]
+        combo_season.configure(values=nombres)
+        if season_var.get() not in nombres and nombres:
+            season_var.set(nombres[-1])
+        cargar()
+
+    combo_season.bind("<<ComboboxSelected>>", lambda e: cargar())
+    minimo_var.trace_add("write", lambda *args: cargar())
+    refrescar()
+    suscribir_ventana(win, refrescar)
+
+def mostrar_proyeccion_season():
+    season = season_actual()
+    win = tk.Toplevel()
+    win.title(f"Proyección de {nombre_season(season)}")
+    win.geometry("600x500")
+
+    opciones = ttk.Frame(win)
+    opciones.pack(pady=5)
+    tk.Label(opciones, text="Simulaciones:").grid(row=0, column=0, padx=5)
+    sim_var = tk.IntVar(value=20000)
+    tk.Entry(opciones, textvariable=sim_var, width=8).grid(row=0, column=1, padx=5)
+    tk.Label(opciones, text="Partidos restantes:").grid(row=0, column=2, padx=5)
+    restantes_var = tk.IntVar(value=estimar_partidos_restantes(season))
+    tk.Entry(opciones, textvariable=restantes_var, width=6).grid(row=0, column=3, padx=5)
+    tk.Label(opciones, text="Semilla:").grid(row=0, column=4, padx=5)
+    semilla_var = tk.IntVar(value=2024)
+    tk.Entry(opciones, textvariable=semilla_var, width=8).grid(row=0, column=5, padx=5)
+
+    estado_label = tk.Label(win, text="")
+    estado_label.pack()
+    columnas = ("Jugador", "Rating actual", "1º", "2º", "3º")
+    tree = ttk.Treeview(win, columns=columnas, show='headings')
+    for col in columnas:
+        tree.heading(col, text=col)
+        tree.column(col, anchor='center', width=100)
+    tree.pack(fill='both', expand=True, padx=10, pady=5)
 
-    sorted_seasons = sorted(ranking_trueskill_por_season.keys(), key=season_sort_key)
-    last_season = sorted_seasons[-1]
-    ranking = ranking_trueskill_por_season[last_season]
+    def lanzar():
+        try:
+            n_sim, restantes, semilla = sim_var.get(), restantes_var.get(), semilla_var.get()
+        except tk.TclError:
+            messagebox.showerror("Error", "Simulaciones, partidos y semilla deben ser números enteros.")
+            return
+        asegurar_rankings()
+        ratings = dict(ranking_trueskill_por_season.get(season, {}))
+        estado_label.config(text=f"Simulando {n_sim} finales de season...")
+        futuro = _calculo_executor.submit(proyectar_season, season, n_sim, restantes, semilla)
 
-    fig, ax = plt.subplots(figsize=(8, 6))
-    jugadores_ = list(ranking.keys())
-    rating_values = [rating_value(ranking[j]) for j in jugadores_]
-    ax.bar(jugadores_, rating_values, color='steelblue')
-    ax.set_title(f"Ranking TrueSkill - {last_season}")
-    ax.set_xlabel("Jugador")
-    ax.set_ylabel("TS Rating (mu - 2.5*sigma)")
-    plt.setp(ax.get_xticklabels(), rotation=45, ha="right")
-    fig.tight_layout()
+        def comprobar():
+            if not win.winfo_exists():
+                return
+            if not futuro.done():
+                win.after(100, comprobar)
+                return
+            try:
+                restantes_usados, probabilidades = futuro.result()
+            except Exception as e:
+                estado_label.config(text=f"Error en la simulación: {e}")
+                return
+            estado_label.config(text=f"{n_sim} simulaciones con {restantes_usados} partidos por jugar")
+            tree.delete(*tree.get_children())
+            for pid, (p1, p2, p3) in sorted(probabilidades.items(), key=lambda x: x[1], reverse=True):
+                actual = f"{rating_value(ratings[pid]):.2f}" if pid in ratings else "-"
+                tree.insert("", tk.END, values=(nombre_jugador(pid), actual,
+                                                f"{p1:.1%}", f"{p2:.1%}", f"{p3:.1%}"))
+
+        comprobar()
 
+    ttk.Button(opciones, text="Simular", command=lanzar).grid(row=0, column=6, padx=10)
+    lanzar()
+
+# ---------------------------------
+# NUEVO: Caché de gráficos y render fuera de pantalla
+# ---------------------------------
+# Los gráficos se dibujan con Figure + Agg (sin pyplot, así no quedan
+# figuras vivas en su registro) en un hilo aparte y se guardan como PNG.
+# La clave incluye version_datos, que sube cada vez que cambian los datos.
+MAX_GRAFICOS_CACHE = 16
+cache_graficos = OrderedDict()  # {(tipo, season, version_datos): bytes PNG}
+_render_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="render")
+
+def _render_png(fig):
+    """Dibuja la figura con Agg, devuelve el PNG y libera la figura."""
+    FigureCanvasAgg(fig)
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format="png")
+    fig.clear()
+    return buffer.getvalue()
+
+def _guardar_en_cache(clave, png):
+    # Las entradas de versiones antiguas ya no se van a pedir nunca
+    for vieja in [c for c in cache_graficos if c[2] != version_datos]:
+        del cache_graficos[vieja]
+    cache_graficos[clave] = png
+    cache_graficos.move_to_end(clave)
+    while len(cache_graficos) > MAX_GRAFICOS_CACHE:
+        cache_graficos.popitem(last=False)
+
+def en_cache_graficos(tipo, season):
+    return (tipo, season, version_datos) in cache_graficos
+
+def mostrar_grafico_cacheado(tipo, season, titulo, construir_figura):
+    """
+    Abre una ventana con el gráfico (tipo, season). Si ya está en caché
+    para la versión actual de los datos se muestra al instante; si no,
+    construir_figura() se ejecuta en el hilo de render y la ventana se
+    rellena cuando termina.
+    """
+    clave = (tipo, season, version_datos)
     win = tk.Toplevel()
-    win.title("Gráfico de Jugadores (TrueSkill)")
-    canvas = FigureCanvasTkAgg(fig, master=win)
-    canvas.draw()
-    canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+    win.title(titulo)
+    etiqueta = tk.Label(win, text="Generando gráfico...")
+    etiqueta.pack(fill=tk.BOTH, expand=True)
+
+    def pintar(png):
+        imagen = tk.PhotoImage(data=base64.b64encode(png))
+        etiqueta.configure(image=imagen, text="")
+        etiqueta.image = imagen  # Evita que el recolector borre la imagen
+
+    if clave in cache_graficos:
+        cache_graficos.move_to_end(clave)
+        pintar(cache_graficos[clave])
+        return
+
+    futuro = _render_executor.submit(lambda: _render_png(construir_figura()))
+
+    def comprobar():
+        if not win.winfo_exists():
+            return
+        if not futuro.done():
+            win.after(50, comprobar)
+            return
+        try:
+            png = futuro.result()
+        except Exception as e:
+            etiqueta.configure(text=f"Error al generar el gráfico: {e}")
+            return
+        _guardar_en_cache(clave, png)
+        pintar(png)
+
+    comprobar()
+
+def _ultima_season():
+    return max(ranking_trueskill_por_season.keys())
+
+def etiqueta_rating(motor=None):
+    """Texto del eje de ratings: el motor activo (o motor) y lo que es rating_value."""
+    return f"Rating {(motor or motor_actual).nombre} (mu - 2*sigma)"
+
+def mostrar_grafico_jugadores():
+    asegurar_rankings()
+    if not ranking_trueskill_por_season:
+        messagebox.showinfo("Info", "No hay rankings para mostrar.")
+        return
+
+    last_season = _ultima_season()
+    ranking = ranking_trueskill_por_season[last_season]
+    # Los datos se copian aquí (hilo de Tk); el hilo de render solo dibuja
+    nombres = [nombre_jugador(j) for j in ranking]
+    rating_values = [rating_value(r) for r in ranking.values()]
+    nombre_motor = motor_actual.nombre
+    eje_rating = etiqueta_rating()
+
+    def construir():
+        fig = Figure(figsize=(8, 6))
+        ax = fig.add_subplot()
+        ax.bar(nombres, rating_values, color='steelblue')
+        ax.set_title(f"Ranking {nombre_motor} - {nombre_season(last_season)}")
+        ax.set_xlabel("Jugador")
+        ax.set_ylabel(eje_rating)
+        setp(ax.get_xticklabels(), rotation=45, ha="right")
+        fig.tight_layout()
+        return fig
+
+    mostrar_grafico_cacheado("jugadores", last_season,
+                             f"Gráfico de Jugadores ({nombre_motor})", construir)
 
 def mostrar_grafico_acumulado():
     if not resultados:
         messagebox.showinfo("Info", "No hay resultados para mostrar.")
         return
-    sorted_resultados = sorted(resultados, key=lambda r: r["fecha"])
-    if not sorted_resultados:
-        messagebox.showinfo("Info", "No hay resultados para mostrar.")
+    titulo = f"Gráfico Acumulado ({motor_actual.nombre})"
+    if en_cache_graficos("acumulado", "Todas"):
+        mostrar_grafico_cacheado("acumulado", "Todas", titulo, None)
         return
-
-    ratings_local = {j: env.create_rating() for j in jugadores}
-    history = {j: [] for j in jugadores}
-
-    first_date = datetime.strptime(sorted_resultados[0]["fecha"], '%Y-%m-%d')
-    for j in jugadores:
-        history[j].append((first_date, rating_value(ratings_local[j])))
-
-    for r in sorted_resultados:
-        match_date = datetime.strptime(r["fecha"], '%Y-%m-%d')
-        actualizar_trueskill_sin_guardar(ratings_local, r)
-        for j in jugadores:
-            history[j].append((match_date, rating_value(ratings_local[j])))
-
-    fig, ax = plt.subplots(figsize=(10, 6))
-    for j in jugadores:
-        dates = [p[0] for p in history[j]]
-        vals = [p[1] for p in history[j]]
-        ax.plot(dates, vals, label=j)
-    ax.set_title("Evolución Acumulada del TrueSkill Rating")
-    ax.set_xlabel("Fecha")
-    ax.set_ylabel("TS Rating (mu - 2.5*sigma)")
-    ax.legend(loc='best', fontsize='small')
-    fig.autofmt_xdate()
-    fig.tight_layout()
-
-    win = tk.Toplevel()
-    win.title("Gráfico Acumulado (TrueSkill)")
-    canvas = FigureCanvasTkAgg(fig, master=win)
-    canvas.draw()
-    canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+    historial = resultados.copia()
+    activos = ids_activos_ordenados()
+    nombres = [nombre_jugador(j) for j in activos]
+    n_ids = len(nombre_por_id)
+    motor = motor_actual
+    eje_rating = etiqueta_rating(motor)
+
+    def construir():
+        # Ordenar y repetir todo el historial es lo costoso: va en el hilo de
+        # render, y los shards se leen de paso sin quedarse cargados
+        ratings_local = {pid: motor.crear_rating() for pid in range(n_ids)}
+        history = {j: [] for j in activos}
+
+        if motor.historia_completa:
+            # Trayectorias suavizadas de cada season, una detrás de otra
+            primera = True
+            for _, lista in historial.recorrer_por_season():
+                partidos = sorted((r for _, r in lista), key=lambda r: r["fecha"])
+                if primera:
+                    first_date = date.fromordinal(dia_ordinal(partidos[0]["fecha"]))
+                    for j in activos:
+                        history[j].append((first_date, rating_value(ratings_local[j])))
+                    primera = False
+                for j, puntos in motor.trayectorias(partidos).items():
+                    if j in history:
+                        history[j].extend((date.fromordinal(dia), valor) for dia, valor in puntos)
+        else:
+            sorted_resultados = sorted(historial.recorrer(), key=lambda r: r["fecha"])
+            first_date = date.fromordinal(dia_ordinal(sorted_resultados[0]["fecha"]))
+            for j in activos:
+                history[j].append((first_date, rating_value(ratings_local[j])))
+            for r in sorted_resultados:
+                match_date = date.fromordinal(dia_ordinal(r["fecha"]))
+                motor.actualizar(ratings_local, r)
+                for j in activos:
+                    history[j].append((match_date, rating_value(ratings_local[j])))
+
+        fig = Figure(figsize=(10, 6))
+        ax = fig.add_subplot()
+        for j, nombre in zip(activos, nombres):
+            dates = [p[0] for p in history[j]]
+            vals = [p[1] for p in history[j]]
+            ax.plot(dates, vals, label=nombre)
+        ax.set_title(f"Evolución Acumulada del Rating ({motor.nombre})")
+        ax.set_xlabel("Fecha")
+        ax.set_ylabel(eje_rating)
+        ax.legend(loc='best', fontsize='small')
+        fig.autofmt_xdate()
+        fig.tight_layout()
+        return fig
+
+    mostrar_grafico_cacheado("acumulado", "Todas", titulo, construir)
 
 def mostrar_heatmap_partidos_vs_ratio():
-    from itertools import combinations
     if not resultados:
         messagebox.showinfo("Info", "No hay resultados para calcular el heatmap.")
         return
 
-    pair_matches = {}
-    pair_wins = {}
-    for pair in combinations(jugadores, 2):
-        p = tuple(sorted(pair))
-        pair_matches[p] = 0
-        pair_wins[p] = 0
+    # Las parejas con algún jugador eliminado no aparecen en el heatmap
+    activos = ids_activos_ordenados()
+    tabla = asegurar_cruces()
+    sub = tabla[np.ix_(activos, activos)]
+    T = sub[:, :, ALIADO_GANA] + sub[:, :, ALIADO_PIERDE]
+    R = np.divide(sub[:, :, ALIADO_GANA], T, out=np.zeros(T.shape), where=T > 0)
 
-    for r in resultados:
-        eq1, eq2 = r["partido"]
-        ganador = r["ganador_partido"]
-        if set(ganador) == set(eq1):
-            perdedor = eq2
-        else:
-            perdedor = eq1
-        w = tuple(sorted(ganador))
-        l = tuple(sorted(perdedor))
-        pair_matches[w] += 1
-        pair_wins[w] += 1
-        pair_matches[l] += 1
-
-    n = len(jugadores)
-    idx_map = {jug: i for i, jug in enumerate(jugadores)}
-    T = np.zeros((n, n), dtype=int)
-    R = np.zeros((n, n), dtype=float)
-
-    for (p1, p2), total in pair_matches.items():
-        i = idx_map[p1]
-        j = idx_map[p2]
-        wins = pair_wins[(p1, p2)]
-        ratio = wins / total if total > 0 else 0
-        T[i, j] = total
-        T[j, i] = total
-        R[i, j] = ratio
-        R[j, i] = ratio
-
-    fig, ax = plt.subplots(figsize=(8, 6))
+    nombres = [nombre_jugador(j) for j in activos]
+
+    def construir():
+        return _figura_heatmap(T, R, nombres)
+
+    mostrar_grafico_cacheado("heatmap", "Todas", "Heatmap Partidos vs. Ratio", construir)
+
+def _figura_heatmap(T, R, nombres):
+    n = len(nombres)
+    fig = Figure(figsize=(8, 6))
+    ax = fig.add_subplot()
     cax = ax.imshow(R, vmin=0, vmax=1, cmap="Greens", alpha=0.8)
     ax.set_title("Heatmap: Partidos Totales (texto) vs. % Victorias (color)")
     ax.set_xticks(np.arange(n))
     ax.set_yticks(np.arange(n))
-    ax.set_xticklabels(jugadores, rotation=45, ha="right")
-    ax.set_yticklabels(jugadores)
+    ax.set_xticklabels(nombres, rotation=45, ha="right")
+    ax.set_yticklabels(nombres)
 
     for i in range(n):
         for j in range(n):
@@ -1041,216 +5827,136 @@ def mostrar_heatmap_partidos_vs_ratio():
     cb = fig.colorbar(cax, ax=ax, fraction=0.046, pad=0.04)
     cb.set_label("Ratio de Victorias", rotation=90)
     fig.tight_layout()
-
-    win = tk.Toplevel()
-    win.title("Heatmap Partidos vs. Ratio")
-    canvas = FigureCanvasTkAgg(fig, master=win)
-    canvas.draw()
-    canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+    return fig
 
 def mostrar_scatter_elo_vs_metricas():
-    recalcular_trueskill_por_season()
+    asegurar_rankings()
     if not ranking_trueskill_por_season:
-        messagebox.showinfo("Info", "No hay datos de TrueSkill para mostrar.")
+        messagebox.showinfo("Info", "No hay rankings para mostrar.")
         return
 
-    def season_sort_key(s):
-        if s == "Season 0":
-            return 0
-        try:
-            return int(s.split()[1])
-        except:
-            return 9999
-
-    sorted_seasons = sorted(ranking_trueskill_por_season.keys(), key=season_sort_key)
-    last_season = sorted_seasons[-1]
+    last_season = _ultima_season()
     ranking = ranking_trueskill_por_season[last_season]
-    stats = calcular_estadisticas(resultados)
+    stats = calcular_estadisticas(registro_o_partidos())
 
     ts_list = []
     win_perc_list = []
     game_diff_list = []
     names = []
 
-    for jug in jugadores:
+    for jug in ids_activos_ordenados():
         ts_val = rating_value(ranking[jug])
         win_perc = stats[jug]["porcentaje_victorias"]
         game_diff = stats[jug]["diferencia_games"]
         ts_list.append(ts_val)
         win_perc_list.append(win_perc)
         game_diff_list.append(game_diff)
-        names.append(jug)
-
-    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 6))
-    ax1.scatter(ts_list, win_perc_list, color="darkgreen", s=100)
-    for i, name in enumerate(names):
-        ax1.annotate(name, (ts_list[i], win_perc_list[i]),
-                     textcoords="offset points", xytext=(5,5), fontsize=9)
-    ax1.set_xlabel("TS Rating")
-    ax1.set_ylabel("% Victorias")
-    ax1.set_title("TrueSkill vs. % Victorias")
-
-    ax2.scatter(ts_list, game_diff_list, color="darkblue", s=100)
-    for i, name in enumerate(names):
-        ax2.annotate(name, (ts_list[i], game_diff_list[i]),
-                     textcoords="offset points", xytext=(5,5), fontsize=9)
-    ax2.set_xlabel("TS Rating")
-    ax2.set_ylabel("Diferencia de Games")
-    ax2.set_title("TrueSkill vs. Diferencia de Games")
-
-    fig.tight_layout()
-    win = tk.Toplevel()
-    win.title("Scatter Plot: TrueSkill vs. Métricas")
-    canvas = FigureCanvasTkAgg(fig, master=win)
-    canvas.draw()
-    canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        names.append(nombre_jugador(jug))
+    nombre_motor = motor_actual.nombre
+    eje_rating = etiqueta_rating()
+
+    def construir():
+        fig = Figure(figsize=(14, 6))
+        ax1, ax2 = fig.subplots(1, 2)
+        ax1.scatter(ts_list, win_perc_list, color="darkgreen", s=100)
+        for i, name in enumerate(names):
+            ax1.annotate(name, (ts_list[i], win_perc_list[i]),
+                         textcoords="offset points", xytext=(5,5), fontsize=9)
+        ax1.set_xlabel(eje_rating)
+        ax1.set_ylabel("% Victorias")
+        ax1.set_title(f"{nombre_motor} vs. % Victorias")
+
+        ax2.scatter(ts_list, game_diff_list, color="darkblue", s=100)
+        for i, name in enumerate(names):
+            ax2.annotate(name, (ts_list[i], game_diff_list[i]),
+                         textcoords="offset points", xytext=(5,5), fontsize=9)
+        ax2.set_xlabel(eje_rating)
+        ax2.set_ylabel("Diferencia de Games")
+        ax2.set_title(f"{nombre_motor} vs. Diferencia de Games")
+
+        fig.tight_layout()
+        return fig
+
+    mostrar_grafico_cacheado("scatter_metricas", last_season,
+                             f"Scatter Plot: {nombre_motor} vs. Métricas", construir)
 
 def mostrar_scatter_elo_vs_partidos():
-    recalcular_trueskill_por_season()
+    asegurar_rankings()
     if not ranking_trueskill_por_season:
-        messagebox.showinfo("Info", "No hay datos de TrueSkill para mostrar.")
+        messagebox.showinfo("Info", "No hay rankings para mostrar.")
         return
 
-    def season_sort_key(s):
-        if s == "Season 0":
-            return 0
-        try:
-            return int(s.split()[1])
-        except:
-            return 9999
-
-    sorted_seasons = sorted(ranking_trueskill_por_season.keys(), key=season_sort_key)
-    last_season = sorted_seasons[-1]
+    last_season = _ultima_season()
     ranking = ranking_trueskill_por_season[last_season]
-    stats = calcular_estadisticas(resultados)
+    stats = calcular_estadisticas(registro_o_partidos())
 
     x_partidos = []
     y_ts = []
     labels = []
 
-    for jug in jugadores:
+    for jug in ids_activos_ordenados():
         partidos_jugados = stats[jug]["partidos_jugados"]
         ts_val = rating_value(ranking[jug])
         x_partidos.append(partidos_jugados)
         y_ts.append(ts_val)
-        labels.append(jug)
-
-    fig, ax = plt.subplots(figsize=(8, 6))
-    ax.scatter(x_partidos, y_ts, color="dodgerblue", s=100)
-    for i, name in enumerate(labels):
-        ax.annotate(name, (x_partidos[i], y_ts[i]),
-                    textcoords="offset points", xytext=(5,5), fontsize=9)
-    ax.set_xlabel("Partidos Totales")
-    ax.set_ylabel("TS Rating (Última Season)")
-    ax.set_title("TrueSkill vs. Partidos Totales")
-    fig.tight_layout()
-
-    win = tk.Toplevel()
-    win.title("Scatter: TrueSkill vs. Partidos Totales")
-    canvas = FigureCanvasTkAgg(fig, master=win)
-    canvas.draw()
-    canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        labels.append(nombre_jugador(jug))
+    nombre_motor = motor_actual.nombre
+    eje_rating = etiqueta_rating()
+
+    def construir():
+        fig = Figure(figsize=(8, 6))
+        ax = fig.add_subplot()
+        ax.scatter(x_partidos, y_ts, color="dodgerblue", s=100)
+        for i, name in enumerate(labels):
+            ax.annotate(name, (x_partidos[i], y_ts[i]),
+                        textcoords="offset points", xytext=(5,5), fontsize=9)
+        ax.set_xlabel("Partidos Totales")
+        ax.set_ylabel(f"{eje_rating}, última season")
+        ax.set_title(f"{nombre_motor} vs. Partidos Totales")
+        fig.tight_layout()
+        return fig
+
+    mostrar_grafico_cacheado("scatter_partidos", last_season,
+                             f"Scatter: {nombre_motor} vs. Partidos Totales", construir)
 
 def estadisticas_jugador_detalladas(player):
-    ally_data = defaultdict(lambda: {"wins": 0, "losses": 0, "games": 0})
-    enemy_data = defaultdict(lambda: {"wins": 0, "losses": 0, "games": 0})
-
-    for match in resultados:
-        eq1, eq2 = match["partido"]
-        winner = match["ganador_partido"]
-        if player in eq1:
-            ally = eq1[1] if eq1[0] == player else eq1[0]
-            opp1, opp2 = eq2
-            if set(eq1) == set(winner):
-                ally_data[ally]["wins"] += 1
-                ally_data[ally]["games"] += 1
-                enemy_data[opp1]["losses"] += 1
-                enemy_data[opp1]["games"] += 1
-                enemy_data[opp2]["losses"] += 1
-                enemy_data[opp2]["games"] += 1
-            else:
-                ally_data[ally]["losses"] += 1
-                ally_data[ally]["games"] += 1
-                enemy_data[opp1]["wins"] += 1
-                enemy_data[opp1]["games"] += 1
-                enemy_data[opp2]["wins"] += 1
-                enemy_data[opp2]["games"] += 1
-        elif player in eq2:
-            ally = eq2[1] if eq2[0] == player else eq2[0]
-            opp1, opp2 = eq1
-            if set(eq2) == set(winner):
-                ally_data[ally]["wins"] += 1
-                ally_data[ally]["games"] += 1
-                enemy_data[opp1]["losses"] += 1
-                enemy_data[opp1]["games"] += 1
-                enemy_data[opp2]["losses"] += 1
-                enemy_data[opp2]["games"] += 1
-            else:
-                ally_data[ally]["losses"] += 1
-                ally_data[ally]["games"] += 1
-                enemy_data[opp1]["wins"] += 1
-                enemy_data[opp1]["games"] += 1
-                enemy_data[opp2]["wins"] += 1
-                enemy_data[opp2]["games"] += 1
-
-    def ally_ratio(a):
-        return a["wins"] / a["games"] if a["games"] > 0 else 0
+    fila = fila_cruces(player)
+    juntos = fila[:, ALIADO_GANA] + fila[:, ALIADO_PIERDE]
+    contra = fila[:, RIVAL_GANA] + fila[:, RIVAL_PIERDE]
+    aliados = np.flatnonzero(juntos)
+    rivales = np.flatnonzero(contra)
+
+    def nombre(pid):
+        return "N/A" if pid is None else nombre_jugador(int(pid))
+
+    def mejor(candidatos, valores):
+        # Primer candidato con el valor máximo
+        if len(candidatos) == 0:
+            return None, 0
+        i = int(np.argmax(valores))
+        return candidatos[i], valores[i]
 
     # Fiel compañero
-    if ally_data:
-        ally_list = [(a, d) for a, d in ally_data.items() if d["games"] > 0]
-        if ally_list:
-            fiel_companero = max(ally_list, key=lambda x: x[1]["games"])
-            fiel_companero_name = fiel_companero[0]
-            fiel_companero_games = fiel_companero[1]["games"]
-        else:
-            fiel_companero_name, fiel_companero_games = "N/A", 0
-    else:
-        fiel_companero_name, fiel_companero_games = "N/A", 0
+    fiel_companero, fiel_companero_games = mejor(aliados, juntos[aliados])
 
     # Mejor/Peor aliado
-    if ally_data:
-        valid_allies = [(ally, info) for ally, info in ally_data.items() if info["games"] > 0]
-        if valid_allies:
-            best_ally = max(valid_allies, key=lambda item: ally_ratio(item[1]))
-            worst_ally = min(valid_allies, key=lambda item: ally_ratio(item[1]))
-            mejor_aliado_name = best_ally[0]
-            mejor_aliado_ratio = ally_ratio(best_ally[1])
-            peor_aliado_name = worst_ally[0]
-            peor_aliado_ratio = ally_ratio(worst_ally[1])
-        else:
-            mejor_aliado_name, mejor_aliado_ratio = "N/A", 0
-            peor_aliado_name, peor_aliado_ratio = "N/A", 0
-    else:
-        mejor_aliado_name, mejor_aliado_ratio = "N/A", 0
-        peor_aliado_name, peor_aliado_ratio = "N/A", 0
+    ratios = fila[aliados, ALIADO_GANA] / juntos[aliados] if len(aliados) else np.zeros(0)
+    mejor_aliado, mejor_aliado_ratio = mejor(aliados, ratios)
+    peor_aliado, peor_aliado_ratio = mejor(aliados, -ratios)
+    peor_aliado_ratio = -peor_aliado_ratio
 
     # Mayor enemigo, enemigo más débil, archirrival
-    enemy_list = [(e, d) for e, d in enemy_data.items() if d["games"] > 0]
-    if enemy_list:
-        biggest_enemy = max(enemy_list, key=lambda x: x[1]["wins"])
-        mayor_enemigo_name = biggest_enemy[0]
-        mayor_enemigo_wins = biggest_enemy[1]["wins"]
-
-        weakest_enemy = max(enemy_list, key=lambda x: x[1]["losses"])
-        enemigo_mas_debil_name = weakest_enemy[0]
-        enemigo_mas_debil_losses = weakest_enemy[1]["losses"]
-
-        archirrival = max(enemy_list, key=lambda x: x[1]["games"])
-        archirrival_name = archirrival[0]
-        archirrival_games = archirrival[1]["games"]
-    else:
-        mayor_enemigo_name, mayor_enemigo_wins = "N/A", 0
-        enemigo_mas_debil_name, enemigo_mas_debil_losses = "N/A", 0
-        archirrival_name, archirrival_games = "N/A", 0
+    mayor_enemigo, mayor_enemigo_wins = mejor(rivales, fila[rivales, RIVAL_GANA])
+    enemigo_mas_debil, enemigo_mas_debil_losses = mejor(rivales, fila[rivales, RIVAL_PIERDE])
+    archirrival, archirrival_games = mejor(rivales, contra[rivales])
 
     return {
-        "fiel_companero": (fiel_companero_name, fiel_companero_games),
-        "mejor_aliado": (mejor_aliado_name, mejor_aliado_ratio),
-        "peor_aliado": (peor_aliado_name, peor_aliado_ratio),
-        "mayor_enemigo": (mayor_enemigo_name, mayor_enemigo_wins),
-        "enemigo_mas_debil": (enemigo_mas_debil_name, enemigo_mas_debil_losses),
-        "archirrival": (archirrival_name, archirrival_games),
+        "fiel_companero": (nombre(fiel_companero), int(fiel_companero_games)),
+        "mejor_aliado": (nombre(mejor_aliado), float(mejor_aliado_ratio)),
+        "peor_aliado": (nombre(peor_aliado), float(peor_aliado_ratio)),
+        "mayor_enemigo": (nombre(mayor_enemigo), int(mayor_enemigo_wins)),
+        "enemigo_mas_debil": (nombre(enemigo_mas_debil), int(enemigo_mas_debil_losses)),
+        "archirrival": (nombre(archirrival), int(archirrival_games)),
     }
 
 def mostrar_estadisticas_jugador_avanzadas():
@@ -1268,9 +5974,10 @@ def mostrar_estadisticas_jugador_avanzadas():
     stats_text.pack(pady=10)
 
     def on_player_selected(event):
-        player = player_var.get()
-        if not player:
+        nombre = player_var.get()
+        if not nombre:
             return
+        player = id_por_nombre[nombre]
         info = estadisticas_jugador_detalladas(player)
         fiel_companero_name, fiel_companero_games = info["fiel_companero"]
         mejor_aliado_name, mejor_aliado_ratio = info["mejor_aliado"]
@@ -1287,7 +5994,7 @@ def mostrar_estadisticas_jugador_avanzadas():
         total_titulos = trofeos_Liga_jugador[player] + torneos
 
         texto_final = (
-            f"Estadísticas de {player}:\n\n"
+            f"Estadísticas de {nombre}:\n\n"
             f"  • Fiel compañero: {fiel_companero_name} (juntos {fiel_companero_games} partidos)\n"
             f"  • Mejor aliado: {mejor_aliado_name} (ratio: {mejor_aliado_percent})\n"
             f"  • Peor aliado: {peor_aliado_name} (ratio: {peor_aliado_percent})\n\n"
@@ -1303,13 +6010,227 @@ def mostrar_estadisticas_jugador_avanzadas():
 
     cb_jugadores.bind("<<ComboboxSelected>>", on_player_selected)
 
+# ---------------------------------
+# NUEVO: Exportación columnar (Arrow / Parquet)
+# ---------------------------------
+# Los notebooks de análisis cargan estas tablas en lugar de volver a
+# parsear resultados.csv y recalcular los ratings.
+TABLAS_EXPORTACION = ("jugadores", "seasons", "partidos", "cambios_rating", "rankings", "estadisticas")
+
+def lugares_exportacion():
+    """
+    Lugares de los partidos (los que hay en los datos, no solo los de
+    LUGARES_ESTADISTICAS) y su columna victorias_<lugar> en la exportación.
+    Los que solo se distinguen por mayúsculas comparten columna.
+    """
+    return {l: f"victorias_{l.lower()}" for l in sorted(l for l in indices_lugares() if l)}
+
+def _tablas_columnares(lugares):
+    """
+    Construye las tablas de exportación como diccionarios de columnas
+    (listas) a partir del estado en memoria. lugares es lo que devuelve
+    lugares_exportacion.
+    """
+    asegurar_rankings()
+
+    t_jugadores = {
+        "id": list(range(len(nombre_por_id))),
+        "nombre": list(nombre_por_id),
+        "activo": list(activo_por_id),
+    }
+
+    t_seasons = {
+        "id": list(range(len(temporadas))),
+        "nombre": [t["nombre"] for t in temporadas],
+        "inicio": [date.fromordinal(t["inicio"]) for t in temporadas],
+        "fin": [date.fromordinal(t["fin"]) for t in temporadas],
+    }
+
+    t_partidos = defaultdict(list)
+    for idx, r in enumerate(resultados.recorrer()):
+        eq1, eq2 = r["partido"]
+        t_partidos["idx"].append(idx)
+        dia = dia_ordinal(r["fecha"])
+        t_partidos["fecha"].append(date.fromordinal(dia) if dia is not None else None)
+        t_partidos["season"].append(r["season"])
+        t_partidos["lugar"].append(r["lugar"])
+        t_partidos["equipo1_jugador1"].append(eq1[0])
+        t_partidos["equipo1_jugador2"].append(eq1[1])
+        t_partidos["equipo2_jugador1"].append(eq2[0])
+        t_partidos["equipo2_jugador2"].append(eq2[1])
+        t_partidos["gana_equipo1"].append(set(r["ganador_partido"]) == set(eq1))
+        t_partidos["primer_set_equipo1"].append(set(r["ganador_primer_set"]) == set(eq1))
+        t_partidos["mvp"].append(r["mvp"])
+        t_partidos["puntuaciones"].append(';'.join(r["puntuaciones"]))
+        t_partidos["tie_breaks"].append(r["tie_breaks"])
+
+    t_cambios = defaultdict(list)
+    for idx in sorted(ts_changes_por_partido):
+        for pid, delta in ts_changes_por_partido[idx].items():
+            t_cambios["idx"].append(idx)
+            t_cambios["jugador"].append(pid)
+            t_cambios["delta"].append(float(delta))
+
+    t_rankings = defaultdict(list)
+    for season, ranking_local in ranking_trueskill_por_season.items():
+        for pos, pid in enumerate(clasificacion_por_season[season], start=1):
+            r_obj = ranking_local[pid]
+            t_rankings["season"].append(season)
+            t_rankings["posicion"].append(pos)
+            t_rankings["jugador"].append(pid)
+            t_rankings["mu"].append(r_obj.mu)
+            t_rankings["sigma"].append(r_obj.sigma)
+            t_rankings["rating"].append(rating_value(r_obj))
+
+    t_estadisticas = defaultdict(list)
+    # La fila con season nula son las estadísticas de todas las seasons juntas.
+    # Del registro mapeado si está disponible; si no, sin cargar los shards
+    grupos = [(None, registro_o_partidos())] + [
+        (season, registro_o_partidos(season)) for season in ranking_trueskill_por_season
+    ]
+    for season, lista in grupos:
+        for pid, st in calcular_estadisticas(lista, list(lugares)).items():
+            t_estadisticas["season"].append(season)
+            t_estadisticas["jugador"].append(pid)
+            for campo in ("partidos_jugados", "victorias", "mvp", "sets_jugados",
+                          "sets_ganados", "tie_breaks", "primer_set_ganado",
+                          "games_ganados", "games_perdidos", "diferencia_games"):
+                t_estadisticas[campo].append(st[campo])
+            t_estadisticas["porcentaje_victorias"].append(float(st["porcentaje_victorias"]))
+            t_estadisticas["porcentaje_primer_set"].append(float(st["porcentaje_primer_set"]))
+            por_columna = Counter()
+            for l, columna in lugares.items():
+                por_columna[columna] += st["victorias_por_lugar"][l]
+            for columna in sorted(set(lugares.values())):
+                t_estadisticas[columna].append(por_columna[columna])
+
+    return {
+        "jugadores": t_jugadores,
+        "seasons": t_seasons,
+        "partidos": dict(t_partidos),
+        "cambios_rating": dict(t_cambios),
+        "rankings": dict(t_rankings),
+        "estadisticas": dict(t_estadisticas),
+    }
+
+def _esquemas_exportacion(pa, lugares):
+    jug = pa.int32()
+    return {
+        "jugadores": pa.schema([("id", jug), ("nombre", pa.string()), ("activo", pa.bool_())]),
+        "seasons": pa.schema([("id", pa.int16()), ("nombre", pa.string()),
+                              ("inicio", pa.date32()), ("fin", pa.date32())]),
+        "partidos": pa.schema([
+            ("idx", pa.int32()), ("fecha", pa.date32()), ("season", pa.int16()),
+            ("lugar", pa.string()),
+            ("equipo1_jugador1", jug), ("equipo1_jugador2", jug),
+            ("equipo2_jugador1", jug), ("equipo2_jugador2", jug),
+            ("gana_equipo1", pa.bool_()), ("primer_set_equipo1", pa.bool_()),
+            ("mvp", jug), ("puntuaciones", pa.string()), ("tie_breaks", pa.int8()),
+        ]),
+        "cambios_rating": pa.schema([("idx", pa.int32()), ("jugador", jug), ("delta", pa.float64())]),
+        "rankings": pa.schema([
+            ("season", pa.int16()), ("posicion", pa.int16()), ("jugador", jug),
+            ("mu", pa.float64()), ("sigma", pa.float64()), ("rating", pa.float64()),
+        ]),
+        "estadisticas": pa.schema(
+            [("season", pa.int16()), ("jugador", jug)]
+            + [(c, pa.int32()) for c in ("partidos_jugados", "victorias", "mvp", "sets_jugados",
+                                         "sets_ganados", "tie_breaks", "primer_set_ganado",
+                                         "games_ganados", "games_perdidos", "diferencia_games")]
+            + [("porcentaje_victorias", pa.float64()), ("porcentaje_primer_set", pa.float64())]
+            + [(columna, pa.int32()) for columna in sorted(set(lugares.values()))]
+        ),
+    }
+
+def exportar_columnar(directorio, formato="arrow"):
+    """
+    Escribe las tablas de partidos, cambios de rating por partido, rankings
+    por season, estadísticas por jugador y las tablas de jugadores y seasons como
+    archivos columnares tipados: Arrow IPC (.arrow, sin comprimir para
+    poder mapearlos en memoria) o Parquet (.parquet).
+    Devuelve la lista de rutas escritas.
+    """
+    import pyarrow as pa
+    lugares = lugares_exportacion()
+    esquemas = _esquemas_exportacion(pa, lugares)
+    tablas = _tablas_columnares(lugares)
+    os.makedirs(directorio, exist_ok=True)
+    rutas = []
+    for nombre in TABLAS_EXPORTACION:
+        esquema = esquemas[nombre]
+        columnas = tablas[nombre]
+        tabla = pa.table({campo.name: pa.array(columnas.get(campo.name, []), type=campo.type)
+                          for campo in esquema}, schema=esquema)
+        if formato == "parquet":
+            import pyarrow.parquet as pq
+            ruta = os.path.join(directorio, f"{nombre}.parquet")
+            pq.write_table(tabla, ruta)
+        else:
+            ruta = os.path.join(directorio, f"{nombre}.arrow")
+            with pa.OSFile(ruta, "wb") as sink:
+                with pa.ipc.new_file(sink, esquema) as writer:
+                    writer.write_table(tabla)
+        rutas.append(ruta)
+    return rutas
+
+def cargar_exportacion(directorio):
+    """
+    Carga las tablas exportadas como DataFrames de pandas. Los .arrow se
+    abren con memory map, así que las columnas numéricas sin nulos se
+    comparten con el archivo sin copiarse; los .parquet se leen normalmente.
+    Devuelve {nombre_tabla: DataFrame}.
+    """
+    import pyarrow as pa
+    tablas = {}
+    for nombre in TABLAS_EXPORTACION:
+        ruta_arrow = os.path.join(directorio, f"{nombre}.arrow")
+        ruta_parquet = os.path.join(directorio, f"{nombre}.parquet")
+        if os.path.exists(ruta_arrow):
+            with pa.memory_map(ruta_arrow, "r") as fuente:
+                tabla = pa.ipc.open_file(fuente).read_all()
+        elif os.path.exists(ruta_parquet):
+            import pyarrow.parquet as pq
+            tabla = pq.read_table(ruta_parquet, memory_map=True)
+        else:
+            continue
+        tablas[nombre] = tabla.to_pandas(split_blocks=True, self_destruct=True)
+    return tablas
+
+def exportar_datos_interfaz():
+    from tkinter import filedialog
+    if importlib.util.find_spec("pyarrow") is None:
+        messagebox.showerror("Error", "Para exportar hace falta instalar pyarrow (pip install pyarrow).")
+        return
+    directorio = filedialog.askdirectory(title="Carpeta de exportación")
+    if not directorio:
+        return
+    formato = "parquet" if messagebox.askyesno(
+        "Formato", "¿Exportar en Parquet?\n(No = Arrow IPC, se abre al instante con memory map)") else "arrow"
+    rutas = exportar_columnar(directorio, formato)
+    messagebox.showinfo("OK", f"Exportadas {len(rutas)} tablas en {directorio}.")
+
+def texto_benchmark_motores(informe):
+    lineas = [f"{'Motor':<18}{'Partidos/s':>14}{'Log-loss':>10}{'Brier':>8}{'Acierto':>9}"]
+    for nombre, m in informe.items():
+        lineas.append(f"{nombre:<18}{m['partidos_por_segundo']:>14.0f}{m['log_loss']:>10.3f}"
+                      f"{m['brier']:>8.3f}{m['acierto'] * 100:>8.1f}%")
+    return "\n".join(lineas)
+
+def mostrar_benchmark_motores():
+    win = tk.Toplevel()
+    win.title("Comparativa de Motores de Rating")
+    texto = tk.Text(win, width=60, height=10, font=('Courier', 10))
+    texto.pack(padx=10, pady=10)
+    texto.insert(tk.END, texto_benchmark_motores(benchmark_motores()))
+    texto.config(state='disabled')
+
 # ---------------------------------
 # 12. Interfaz Principal
 # ---------------------------------
 def actualizar_datos_equipos():
     global parejas, equipos_str, equipo_str_a_pareja
-    parejas = list(itertools.combinations(jugadores, 2))
-    equipos_str = ["{} & {}".format(j1, j2) for (j1, j2) in parejas]
+    parejas = list(itertools.combinations(ids_activos_ordenados(), 2))
+    equipos_str = ["{} & {}".format(nombre_jugador(j1), nombre_jugador(j2)) for (j1, j2) in parejas]
     equipo_str_a_pareja = dict(zip(equipos_str, parejas))
 
 def crear_interfaz():
@@ -1335,8 +6256,23 @@ def crear_interfaz():
     navegacion_menu.add_command(label="Scatter: TrueSkill vs Métricas", command=mostrar_scatter_elo_vs_metricas)
     navegacion_menu.add_command(label="Estadísticas", command=mostrar_estadisticas)
     navegacion_menu.add_command(label="Datos Curiosos", command=mostrar_estadisticas_jugador_avanzadas)
+    navegacion_menu.add_command(label="Sinergia de Parejas", command=mostrar_sinergias_parejas)
+    navegacion_menu.add_command(label="Proyección de Season", command=mostrar_proyeccion_season)
     navegacion_menu.add_command(label="Campeones", command=mostrar_campeones)
+    navegacion_menu.add_separator()
+    navegacion_menu.add_command(label="Quitar Partidos Duplicados", command=quitar_duplicados_interfaz)
+    navegacion_menu.add_command(label="Exportar Datos (Arrow/Parquet)", command=exportar_datos_interfaz)
     menu_bar.add_cascade(label="Navegación", menu=navegacion_menu)
+
+    motor_menu = tk.Menu(menu_bar, tearoff=0)
+    motor_var = tk.StringVar(value=motor_actual.nombre)
+    for nombre_motor in MOTORES_RATING:
+        motor_menu.add_radiobutton(label=nombre_motor, variable=motor_var, value=nombre_motor,
+                                   command=lambda: [cambiar_motor_rating(motor_var.get()),
+                                                    notificar_cambios()])
+    motor_menu.add_separator()
+    motor_menu.add_command(label="Comparar Motores (benchmark)", command=mostrar_benchmark_motores)
+    menu_bar.add_cascade(label="Motor de Rating", menu=motor_menu)
     root.config(menu=menu_bar)
 
     tk.Label(root, text="Fecha del Partido (YYYY-mm-dd):", bg=background_color).grid(row=0, column=0, sticky='e')
@@ -1411,6 +6347,7 @@ def crear_interfaz():
         if len(set(lista_jug)) != 4:
             messagebox.showerror("Error", "No se pueden repetir jugadores en el mismo partido.")
             return
+        eq1j1, eq1j2, eq2j1, eq2j2 = (id_por_nombre[n] for n in lista_jug)
         ganador1er = ganador_primer_set_var.get()
         ganadorpart = ganador_partido_var.get()
         if not ganador1er or not ganadorpart:
@@ -1422,6 +6359,7 @@ def crear_interfaz():
         if not mvp:
             messagebox.showerror("Error", "Selecciona un MVP.")
             return
+        mvp = id_por_nombre[mvp]
         fecha_dt = fecha_var.get_date()
         fecha_str = fecha_dt.strftime('%Y-%m-%d')
         season = obtener_season(fecha_str)
@@ -1456,8 +6394,16 @@ def crear_interfaz():
             "fecha": fecha_str,
             "season": season
         }
-        resultados.append(resultado)
+        # Primero las filas de otros equipos, para que el orden en memoria
+        # coincida con el del archivo
+        comprobar_resultados_externos()
+        if es_duplicado(resultado) and not messagebox.askyesno(
+                "Partido repetido", "Ya hay un partido con la misma fecha, parejas, sets y lugar.\n"
+                                    "¿Registrarlo de todos modos?"):
+            return
+        incorporar_partido(resultado)
         guardar_resultado_csv(resultado)
+        notificar_cambios()
         messagebox.showinfo("OK", "Partido registrado correctamente.")
         equipo1_j1_var.set("")
         equipo1_j2_var.set("")
@@ -1489,67 +6435,119 @@ def crear_interfaz():
         scroll = ttk.Scrollbar(w, orient='vertical', command=listbox.yview)
         scroll.pack(side='left', fill='y')
         listbox.config(yscrollcommand=scroll.set)
+        # Posición en el listbox -> id del jugador
+        ids_listbox = []
         def refrescar():
             listbox.delete(0, tk.END)
-            for jug in sorted(jugadores):
-                listbox.insert(tk.END, jug)
+            ids_listbox[:] = ids_activos_ordenados()
+            for pid in ids_listbox:
+                listbox.insert(tk.END, nombre_jugador(pid))
         refrescar()
         def add_jug():
             name = simpledialog.askstring("Nuevo Jugador", "Nombre:")
             if name:
                 name = name.strip()
-                if name and name not in jugadores:
-                    jugadores.append(name)
-                    guardar_jugadores()
+                # Un jugador eliminado vuelve con su historial
+                if nombre_valido(name) and (name not in id_por_nombre or not activo_por_id[id_por_nombre[name]]):
+                    try:
+                        alta_jugador(name)
+                    except OSError as e:
+                        # TimeoutError incluido: otra instancia retiene jugadores.json
+                        messagebox.showerror("Error", f"No se ha podido guardar: {e}")
+                        return
                     refrescar()
                     actualizar_datos_equipos()
+                    marcar_datos_modificados()
+                    notificar_cambios()
                 else:
                     messagebox.showerror("Error", "Jugador ya existe o inválido.")
         def edit_jug():
             sel = listbox.curselection()
             if not sel:
                 return
-            idx = sel[0]
-            old_name = jugadores[idx]
+            pid = ids_listbox[sel[0]]
+            old_name = nombre_jugador(pid)
             new_name = simpledialog.askstring("Editar Jugador", "Nuevo nombre:", initialvalue=old_name)
             if new_name:
                 new_name = new_name.strip()
-                if new_name and new_name not in jugadores:
-                    jugadores[idx] = new_name
+                if nombre_valido(new_name) and new_name not in id_por_nombre:
+                    renombrar_jugador(pid, new_name)
                     guardar_jugadores()
                     refrescar()
                     actualizar_datos_equipos()
+                    marcar_datos_modificados()
+                    notificar_cambios()
                 else:
                     messagebox.showerror("Error", "Jugador ya existe o inválido.")
         def del_jug():
             sel = listbox.curselection()
             if not sel:
                 return
-            idx = sel[0]
-            jug = jugadores[idx]
+            pid = ids_listbox[sel[0]]
+            jug = nombre_jugador(pid)
             if messagebox.askyesno("Confirmar", f"¿Eliminar {jug}?"):
-                jugadores.pop(idx)
+                eliminar_jugador(pid)
                 guardar_jugadores()
                 refrescar()
                 actualizar_datos_equipos()
+                marcar_datos_modificados()
+                notificar_cambios()
         f_btn = tk.Frame(w)
         f_btn.pack(side='right', fill='y')
         tk.Button(f_btn, text="Agregar", command=add_jug).pack(pady=5)
         tk.Button(f_btn, text="Editar", command=edit_jug).pack(pady=5)
         tk.Button(f_btn, text="Eliminar", command=del_jug).pack(pady=5)
-    leer_jugadores()
-    leer_resultados()
+    if cargar_datos():
+        messagebox.showwarning("Filas ilegibles", texto_rechazos(rechazos_resultados))
     actualizar_datos_equipos()
+
+    def seguir_resultados():
+        comprobar_resultados_externos()
+        if conflictos_escritura:
+            messagebox.showwarning("Cambio no guardado", "\n\n".join(conflictos_escritura))
+            conflictos_escritura.clear()
+        root.after(INTERVALO_SEGUIMIENTO_MS, seguir_resultados)
+
+    root.after(INTERVALO_SEGUIMIENTO_MS, seguir_resultados)
+
+    def cerrar():
+        # Lo pendiente de guardar se escribe antes de salir, y con ello la
+        # instantánea para que el próximo arranque no tenga que releer nada
+        persistencia.vaciar()
+        comprobar_resultados_externos()
+        if version_instantanea != version_datos:
+            guardar_instantanea()
+        persistencia.vaciar()
+        while persistencia.fallidos():
+            archivos = ", ".join(os.path.basename(ruta) for ruta in persistencia.fallidos())
+            if not messagebox.askretrycancel(
+                    "Cambios sin guardar",
+                    f"No se han podido guardar los cambios de {archivos} "
+                    "(puede que otra instancia los tenga bloqueados).\n\n"
+                    "Reintentar vuelve a probar; Cancelar cierra sin guardarlos."):
+                break
+            persistencia.reintentar()
+            persistencia.vaciar()
+        root.destroy()
+
+    root.protocol("WM_DELETE_WINDOW", cerrar)
     root.mainloop()
 
 # ---------------------------------
 # 13. Lanzar la aplicación
 # ---------------------------------
 if __name__ == "__main__":
-    leer_jugadores()
-    leer_resultados()
-    leer_torneos()
-    crear_interfaz()
+    # En el .exe, los procesos de la proyección arrancan por aquí y no deben abrir la app
+    multiprocessing.freeze_support()
+    cargar_calendario()
+    if "--benchmark" in sys.argv:
+        cargar_datos()
+        print(texto_benchmark_motores(benchmark_motores()))
+    elif "--archivo" in sys.argv:
+        cargar_datos()
+        print(texto_archivo_seasons(informe_archivo_seasons()))
+    else:
+        crear_interfaz()
 
 
 
@@ -0,0 +1,80 @@
+import csv
+import importlib.util
+import json
+import os
+import random
+import sys
+
+import pytest
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+JUGADORES = ["Ibai", "Xabi", "Ian", "Aitor", "Cifu", "David", "Igarki", "Aimar"]
+LUGARES = ["Ibaiondo", "Txurdinaga", "Leioa"]
+CAMPOS = ["equipo1_jugador1", "equipo1_jugador2", "equipo2_jugador1", "equipo2_jugador2",
+          "ganador_primer_set_jugador1", "ganador_primer_set_jugador2",
+          "ganador_partido_jugador1", "ganador_partido_jugador2",
+          "mvp", "puntuaciones", "tie_breaks", "lugar", "fecha", "season"]
+
+
+def filas_sinteticas(n, semilla=0):
+    """n filas de resultados.csv (con nombres) de 2021, varias por día."""
+    rnd = random.Random(semilla)
+    filas = []
+    for i in range(n):
+        a, b, c, d = rnd.sample(JUGADORES, 4)
+        ganadores = (a, b) if rnd.random() < 0.5 else (c, d)
+        primer_set = ganadores if rnd.random() < 0.7 else ((c, d) if ganadores == (a, b) else (a, b))
+        tie_breaks = rnd.choice([0, 0, 1, 2])
+        filas.append({
+            "equipo1_jugador1": a, "equipo1_jugador2": b, "equipo2_jugador1": c, "equipo2_jugador2": d,
+            "ganador_primer_set_jugador1": primer_set[0], "ganador_primer_set_jugador2": primer_set[1],
+            "ganador_partido_jugador1": ganadores[0], "ganador_partido_jugador2": ganadores[1],
+            "mvp": rnd.choice(ganadores) if rnd.random() < 0.9 else "",
+            "puntuaciones": rnd.choice(["6-3;7-6", "6-4;3-6;7-5", "7-5;6-2"]),
+            "tie_breaks": str(tie_breaks), "lugar": rnd.choice(LUGARES),
+            "fecha": "2021-%02d-%02d" % (1 + i // 60 % 12, 1 + i // 3 % 20), "season": ""})
+    filas.sort(key=lambda f: f["fecha"])
+    return filas
+
+
+def escribir_resultados(ruta, filas, extra=()):
+    """Escribe resultados.csv con filas (dicts) y, tras ellas, las líneas de extra tal cual."""
+    with open(ruta, "w", encoding="utf-8", newline="") as f:
+        escritor = csv.DictWriter(f, fieldnames=CAMPOS, lineterminator="\n")
+        escritor.writeheader()
+        escritor.writerows(filas)
+        for linea in extra:
+            f.write(linea + "\n")
+
+
+def escribir_calendario(carpeta, seasons):
+    """temporadas.json con seasons [(nombre, inicio, fin)]."""
+    with open(os.path.join(str(carpeta), "temporadas.json"), "w", encoding="utf-8") as archivo:
+        json.dump([{"nombre": nombre, "inicio": inicio, "fin": fin} for nombre, inicio, fin in seasons], archivo)
+
+
+def cargar_last(carpeta):
+    """Last.py cargado de nuevo (estado global limpio, como otra instancia) sobre carpeta."""
+    spec = importlib.util.spec_from_file_location("Last", os.path.join(RAIZ, "src", "Last.py"))
+    modulo = importlib.util.module_from_spec(spec)
+    sys.modules["Last"] = modulo
+    spec.loader.exec_module(modulo)
+    modulo.resource_path = lambda relativa: os.path.join(str(carpeta), relativa)
+    return modulo
+
+
+@pytest.fixture
+def last(tmp_path):
+    """
+    Last.py cargado de nuevo con resource_path en tmp_path, un calendario
+    con una sola season abierta y los jugadores de prueba.
+    """
+    modulo = cargar_last(tmp_path)
+    escribir_calendario(tmp_path, [("Season T", "2020-01-01", "2099-12-31")])
+    with open(tmp_path / "jugadores.json", "w", encoding="utf-8") as f:
+        json.dump(JUGADORES, f)
+    modulo.cargar_calendario()
+    modulo.leer_jugadores()
+    yield modulo
+    modulo.persistencia.vaciar()
+    sys.modules.pop("Last", None)
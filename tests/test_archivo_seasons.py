@@ -0,0 +1,44 @@
+import hashlib
+import io
+
+import pytest
+
+from conftest import escribir_resultados, filas_sinteticas
+
+
+@pytest.fixture
+def partidos(last, tmp_path):
+    """Partidos leídos de un CSV cuyo número no es múltiplo de PARTIDOS_POR_BLOQUE."""
+    n = 2 * last.PARTIDOS_POR_BLOQUE + 77
+    escribir_resultados(tmp_path / "resultados.csv", filas_sinteticas(n))
+    last.leer_resultados()
+    assert len(last.resultados) == n
+    return list(last.resultados)
+
+
+def test_codificar_y_decodificar_season(last, partidos):
+    datos = last.codificar_archivo("Season T", partidos)
+    bloques = list(last.iterar_bloques(io.BytesIO(datos)))
+    # El último bloque queda a medias
+    assert [len(b) for b in bloques] == [last.PARTIDOS_POR_BLOQUE, last.PARTIDOS_POR_BLOQUE, 77]
+    assert [p for b in bloques for p in b] == partidos
+
+
+def test_recorrer_shard_igual_que_leerlo_entero(last, partidos, tmp_path):
+    datos = last.codificar_archivo("Season T", partidos)
+    ruta = tmp_path / "season_T.bin"
+    ruta.write_bytes(datos)
+    tramo = {"archivo": "season_T.bin", "ruta": str(ruta), "sha256": hashlib.sha256(datos).hexdigest(), "bytes": len(datos)}
+    assert list(last.recorrer_shard(tramo)) == partidos
+    assert last.leer_shard(tramo) == partidos
+
+
+def test_valores_vacios_y_textos_no_ascii(last, partidos):
+    partido = dict(partidos[0], mvp=None, puntuaciones=[], lugar="Añorga", tie_breaks=0)
+    datos = last.codificar_archivo("Season T", [partido])
+    assert list(last.iterar_bloques(io.BytesIO(datos))) == [[partido]]
+
+
+def test_no_es_un_archivo_de_season(last):
+    with pytest.raises(ValueError):
+        list(last.iterar_bloques(io.BytesIO(b"equipo1_jugador1,equipo1_jugador2\n")))
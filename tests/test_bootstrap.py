@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+
+from conftest import escribir_resultados, filas_sinteticas
+
+
+@pytest.fixture
+def con_partidos(last, tmp_path):
+    escribir_resultados(tmp_path / "resultados.csv", filas_sinteticas(60))
+    last.leer_resultados()
+    return last
+
+
+def partidos_de(last, season):
+    return sorted((p for _, p in last.resultados.partidos_de_season(season)), key=lambda p: p["fecha"])
+
+
+@pytest.mark.parametrize("nombre", ["TrueSkill", "Elo", "Glicko-2", "Weng-Lin", "Historia completa"])
+def test_replicas_igual_que_repetir_cada_una(con_partidos, nombre):
+    last = con_partidos
+    partidos = partidos_de(last, last.obtener_season("2021-01-15"))
+    jugadores_partidos, gana1 = last._partidos_a_arrays(partidos)
+    N = len(last.nombre_por_id)
+    valores = last._bootstrap_trozo(nombre, partidos, jugadores_partidos, gana1, N, 11, 4)
+    # Las mismas réplicas, una detrás de otra con el motor partido a partido
+    muestras = np.sort(np.random.default_rng(11).integers(0, len(partidos), size=(4, len(partidos))), axis=1)
+    motor = last.MOTORES_RATING[nombre]
+    if motor.historia_completa:
+        motor = motor.aparte()
+    for r, muestra in enumerate(muestras):
+        ratings = motor.reproducir([partidos[i] for i in muestra], N)[0]
+        esperados = [ratings[j].mu - 2 * ratings[j].sigma for j in range(N)]
+        assert valores[r] == pytest.approx(esperados, abs=1e-6)
+
+
+def test_intervalos(con_partidos):
+    last = con_partidos
+    season = last.obtener_season("2021-01-15")
+    ids, intervalos, prob_encima = last.bootstrap_ranking(season, n_replicas=300, semilla=5, procesos=1)
+    assert ids == list(last.clasificacion_por_season[season])
+    n = len(ids)
+    for bajo, alto in intervalos:
+        assert 1 <= bajo <= alto <= n
+    assert prob_encima.shape == (n, n)
+    assert (np.diag(prob_encima) == 0).all()
+    assert (prob_encima + prob_encima.T <= 1 + 1e-12).all()
+    # El primero del ranking suele quedar por encima del último
+    assert prob_encima[0, -1] > prob_encima[-1, 0]
+
+
+def test_misma_semilla_mismo_resultado(con_partidos):
+    last = con_partidos
+    season = last.obtener_season("2021-01-15")
+    a = last.bootstrap_ranking(season, n_replicas=200, semilla=3, procesos=1)
+    b = last.bootstrap_ranking(season, n_replicas=200, semilla=3, procesos=1)
+    assert a[0] == b[0] and a[1] == b[1]
+    assert (a[2] == b[2]).all()
+
+
+def test_season_sin_partidos(last):
+    ids, intervalos, prob_encima = last.bootstrap_ranking(0, n_replicas=50, semilla=0, procesos=1)
+    assert ids == [] and intervalos == [] and prob_encima.shape == (0, 0)
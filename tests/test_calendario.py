@@ -0,0 +1,49 @@
+import os
+from datetime import date
+
+from conftest import escribir_calendario
+
+
+def test_bordes_y_huecos_del_calendario(last, tmp_path):
+    # Desordenado y con huecos: el id es la posición en la lista, no el orden por fecha
+    escribir_calendario(tmp_path, [("B", "2021-07-01", "2021-12-31"),
+                                   ("A", "2021-01-01", "2021-06-30"),
+                                   ("C", "2022-03-01", "2022-03-31")])
+    last.cargar_calendario()
+    casos = {
+        "2020-12-31": None,         # Antes de la primera
+        "2021-01-01": "A", "2021-06-30": "A",
+        "2021-07-01": "B", "2021-12-31": "B",
+        "2022-01-01": None,         # Hueco entre B y C
+        "2022-02-28": None,
+        "2022-03-01": "C", "2022-03-31": "C",
+        "2022-04-01": None,         # Después de la última
+        "2021-02-30": None,         # Fechas que no lo son
+        "": None,
+    }
+    for fecha, nombre in casos.items():
+        esperado = last.SEASON_DESCONOCIDA if nombre is None else last.id_season_por_nombre[nombre]
+        assert last.obtener_season(fecha) == esperado, fecha
+    assert last.id_season_por_nombre == {"B": 0, "A": 1, "C": 2}
+
+
+def test_calendario_por_defecto_no_se_acaba(last, tmp_path):
+    os.remove(tmp_path / "temporadas.json")
+    last.cargar_calendario()
+    assert last.nombre_season(last.obtener_season("2024-12-31")) == "Season 0"
+    assert last.nombre_season(last.obtener_season("2025-01-01")) == "Season 1"
+    assert last.nombre_season(last.obtener_season("2025-07-01")) == "Season 2"
+    anio = date.today().year
+    ultima = last.obtener_season(f"{anio}-12-31")
+    antes = list(last.temporadas)
+    # Más allá de lo listado la season sale de la fecha, con el mismo id que
+    # tendría si el calendario se hubiera generado hasta ese año
+    lejos = anio + 40
+    for fecha, semestre in ((f"{lejos}-06-30", 1), (f"{lejos}-07-01", 2)):
+        sid = last.obtener_season(fecha)
+        assert sid != last.SEASON_DESCONOCIDA
+        assert last.nombre_season(sid) == f"Season {2 * (lejos - 2025) + semestre}"
+    assert last.temporadas[:len(antes)] == antes
+    assert last.obtener_season(f"{anio}-12-31") == ultima
+    assert last.obtener_season(f"{anio + 1}-01-01") == ultima + 1
+    assert last.id_season_por_nombre[last.nombre_season(ultima + 1)] == ultima + 1
@@ -0,0 +1,76 @@
+import csv
+import threading
+import time
+
+import pytest
+
+from conftest import cargar_last, escribir_resultados, filas_sinteticas
+
+
+def retener(last, rutas, soltar):
+    """Toma el cerrojo de rutas en otro hilo (como otra instancia) hasta que se active soltar."""
+    tomado = threading.Event()
+
+    def hilo():
+        with last.bloqueo_archivos(rutas, espera=1.0):
+            tomado.set()
+            soltar.wait(10)
+
+    t = threading.Thread(target=hilo)
+    t.start()
+    assert tomado.wait(5)
+    return t
+
+
+def test_cerrojo_ocupado_da_timeout_y_suelta_lo_tomado(last, tmp_path):
+    a, b = str(tmp_path / "a.csv"), str(tmp_path / "b.csv")
+    soltar = threading.Event()
+    t = retener(last, [b], soltar)
+    try:
+        inicio = time.monotonic()
+        with pytest.raises(TimeoutError, match="b.csv"):
+            with last.bloqueo_archivos([b, a], espera=0.2):
+                pytest.fail("no debería entrar")
+        assert 0.2 <= time.monotonic() - inicio < 2
+        # a se tomó antes que b (orden alfabético) y se ha soltado al fallar
+        with last.bloqueo_archivos([a], espera=0):
+            pass
+    finally:
+        soltar.set()
+        t.join()
+    with last.bloqueo_archivos([a, b], espera=0):
+        pass
+
+
+def test_dos_instancias_anaden_a_la_vez(last, tmp_path):
+    escribir_resultados(tmp_path / "resultados.csv", filas_sinteticas(20))
+    last.leer_resultados()
+    last.persistencia.vaciar()
+    instancias = []
+    for _ in range(2):
+        otra = cargar_last(tmp_path)
+        otra.cargar_calendario()
+        otra.leer_jugadores()
+        otra.leer_resultados()
+        instancias.append(otra)
+    nuevas = filas_sinteticas(60, semilla=4)
+
+    def registrar(instancia, filas):
+        for fila in filas:
+            partido = instancia.parsear_fila_resultado(fila)[0]
+            instancia.incorporar_partido(partido)
+            instancia.guardar_resultado_csv(partido)
+        instancia.persistencia.vaciar()
+
+    hilos = [threading.Thread(target=registrar, args=(instancia, nuevas[k::2]))
+             for k, instancia in enumerate(instancias)]
+    for t in hilos:
+        t.start()
+    for t in hilos:
+        t.join()
+    with open(tmp_path / "resultados.csv", encoding="utf-8-sig", newline="") as f:
+        assert len(list(csv.DictReader(f))) == 80
+    # Cada instancia ve también las filas de la otra, una sola vez
+    for instancia in instancias + [last]:
+        instancia.comprobar_resultados_externos()
+        assert len(instancia.resultados) == 80
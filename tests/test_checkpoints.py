@@ -0,0 +1,130 @@
+import json
+import os
+
+import pytest
+
+from conftest import JUGADORES, cargar_last, escribir_calendario, escribir_resultados, filas_sinteticas
+
+# Dos seasons cerradas (con checkpoint) y una abierta (siempre se repite)
+SEASONS = [("Season A", "2021-01-01", "2021-01-31"), ("Season B", "2021-02-01", "2021-12-31"),
+           ("Season C", "2022-01-01", "2099-12-31")]
+
+
+def abrir(carpeta):
+    """Otra instancia sobre los mismos archivos, como al arrancar de nuevo."""
+    modulo = cargar_last(carpeta)
+    modulo.cargar_calendario()
+    modulo.leer_jugadores()
+    modulo.leer_resultados()
+    return modulo
+
+
+def foto(modulo):
+    modulo.asegurar_rankings()
+    return ({s: {pid: (r.mu, r.sigma) for pid, r in ranking.items()}
+             for s, ranking in modulo.ranking_trueskill_por_season.items()},
+            dict(modulo.podio_por_season), dict(modulo.ts_changes_por_partido))
+
+
+def solo_repetir(modulo, monkeypatch, permitidas):
+    """Hace fallar la repetición de cualquier season que no esté en permitidas."""
+    original = modulo._repetir_season
+
+    def repetir(season, ids):
+        assert season in permitidas, "se ha repetido una season cerrada"
+        return original(season, ids)
+
+    def prohibido(*args, **kwargs):
+        raise AssertionError("se ha repetido una season archivada")
+    monkeypatch.setattr(modulo, "_repetir_season", repetir)
+    monkeypatch.setattr(type(modulo.motor_actual), "reproducir_arrays", prohibido)
+
+
+@pytest.fixture
+def carpeta(tmp_path):
+    escribir_calendario(tmp_path, SEASONS)
+    with open(tmp_path / "jugadores.json", "w", encoding="utf-8") as f:
+        json.dump(JUGADORES, f)
+    filas = filas_sinteticas(150)
+    filas += [dict(f, fecha="2022" + f["fecha"][4:]) for f in filas_sinteticas(30, semilla=1)]
+    escribir_resultados(tmp_path / "resultados.csv", filas)
+    instancias = []
+    yield tmp_path, instancias
+    for modulo in instancias:
+        modulo.persistencia.vaciar()
+
+
+def test_arranque_con_checkpoints_igual_que_repetir(carpeta, monkeypatch):
+    ruta, instancias = carpeta
+    primera = abrir(ruta)
+    instancias.append(primera)
+    repetido = foto(primera)
+    primera.persistencia.vaciar()
+    guardados = json.load(open(ruta / "checkpoints_seasons.json", encoding="utf-8"))
+    assert set(guardados[primera.motor_actual.nombre]) == {"Season A", "Season B"}
+
+    segunda = abrir(ruta)
+    instancias.append(segunda)
+    # La season abierta se repite; las cerradas salen del checkpoint
+    solo_repetir(segunda, monkeypatch, {segunda.obtener_season("2022-06-01")})
+    assert foto(segunda) == repetido
+
+
+def test_partido_nuevo_invalida_el_checkpoint(carpeta):
+    ruta, instancias = carpeta
+    primera = abrir(ruta)
+    instancias.append(primera)
+    antes = foto(primera)
+    primera.persistencia.vaciar()
+    # Otro partido de la Season A, que ya está cerrada y archivada en su shard
+    escribir_resultados(ruta / "resultados.csv", [dict(filas_sinteticas(150)[0], mvp="")],
+                        extra=open(ruta / "resultados.csv", encoding="utf-8").read().splitlines()[1:])
+
+    segunda = abrir(ruta)
+    instancias.append(segunda)
+    con_checkpoint = foto(segunda)
+    segunda.persistencia.vaciar()
+    season = segunda.obtener_season("2021-01-15")
+    assert con_checkpoint[0][season] != antes[0][season]
+
+    # Sin checkpoints, desde cero, sale lo mismo
+    os.remove(ruta / "checkpoints_seasons.json")
+    tercera = abrir(ruta)
+    instancias.append(tercera)
+    assert foto(tercera) == con_checkpoint
+
+
+def test_checkpoint_con_otra_huella_no_se_usa(carpeta):
+    ruta, instancias = carpeta
+    primera = abrir(ruta)
+    instancias.append(primera)
+    repetido = foto(primera)
+    primera.persistencia.vaciar()
+    archivo = ruta / "checkpoints_seasons.json"
+    guardados = json.load(open(archivo, encoding="utf-8"))
+    for checkpoint in guardados[primera.motor_actual.nombre].values():
+        checkpoint["hash"] = "0" * 64
+        for valores in checkpoint["ratings"].values():
+            valores[0] = 99.0
+    archivo.write_text(json.dumps(guardados), encoding="utf-8")
+
+    segunda = abrir(ruta)
+    instancias.append(segunda)
+    assert foto(segunda) == repetido
+
+
+def test_checkpoints_por_motor(carpeta):
+    ruta, instancias = carpeta
+    primera = abrir(ruta)
+    instancias.append(primera)
+    primera.asegurar_rankings()
+    primera.cambiar_motor_rating("Elo")
+    elo = foto(primera)
+    primera.persistencia.vaciar()
+    guardados = json.load(open(ruta / "checkpoints_seasons.json", encoding="utf-8"))
+    assert {"TrueSkill", "Elo"} <= set(guardados)
+
+    segunda = abrir(ruta)
+    instancias.append(segunda)
+    segunda.cambiar_motor_rating("Elo")
+    assert foto(segunda) == elo
@@ -0,0 +1,55 @@
+import random
+from collections import namedtuple
+
+from conftest import escribir_resultados, filas_sinteticas
+
+Rating = namedtuple("Rating", ["mu", "sigma"])
+
+
+def ordenado(last, ratings):
+    """Lo que tiene que dar la clasificación: sorted() de siempre."""
+    return [(pid, last.rating_value(r)) for pid, r in
+            sorted(ratings.items(), key=lambda x: (-last.rating_value(x[1]), x[0]))]
+
+
+def comprobar(last, clasificacion, ratings):
+    esperado = ordenado(last, ratings)
+    assert clasificacion.top() == esperado
+    assert len(clasificacion) == len(esperado)
+    for posicion, (pid, _) in enumerate(esperado, 1):
+        assert clasificacion.posicion(pid) == posicion
+    assert clasificacion.rango(3, 7) == esperado[2:7]
+    assert clasificacion.podio() == [pid for pid, _ in esperado[:3]]
+
+
+def test_altas_cambios_y_bajas_igual_que_sorted(last, monkeypatch):
+    # Cubetas pequeñas para que se partan y se vacíen a menudo
+    monkeypatch.setattr(last.Clasificacion, "TAM_CUBETA", 4)
+    rnd = random.Random(1)
+    # Ratings redondeados: hay empates, que se deshacen por id
+    nuevo = lambda: Rating(rnd.randint(15, 35), rnd.choice([1.0, 2.0, 3.0]))
+    ratings = {pid: nuevo() for pid in range(30)}
+    clasificacion = last.Clasificacion(ratings)
+    comprobar(last, clasificacion, ratings)
+    for _ in range(300):
+        pid = rnd.randrange(60)
+        if pid in ratings and rnd.random() < 0.2:
+            del ratings[pid]
+            clasificacion.quitar(pid)
+        else:
+            ratings[pid] = nuevo()
+            clasificacion.actualizar(pid, ratings[pid])
+        comprobar(last, clasificacion, ratings)
+    assert clasificacion.posicion(1000) is None
+
+
+def test_clasificacion_de_cada_season_tras_partidos_nuevos(last, tmp_path):
+    filas = filas_sinteticas(120)
+    escribir_resultados(tmp_path / "resultados.csv", filas[:100])
+    last.leer_resultados()
+    last.asegurar_rankings()
+    for fila in filas[100:]:
+        last.incorporar_partido(last.parsear_fila_resultado(dict(fila, season=""))[0])
+        assert last.version_rankings == last.version_datos
+        for season, ratings in last.ranking_trueskill_por_season.items():
+            comprobar(last, last.clasificacion_por_season[season], ratings)
@@ -0,0 +1,86 @@
+import copy
+import random
+
+import numpy as np
+import pytest
+
+from conftest import escribir_resultados, filas_sinteticas
+
+
+def por_fuerza_bruta(last):
+    """cruces contado partido a partido, sin vectorizar."""
+    N = len(last.nombre_por_id)
+    tabla = np.zeros((N, N, 4), dtype=np.int64)
+    for p in last.resultados:
+        for equipo, rival in (p["partido"], p["partido"][::-1]):
+            gana = set(p["ganador_partido"]) == set(equipo)
+            for a in equipo:
+                for b in equipo:
+                    if a != b:
+                        tabla[a, b, last.ALIADO_GANA if gana else last.ALIADO_PIERDE] += 1
+                for c in rival:
+                    tabla[a, c, last.RIVAL_PIERDE if gana else last.RIVAL_GANA] += 1
+    return tabla
+
+
+def comprobar(last):
+    esperado = por_fuerza_bruta(last)
+    N = len(esperado)
+    tabla = last.cruces
+    # El tensor puede haber crecido de más al dar de alta jugadores
+    assert (tabla[:N, :N] == esperado).all()
+    assert not tabla[N:].any() and not tabla[:, N:].any()
+    for pid in range(N):
+        assert (last.fila_cruces(pid)[:N] == esperado[pid]).all()
+
+
+@pytest.fixture
+def cargado(last, tmp_path):
+    escribir_resultados(tmp_path / "resultados.csv", filas_sinteticas(200))
+    last.leer_resultados()
+    return last
+
+
+def test_cruces_igual_que_recorrer(cargado):
+    last = cargado
+    last.asegurar_cruces()
+    comprobar(last)
+    assert last.fila_cruces(len(last.nombre_por_id) + 10).shape == (0, 4)
+
+
+def test_cruces_al_dia_tras_editar(cargado):
+    last = cargado
+    last.asegurar_cruces()
+    rnd = random.Random(7)
+    for paso in range(6):
+        if paso % 3 == 0:
+            last.incorporar_partido(copy.deepcopy(last.resultados[rnd.randrange(len(last.resultados))]))
+        elif paso % 3 == 1:
+            partido = copy.deepcopy(last.resultados[rnd.randrange(len(last.resultados))])
+            eq1, eq2 = partido["partido"]
+            partido["ganador_partido"] = eq2 if partido["ganador_partido"] == eq1 else eq1
+            last.editar_partido(rnd.randrange(len(last.resultados)), partido)
+        else:
+            last.borrar_partido(rnd.randrange(len(last.resultados)))
+        # Se han corregido las casillas del partido, sin reconstruir
+        assert last.version_cruces == last.version_datos
+        comprobar(last)
+    assert last.deshacer_edicion()
+    last.asegurar_cruces()
+    comprobar(last)
+
+
+def test_jugador_nuevo_amplia_el_tensor(cargado):
+    last = cargado
+    last.asegurar_cruces()
+    partido = copy.deepcopy(last.resultados[0])
+    nuevo = last.internar_jugador("Recien Llegado")
+    eq1, eq2 = partido["partido"]
+    gana1 = partido["ganador_partido"] == eq1
+    eq1 = type(eq1)([nuevo, eq1[1]])
+    partido["partido"] = type(partido["partido"])([eq1, eq2])
+    partido["ganador_partido"] = eq1 if gana1 else eq2
+    last.incorporar_partido(partido)
+    assert last.version_cruces == last.version_datos
+    assert last.cruces.shape[0] > nuevo
+    comprobar(last)
@@ -0,0 +1,54 @@
+import copy
+import re
+
+from conftest import escribir_resultados, filas_sinteticas
+
+
+def al_reves(partido):
+    """El mismo partido apuntado con los equipos (y sus jugadores) cambiados de orden."""
+    eq1, eq2 = partido["partido"]
+    otro = copy.deepcopy(partido)
+    otro["partido"] = (eq2[::-1], eq1[::-1])
+    # Los sets desde el otro equipo, con espacios de más: 6-7(5) -> " 7-6(5) "
+    otro["puntuaciones"] = [re.sub(r"^(\d+)-(\d+)", r" \2-\1", t) + " " for t in partido["puntuaciones"]]
+    return otro
+
+
+def test_huella_no_depende_del_orden_de_los_equipos(last):
+    partido = {"partido": ((0, 1), (2, 3)), "ganador_partido": (0, 1), "mvp": 0,
+               "puntuaciones": ["6-4", "6-7(5)"], "lugar": "Leioa", "fecha": "2021-05-01"}
+    assert last.huella_partido(al_reves(partido)) == last.huella_partido(partido)
+    for cambio in ({"puntuaciones": ["6-4", "7-6(5)"]}, {"lugar": "Ibaiondo"},
+                   {"fecha": "2021-05-02"}, {"partido": ((0, 2), (1, 3))}):
+        assert last.huella_partido(dict(partido, **cambio)) != last.huella_partido(partido)
+    # Sin jugador (None) no choca con el jugador 0... ni rompe el orden
+    incompleto = dict(partido, partido=((None, 1), (2, 3)))
+    assert last.huella_partido(incompleto) != last.huella_partido(partido)
+
+
+def test_es_duplicado_sigue_las_altas_y_los_borrados(last, tmp_path):
+    escribir_resultados(tmp_path / "resultados.csv", filas_sinteticas(60))
+    last.leer_resultados()
+    partido = copy.deepcopy(last.resultados[10])
+    assert last.es_duplicado(partido) and last.es_duplicado(al_reves(partido))
+    nuevo = dict(partido, lugar="Otro sitio")
+    assert not last.es_duplicado(nuevo)
+    idx = last.incorporar_partido(nuevo)
+    # El contador de la season se ha corregido en su sitio, no reconstruido
+    assert last.version_huellas == last.version_datos
+    assert last.es_duplicado(nuevo)
+    last.borrar_partido(idx)
+    assert last.version_huellas == last.version_datos
+    assert not last.es_duplicado(nuevo)
+
+
+def test_buscar_y_quitar_duplicados(last, tmp_path):
+    filas = filas_sinteticas(60)
+    escribir_resultados(tmp_path / "resultados.csv", filas + [filas[5], filas[40], filas[5]])
+    last.leer_resultados()
+    assert last.buscar_duplicados() == [60, 61, 62]
+    last.quitar_duplicados(last.buscar_duplicados())
+    assert len(last.resultados) == 60 and last.buscar_duplicados() == []
+    last.persistencia.vaciar()
+    last.leer_resultados()
+    assert len(last.resultados) == 60
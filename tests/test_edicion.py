@@ -0,0 +1,76 @@
+import copy
+import random
+
+import pytest
+
+from conftest import escribir_resultados, filas_sinteticas
+
+
+def foto(last):
+    """Ratings por season y cambios por partido, redondeados."""
+    ratings = {season: {pid: (round(r.mu, 9), round(r.sigma, 9)) for pid, r in ranking.items()}
+               for season, ranking in last.ranking_trueskill_por_season.items()}
+    cambios = {idx: {pid: round(v, 9) for pid, v in c.items()}
+               for idx, c in last.ts_changes_por_partido.items()}
+    return ratings, cambios
+
+
+def recalculo_completo(last):
+    last.version_rankings = -1
+    last.asegurar_rankings()
+    return foto(last)
+
+
+def editar_al_azar(last, rnd):
+    idx = rnd.randrange(len(last.resultados))
+    partido = copy.deepcopy(last.resultados[idx])
+    eq1, eq2 = partido["partido"]
+    partido["ganador_partido"] = eq2 if partido["ganador_partido"] == eq1 else eq1
+    if rnd.random() < 0.5:
+        partido["fecha"] = "2021-%02d-%02d" % (rnd.randint(1, 12), rnd.randint(1, 20))
+    last.editar_partido(idx, partido)
+
+
+@pytest.mark.parametrize("motor", ["TrueSkill", "Elo", "Historia completa"])
+@pytest.mark.parametrize("operaciones", [
+    ["editar"],
+    ["borrar"],
+    ["editar", "deshacer"],
+    ["borrar", "deshacer"],
+    ["editar", "borrar", "editar", "deshacer", "deshacer"],
+])
+def test_edicion_igual_a_recalculo_completo(last, tmp_path, motor, operaciones):
+    if motor not in last.MOTORES_RATING:
+        pytest.skip(f"sin motor {motor}")
+    escribir_resultados(tmp_path / "resultados.csv", filas_sinteticas(150))
+    last.leer_resultados()
+    last.cambiar_motor_rating(motor)
+    last.version_rankings = -1
+    last.asegurar_rankings()
+    rnd = random.Random(len(operaciones))
+    for operacion in operaciones:
+        if operacion == "editar":
+            editar_al_azar(last, rnd)
+        elif operacion == "borrar":
+            last.borrar_partido(rnd.randrange(len(last.resultados)))
+        else:
+            assert last.deshacer_edicion()
+        # Los rankings siguen al día: no se ha tirado el cálculo para rehacerlo entero
+        assert last.version_rankings == last.version_datos
+        # La edición repite solo lo afectado; el resultado ha de ser el de recalcular todo
+        last.asegurar_rankings()
+        incremental = foto(last)
+        assert incremental == recalculo_completo(last)
+
+
+def test_deshacer_vuelve_al_original(last, tmp_path):
+    escribir_resultados(tmp_path / "resultados.csv", filas_sinteticas(80))
+    last.leer_resultados()
+    last.asegurar_rankings()
+    original = foto(last), list(last.resultados)
+    rnd = random.Random(3)
+    editar_al_azar(last, rnd)
+    last.borrar_partido(10)
+    assert last.deshacer_edicion() and last.deshacer_edicion()
+    last.asegurar_rankings()
+    assert (foto(last), list(last.resultados)) == original
@@ -0,0 +1,51 @@
+from collections import Counter
+
+import pytest
+
+from conftest import LUGARES, escribir_resultados, filas_sinteticas
+
+pytest.importorskip("pyarrow")
+pytest.importorskip("pandas")
+
+
+@pytest.fixture
+def exportado(last, tmp_path):
+    filas = filas_sinteticas(120)
+    filas[7] = dict(filas[7], lugar="Polideportivo Nuevo")
+    escribir_resultados(tmp_path / "resultados.csv", filas)
+    last.leer_resultados()
+    return last
+
+
+@pytest.mark.parametrize("formato", ["arrow", "parquet"])
+def test_exportar_y_cargar(exportado, tmp_path, formato):
+    last = exportado
+    rutas = last.exportar_columnar(str(tmp_path / "export"), formato=formato)
+    assert len(rutas) == len(last.TABLAS_EXPORTACION)
+    tablas = last.cargar_exportacion(str(tmp_path / "export"))
+    partidos = tablas["partidos"]
+    assert list(partidos["idx"]) == list(range(len(last.resultados)))
+    assert list(partidos["lugar"]) == [p["lugar"] for p in last.resultados]
+    assert list(partidos["gana_equipo1"]) == [p["ganador_partido"] == p["partido"][0] for p in last.resultados]
+    rankings = tablas["rankings"]
+    for season, clasificacion in last.clasificacion_por_season.items():
+        assert list(rankings[rankings["season"] == season]["jugador"]) == list(clasificacion)
+    assert list(tablas["jugadores"]["nombre"]) == last.nombre_por_id
+
+
+def test_victorias_de_todos_los_lugares(exportado, tmp_path):
+    last = exportado
+    last.exportar_columnar(str(tmp_path / "export"))
+    estadisticas = last.cargar_exportacion(str(tmp_path / "export"))["estadisticas"]
+    # Una columna por cada lugar que sale en los datos, no una lista fija
+    columnas = sorted(c for c in estadisticas.columns if c.startswith("victorias_"))
+    assert columnas == sorted(f"victorias_{l.lower()}" for l in LUGARES + ["Polideportivo Nuevo"])
+    esperadas = Counter()
+    for p in last.resultados:
+        for j in p["ganador_partido"]:
+            esperadas[(j, p["lugar"])] += 1
+    totales = estadisticas[estadisticas["season"].isna()]
+    for _, fila in totales.iterrows():
+        for lugar in LUGARES + ["Polideportivo Nuevo"]:
+            assert fila[f"victorias_{lugar.lower()}"] == esperadas[(fila["jugador"], lugar)]
+        assert sum(fila[c] for c in columnas) == fila["victorias"]
@@ -0,0 +1,87 @@
+import copy
+
+import pytest
+
+from conftest import escribir_resultados, filas_sinteticas
+
+
+def por_fuerza_bruta(last, season=None):
+    """Forma de cada jugador recorriendo sus partidos en orden de fecha."""
+    historial = {}
+    orden = sorted(range(len(last.resultados)), key=lambda i: last.resultados[i]["fecha"])
+    for idx in orden:
+        p = last.resultados[idx]
+        if season is not None and p["season"] != season:
+            continue
+        g1, g2 = last._games_del_partido(p)
+        gana1 = set(p["ganador_partido"]) == set(p["partido"][0])
+        for equipo, gano, dif in ((p["partido"][0], gana1, g1 - g2), (p["partido"][1], not gana1, g2 - g1)):
+            for j in equipo:
+                historial.setdefault(j, []).append((gano, last.ts_changes_por_partido[idx].get(j, 0.0), dif))
+    esperada = {}
+    for j, lista in historial.items():
+        ultimos = lista[-last.VENTANA_FORMA:]
+        rachas = [0]
+        for gano, _, _ in lista:
+            anterior = rachas[-1]
+            rachas.append(anterior + 1 if gano and anterior > 0 else 1 if gano else
+                          anterior - 1 if anterior < 0 else -1)
+        esperada[j] = ("".join("V" if g else "D" for g, _, _ in ultimos),
+                       sum(d for _, d, _ in ultimos), sum(g for _, _, g in ultimos),
+                       rachas[-1], max(rachas), -min(rachas))
+    return esperada
+
+
+def comprobar(last):
+    forma = last.asegurar_forma()
+    for season in [None] + sorted({p["season"] for p in last.resultados}):
+        esperada = por_fuerza_bruta(last, season)
+        assert set(forma[season]) == set(esperada)
+        for j, f in forma[season].items():
+            texto, deltas, games, racha, mejor, peor = esperada[j]
+            assert f.texto_ultimos() == texto
+            assert f.victorias == texto.count("V")
+            assert f.porcentaje() == pytest.approx(texto.count("V") / len(texto) * 100)
+            assert f.suma_deltas == pytest.approx(deltas)
+            assert f.suma_games == games
+            assert (f.racha, f.mejor_racha, f.peor_racha) == (racha, mejor, peor)
+
+
+@pytest.fixture
+def cargado(last, tmp_path):
+    escribir_resultados(tmp_path / "resultados.csv", filas_sinteticas(120))
+    last.leer_resultados()
+    return last
+
+
+def test_forma_igual_que_recorrer(cargado):
+    comprobar(cargado)
+
+
+def test_partido_nuevo_se_anota_sin_reconstruir(cargado):
+    last = cargado
+    last.asegurar_forma()
+    for k in range(4):
+        partido = copy.deepcopy(last.resultados[k])
+        partido["fecha"] = "2021-12-%02d" % (k + 1)
+        last.incorporar_partido(partido)
+        assert last.version_forma == last.version_datos
+        comprobar(last)
+
+
+def test_partido_atrasado_reconstruye(cargado):
+    last = cargado
+    last.asegurar_forma()
+    last.incorporar_partido(copy.deepcopy(last.resultados[0]))
+    assert last.version_forma != last.version_datos
+    comprobar(last)
+
+
+def test_racha_y_textos(last):
+    forma = last.FormaJugador(ventana=3)
+    assert forma.texto_racha() == "-" and forma.porcentaje() == 0
+    for gano in (True, True, False, False, False, True):
+        forma.anotar(gano, 1.0, 2 if gano else -2)
+    assert forma.texto_ultimos() == "DDV" and forma.texto_racha() == "V1"
+    assert (forma.mejor_racha, forma.peor_racha) == (2, 3)
+    assert forma.suma_games == -2 and forma.suma_deltas == 3.0
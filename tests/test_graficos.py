@@ -0,0 +1,56 @@
+import pytest
+
+from conftest import escribir_resultados, filas_sinteticas
+
+
+@pytest.fixture
+def ventanas(last, tmp_path, monkeypatch):
+    """Los gráficos que se abrirían: [(tipo, season, titulo, construir)] sin crear ventanas."""
+    escribir_resultados(tmp_path / "resultados.csv", filas_sinteticas(60))
+    last.leer_resultados()
+    abiertas = []
+    monkeypatch.setattr(last, "mostrar_grafico_cacheado", lambda *args: abiertas.append(args))
+    return abiertas
+
+
+@pytest.mark.parametrize("motor", ["TrueSkill", "Elo"])
+def test_titulos_y_ejes_del_motor_activo(last, ventanas, motor):
+    if motor not in last.MOTORES_RATING:
+        pytest.skip(f"sin motor {motor}")
+    last.cambiar_motor_rating(motor)
+    last.mostrar_grafico_jugadores()
+    last.mostrar_grafico_acumulado()
+    last.mostrar_scatter_elo_vs_partidos()
+    for tipo, season, titulo, construir in ventanas:
+        assert motor in titulo, tipo
+        ax = construir().axes[0]
+        assert motor in ax.get_title()
+        assert last.etiqueta_rating() in ax.get_ylabel()
+        assert "2.5" not in ax.get_ylabel() and "mu - 2*sigma" in ax.get_ylabel()
+
+
+def test_etiqueta_es_la_de_rating_value(last):
+    rating = last.MOTORES_RATING["TrueSkill"].crear_rating()
+    assert last.rating_value(rating) == pytest.approx(rating.mu - 2 * rating.sigma)
+    assert last.etiqueta_rating() == f"Rating {last.motor_actual.nombre} (mu - 2*sigma)"
+
+
+def test_cache_por_version_de_los_datos(last, monkeypatch):
+    monkeypatch.setattr(last, "MAX_GRAFICOS_CACHE", 3)
+    for season in range(5):
+        last._guardar_en_cache(("jugadores", season, last.version_datos), b"png%d" % season)
+    # Solo las más recientes
+    assert [c[1] for c in last.cache_graficos] == [2, 3, 4]
+    assert last.en_cache_graficos("jugadores", 4) and not last.en_cache_graficos("jugadores", 0)
+    last.marcar_datos_modificados()
+    assert not last.en_cache_graficos("jugadores", 4)
+    last._guardar_en_cache(("jugadores", 0, last.version_datos), b"nuevo")
+    # Las de versiones anteriores ya no se pedirán: se tiran
+    assert list(last.cache_graficos) == [("jugadores", 0, last.version_datos)]
+
+
+def test_render_png(last, ventanas):
+    last.mostrar_grafico_jugadores()
+    fig = ventanas[0][3]()
+    png = last._render_png(fig)
+    assert png.startswith(b"\x89PNG") and not fig.axes
@@ -0,0 +1,85 @@
+import random
+
+import numpy as np
+import pytest
+
+from conftest import escribir_resultados, filas_sinteticas
+
+
+@pytest.fixture
+def partidos(last, tmp_path):
+    escribir_resultados(tmp_path / "resultados.csv", filas_sinteticas(120))
+    last.leer_resultados()
+    return sorted(last.resultados, key=lambda p: p["fecha"])
+
+
+@pytest.fixture
+def motor(last):
+    return last.MOTORES_RATING["Historia completa"].aparte()
+
+
+def log_posterior(last, motor, partidos, puntos, r):
+    """El modelo tal como se describe: previa, paseo aleatorio por días y victoria logística."""
+    indice = {tuple(pt): k for k, pt in enumerate(puntos.tolist())}
+    total = 0.0
+    for p in partidos:
+        dia = last.dia_ordinal(p["fecha"])
+        eq1, eq2 = p["partido"]
+        d = sum(r[indice[(j, dia)]] for j in eq1) - sum(r[indice[(j, dia)]] for j in eq2)
+        total -= np.logaddexp(0.0, -d if p["ganador_partido"] == eq1 else d)
+    var_inicial = (motor.sigma_inicial / motor.ESCALA) ** 2
+    var_diaria = motor.varianza_diaria / motor.ESCALA ** 2
+    for k, (pid, dia) in enumerate(puntos.tolist()):
+        if k == 0 or puntos[k - 1, 0] != pid:
+            total -= 0.5 * r[k] ** 2 / var_inicial
+        else:
+            total -= 0.5 * (r[k] - r[k - 1]) ** 2 / (var_diaria * (dia - puntos[k - 1, 1]))
+    return total
+
+
+def test_solucion_es_el_maximo_a_posteriori(last, partidos, motor):
+    puntos, _, mu, _, _ = motor._resolver(partidos)
+    r = (mu - 25.0) / motor.ESCALA
+    h = 1e-5
+    for k in range(len(r)):
+        arriba, abajo = r.copy(), r.copy()
+        arriba[k] += h
+        abajo[k] -= h
+        gradiente = (log_posterior(last, motor, partidos, puntos, arriba) -
+                     log_posterior(last, motor, partidos, puntos, abajo)) / (2 * h)
+        assert abs(gradiente) < 1e-3
+
+
+def test_el_orden_de_los_partidos_no_importa(last, partidos, motor):
+    n = len(last.nombre_por_id)
+    ratings, _ = motor.reproducir(partidos, n)
+    barajados = list(partidos)
+    random.Random(1).shuffle(barajados)
+    otros, _ = motor.aparte().reproducir(sorted(barajados, key=lambda p: p["fecha"]), n)
+    for pid in range(n):
+        assert tuple(otros[pid]) == pytest.approx(tuple(ratings[pid]), abs=1e-6)
+
+
+def test_warm_start_converge_antes_y_a_lo_mismo(last, partidos, motor):
+    n = len(last.nombre_por_id)
+    motor.reproducir(partidos[:-1], n)
+    en_frio = motor.iteraciones
+    ratings, _ = motor.reproducir(partidos, n)
+    assert motor.iteraciones < en_frio
+    desde_cero, _ = motor.aparte().reproducir(partidos, n)
+    for pid in range(n):
+        assert tuple(ratings[pid]) == pytest.approx(tuple(desde_cero[pid]), abs=1e-5)
+
+
+def test_trayectorias_acaban_en_el_ranking(last, partidos, motor):
+    n = len(last.nombre_por_id)
+    ratings, cambios = motor.reproducir(partidos, n)
+    trayectorias = motor.aparte().trayectorias(partidos)
+    for pid, puntos in trayectorias.items():
+        dias = [dia for dia, _ in puntos]
+        assert dias == sorted(set(dias))
+        assert puntos[-1][1] == pytest.approx(last.rating_value(ratings[pid]), abs=1e-5)
+        # Los cambios repartidos por partido suman lo que ha subido o bajado desde el inicio
+        total = sum(c.get(pid, 0) for c in cambios)
+        inicial = last.rating_value(motor.crear_rating())
+        assert total == pytest.approx(puntos[-1][1] - inicial, abs=0.01 * len(cambios))
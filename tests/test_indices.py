@@ -0,0 +1,67 @@
+import copy
+import itertools
+import random
+
+import pytest
+
+from conftest import escribir_resultados, filas_sinteticas
+
+
+def por_fuerza_bruta(last):
+    """Las mismas consultas que los índices, recorriendo los partidos uno a uno."""
+    juntos, contra, balances = {}, {}, {}
+    for idx, p in enumerate(last.resultados):
+        eq1, eq2 = p["partido"]
+        for equipo, rival in ((eq1, eq2), (eq2, eq1)):
+            juntos.setdefault(tuple(sorted(equipo)), []).append(idx)
+            for a, c in itertools.product(equipo, rival):
+                contra.setdefault((a, c), []).append(idx)
+            for j in equipo:
+                v, d = balances.get((j, p["season"]), (0, 0))
+                gana = j in p["ganador_partido"]
+                balances[(j, p["season"])] = (v + gana, d + (not gana))
+    return juntos, contra, balances
+
+
+def comprobar(last):
+    juntos, contra, balances = por_fuerza_bruta(last)
+    ids = sorted(last.nombre_por_id)
+    for a, b in itertools.combinations(ids, 2):
+        assert last.posiciones_de_bits(last.partidos_juntos(a, b)) == juntos.get((a, b), [])
+    for a, c in itertools.permutations(ids, 2):
+        assert last.posiciones_de_bits(last.partidos_contra(a, c)) == contra.get((a, c), [])
+    for season in {p["season"] for p in last.resultados}:
+        for j in ids:
+            assert last.balance(j, last.indice("season", season)) == balances.get((j, season), (0, 0))
+
+
+@pytest.fixture
+def cargado(last, tmp_path):
+    escribir_resultados(tmp_path / "resultados.csv", filas_sinteticas(300))
+    last.leer_resultados()
+    return last
+
+
+def test_consultas_igual_que_recorrer(cargado):
+    comprobar(cargado)
+
+
+def test_indices_al_dia_tras_editar(cargado):
+    last = cargado
+    last.indice("jugador", 0)
+    rnd = random.Random(5)
+    for paso in range(6):
+        if paso % 3 == 0:
+            last.incorporar_partido(copy.deepcopy(last.resultados[rnd.randrange(len(last.resultados))]))
+        elif paso % 3 == 1:
+            partido = copy.deepcopy(last.resultados[rnd.randrange(len(last.resultados))])
+            eq1, eq2 = partido["partido"]
+            partido["ganador_partido"] = eq2 if partido["ganador_partido"] == eq1 else eq1
+            last.editar_partido(rnd.randrange(len(last.resultados)), partido)
+        else:
+            last.borrar_partido(rnd.randrange(len(last.resultados)))
+        # Se han corregido en su sitio, sin reconstruir
+        assert last.version_indices == last.version_datos
+        comprobar(last)
+    assert last.deshacer_edicion()
+    comprobar(last)
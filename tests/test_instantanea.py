@@ -0,0 +1,83 @@
+import os
+
+import pytest
+
+from conftest import cargar_last, escribir_resultados, filas_sinteticas
+
+
+def foto(last):
+    """Lo que deja el arranque: partidos, ratings redondeados y podios."""
+    ratings = {season: {pid: (round(r.mu, 9), round(r.sigma, 9)) for pid, r in ranking.items()}
+               for season, ranking in last.ranking_trueskill_por_season.items()}
+    return list(last.resultados), ratings, dict(last.podio_por_season), list(last.nombre_por_id)
+
+
+def otra_instancia(carpeta):
+    modulo = cargar_last(carpeta)
+    modulo.cargar_calendario()
+    return modulo
+
+
+@pytest.fixture
+def con_instantanea(last, tmp_path):
+    """Datos cargados de los archivos y su instantanea.bin ya escrita."""
+    escribir_resultados(tmp_path / "resultados.csv", filas_sinteticas(90))
+    last.leer_jugadores()
+    last.leer_resultados()
+    last.leer_torneos()
+    last.asegurar_rankings()
+    last.guardar_instantanea()
+    last.persistencia.vaciar()
+    assert os.path.exists(tmp_path / "instantanea.bin")
+    return foto(last)
+
+
+def test_instantanea_da_lo_mismo_que_leer(tmp_path, con_instantanea):
+    nueva = otra_instancia(tmp_path)
+    assert nueva.cargar_instantanea()
+    assert foto(nueva) == con_instantanea
+    assert nueva.version_rankings == nueva.version_datos
+
+
+def test_cambio_en_resultados_invalida_la_instantanea(tmp_path, con_instantanea):
+    ruta = tmp_path / "resultados.csv"
+    info = os.stat(ruta)
+    # Mismo tamaño y mtime pero otro contenido: solo lo delata el sha256
+    datos = ruta.read_bytes()
+    ruta.write_bytes(datos.replace(b"Leioa", b"Leiao", 1))
+    os.utime(ruta, ns=(info.st_atime_ns, info.st_mtime_ns))
+    assert not otra_instancia(tmp_path).cargar_instantanea()
+
+    ruta.write_bytes(datos)
+    os.utime(ruta, ns=(info.st_atime_ns, info.st_mtime_ns))
+    assert otra_instancia(tmp_path).cargar_instantanea()
+
+    # Tras leer de los archivos se reescribe y vuelve a valer
+    with open(ruta, "a", encoding="utf-8") as f:
+        f.write(datos.decode("utf-8").splitlines()[-1] + "\n")
+    nueva = otra_instancia(tmp_path)
+    assert not nueva.cargar_instantanea()
+    nueva.cargar_datos()
+    nueva.persistencia.vaciar()
+    for hilo in [h for h in nueva.threading.enumerate() if h.name == "instantanea"]:
+        hilo.join()
+    nueva.persistencia.vaciar()
+    otra = otra_instancia(tmp_path)
+    assert otra.cargar_instantanea()
+    assert foto(otra) == foto(nueva)
+
+
+def test_otro_motor_o_archivo_roto_no_valen(tmp_path, con_instantanea):
+    nueva = otra_instancia(tmp_path)
+    otro = next(nombre for nombre in nueva.MOTORES_RATING if nombre != nueva.motor_actual.nombre)
+    nueva.cambiar_motor_rating(otro)
+    assert not nueva.cargar_instantanea()
+    ruta = tmp_path / "instantanea.bin"
+    ruta.write_bytes(ruta.read_bytes()[:-50])
+    assert not otra_instancia(tmp_path).cargar_instantanea()
+
+
+def test_shard_nuevo_invalida_la_instantanea(tmp_path, con_instantanea):
+    os.makedirs(tmp_path / "seasons")
+    (tmp_path / "seasons" / "manifiesto.json").write_text('{"seasons": []}', encoding="utf-8")
+    assert not otra_instancia(tmp_path).cargar_instantanea()
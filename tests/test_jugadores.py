@@ -0,0 +1,78 @@
+import csv
+import json
+
+from conftest import JUGADORES, escribir_resultados, filas_sinteticas
+
+
+def nombres_de_partidos(last):
+    return [tuple(last.nombre_jugador(j) for j in p["partido"][0] + p["partido"][1]) for p in last.resultados]
+
+
+def test_migracion_de_nombres_a_ids(last, tmp_path):
+    filas = filas_sinteticas(40)
+    filas[3] = dict(filas[3], equipo1_jugador1="Viejo")    # No está en jugadores.json
+    escribir_resultados(tmp_path / "resultados.csv", filas)
+    last.leer_resultados()
+    last.persistencia.vaciar()
+    antes = nombres_de_partidos(last)
+    assert antes[3][0] == "Viejo"
+    with open(tmp_path / "resultados.csv", encoding="utf-8-sig", newline="") as f:
+        reescritas = list(csv.DictReader(f))
+    assert all(f["equipo1_jugador1"].isdigit() for f in reescritas)
+    # El jugador que solo salía en el historial queda como inactivo
+    with open(tmp_path / "jugadores.json", encoding="utf-8") as f:
+        entradas = json.load(f)
+    assert entradas[len(JUGADORES)] == {"id": len(JUGADORES), "nombre": "Viejo", "activo": False}
+    last.leer_jugadores()
+    last.leer_resultados()
+    assert nombres_de_partidos(last) == antes
+    assert "Viejo" not in last.jugadores
+
+
+def test_renombrar_y_eliminar_no_tocan_el_historial(last, tmp_path):
+    escribir_resultados(tmp_path / "resultados.csv", filas_sinteticas(40))
+    last.leer_resultados()
+    last.persistencia.vaciar()
+    datos = (tmp_path / "resultados.csv").read_bytes()
+    ibai, xabi = last.id_por_nombre["Ibai"], last.id_por_nombre["Xabi"]
+    last.renombrar_jugador(ibai, "Ibai B")
+    last.eliminar_jugador(xabi)
+    last.guardar_jugadores()
+    last.persistencia.vaciar()
+    assert (tmp_path / "resultados.csv").read_bytes() == datos
+    last.leer_jugadores()
+    last.leer_resultados()
+    assert last.nombre_jugador(ibai) == "Ibai B" and "Ibai" not in last.id_por_nombre
+    assert "Xabi" not in last.jugadores and last.nombre_jugador(xabi) == "Xabi"
+    assert any("Xabi" in nombres for nombres in nombres_de_partidos(last))
+
+
+def test_guardar_jugadores_no_pisa_a_otra_instancia(last, tmp_path):
+    last.guardar_jugadores()
+    last.persistencia.vaciar()
+    last.renombrar_jugador(0, "Cambiado")
+    # Entretanto otra instancia da de alta un jugador y renombra otro
+    with open(tmp_path / "jugadores.json", encoding="utf-8") as f:
+        entradas = json.load(f)
+    entradas[1]["nombre"] = "De otro"
+    entradas.append({"id": len(entradas), "nombre": "Nuevo", "activo": True})
+    with open(tmp_path / "jugadores.json", "w", encoding="utf-8") as f:
+        json.dump(entradas, f)
+    last.guardar_jugadores()
+    last.persistencia.vaciar()
+    with open(tmp_path / "jugadores.json", encoding="utf-8") as f:
+        nombres = [e["nombre"] for e in json.load(f)]
+    assert nombres == ["Cambiado", "De otro"] + JUGADORES[2:] + ["Nuevo"]
+
+
+def test_alta_no_repite_ids_entre_instancias(last, tmp_path):
+    pid = last.alta_jugador("Nuevo")
+    assert pid == len(JUGADORES)
+    # Sin releer: otra instancia ya había dado de alta a alguien con ese id
+    with open(tmp_path / "jugadores.json", encoding="utf-8") as f:
+        entradas = json.load(f)
+    entradas.append({"id": len(entradas), "nombre": "De otro", "activo": True})
+    with open(tmp_path / "jugadores.json", "w", encoding="utf-8") as f:
+        json.dump(entradas, f)
+    assert last.alta_jugador("Otro más") == len(JUGADORES) + 2
+    assert last.nombre_jugador(len(JUGADORES) + 1) == "De otro"
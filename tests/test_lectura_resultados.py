@@ -0,0 +1,121 @@
+import csv
+import hashlib
+import io
+import json
+import os
+
+import pytest
+
+from conftest import CAMPOS, JUGADORES, escribir_calendario, escribir_resultados, filas_sinteticas
+
+
+def con_ids(fila):
+    """La fila con ids en lugar de nombres (como la reescribe el programa)."""
+    fila = dict(fila)
+    for campo in CAMPOS[:9]:
+        if fila[campo]:
+            fila[campo] = str(JUGADORES.index(fila[campo]))
+    return fila
+
+
+def linea(fila):
+    texto = io.StringIO()
+    csv.writer(texto, lineterminator="").writerow([fila[campo] for campo in CAMPOS])
+    return texto.getvalue()
+
+
+def leer(last, ruta, tam, rapido, filas_por_trozo=7):
+    rechazos = []
+    if rapido:
+        trozos = last._trozos_pyarrow(str(ruta), tam, rechazos, filas_por_trozo)
+    else:
+        with open(ruta, mode="rb") as file:
+            trozos = list(last._trozos_csv(file, tam, rechazos, filas_por_trozo))
+    partidos = [p for trozo, _ in trozos for p in trozo]
+    return partidos, rechazos
+
+
+@pytest.fixture
+def ruta_con_errores(last, tmp_path):
+    """resultados.csv con ids y, entre las filas buenas, líneas que no se pueden leer (o casi)."""
+    filas = [con_ids(f) for f in filas_sinteticas(40)]
+    malas = [
+        linea(filas[0]) + ",sobra",                                  # Una columna de más
+        ",".join(linea(filas[1]).split(",")[:-3]),                   # Columnas de menos
+        linea(dict(filas[2], tie_breaks="dos")),                     # tie_breaks no entero
+        linea(dict(filas[3], tie_breaks=" 3 ")),                     # Entero con espacios: vale
+        linea(dict(filas[4], equipo1_jugador1="Nuevo")),             # Nombre en vez de id
+        linea(dict(filas[5], equipo2_jugador2="")),                  # Jugador vacío
+        linea(dict(filas[6], equipo1_jugador1="99")),                # Id que no está en jugadores.json
+        linea(dict(filas[7], fecha="ayer")),                         # Fecha fuera del calendario
+    ]
+    ruta = tmp_path / "resultados.csv"
+    intercaladas = []
+    for i, fila in enumerate(filas):
+        intercaladas.append(linea(fila))
+        if i % 5 == 2 and malas:
+            intercaladas.append(malas.pop(0))
+    escribir_resultados(ruta, [], extra=intercaladas)
+    return ruta
+
+
+def test_pyarrow_y_csv_leen_lo_mismo(last, ruta_con_errores):
+    pytest.importorskip("pyarrow")
+    tam = ruta_con_errores.stat().st_size
+    partidos_csv, rechazos_csv = leer(last, ruta_con_errores, tam, rapido=False)
+    partidos_pyarrow, rechazos_pyarrow = leer(last, ruta_con_errores, tam, rapido=True)
+    assert partidos_pyarrow == partidos_csv
+    assert rechazos_pyarrow == rechazos_csv
+    # Las tres filas ilegibles, con su línea del archivo (la cabecera es la 1)
+    assert [r.linea for r in rechazos_csv] == [5, 11, 17]
+    assert [r.motivo for r in rechazos_csv] == ["se esperaban 14 columnas y hay 15",
+                                                "se esperaban 14 columnas y hay 11",
+                                                "invalid literal for int() with base 10: 'dos'"]
+    assert len(partidos_csv) == 40 + 8 - 3
+
+
+def test_fila_a_medias_no_se_lee(last, ruta_con_errores):
+    pytest.importorskip("pyarrow")
+    with open(ruta_con_errores, "ab") as f:
+        f.write(linea(con_ids(filas_sinteticas(1, semilla=9)[0])).encode("utf-8"))
+    tam = last._tam_lineas_completas(str(ruta_con_errores))
+    completas = leer(last, ruta_con_errores, tam, rapido=False)
+    assert leer(last, ruta_con_errores, tam, rapido=True) == completas
+    assert len(completas[0]) == 45
+
+
+def test_filas_ilegibles_de_un_shard_en_csv(last, tmp_path):
+    escribir_calendario(tmp_path, [("Season A", "2020-01-01", "2021-02-28"),
+                                   ("Season B", "2021-03-01", "2099-12-31")])
+    last.cargar_calendario()
+    filas = [con_ids(f) for f in filas_sinteticas(200)]
+    antiguas = [f for f in filas if f["fecha"] < "2021-03"]
+    os.makedirs(tmp_path / "seasons")
+    shard = tmp_path / "seasons" / "season_Season_A.csv"
+
+    buenas = [linea(f) for f in antiguas]
+    escribir_resultados(shard, [], extra=buenas)
+    datos = shard.read_bytes()
+    with open(tmp_path / "seasons" / "manifiesto.json", "w", encoding="utf-8") as f:
+        json.dump({"seasons": [{"season": "Season A", "archivo": "season_Season_A.csv", "filas": len(antiguas),
+                                "bytes": len(datos), "sha256": hashlib.sha256(datos).hexdigest(),
+                                "ultima_fecha": antiguas[-1]["fecha"]}]}, f)
+    escribir_resultados(tmp_path / "resultados.csv", [f for f in filas if f["fecha"] >= "2021-03"])
+
+    # Shard tocado a mano con una fila que no se puede leer
+    escribir_resultados(shard, [], extra=buenas[:3] + [linea(dict(antiguas[3], tie_breaks="dos"))] + buenas[4:])
+    last.leer_resultados()
+    last.persistencia.vaciar()
+    assert last.rechazos_resultados == [
+        last.RechazoFila(5, "invalid literal for int() with base 10: 'dos'", "season_Season_A.csv")]
+    assert "season_Season_A.csv, línea 5" in last.texto_rechazos(last.rechazos_resultados)
+    assert len(last.resultados) == len(filas) - 1
+    # El shard se deja como está hasta corregirlo: no se pasa al archivo por bloques
+    assert sorted(os.listdir(tmp_path / "seasons")) == ["manifiesto.json", "season_Season_A.csv"]
+
+    shard.write_bytes(datos)
+    last.leer_resultados()
+    last.persistencia.vaciar()
+    assert last.rechazos_resultados == []
+    assert len(last.resultados) == len(filas)
+    assert sorted(os.listdir(tmp_path / "seasons")) == ["manifiesto.json", "season_Season_A.bin"]
@@ -0,0 +1,75 @@
+import pytest
+
+from conftest import escribir_resultados, filas_sinteticas
+
+VECTORIZADOS = ["Elo", "Glicko-2", "Weng-Lin"]
+
+
+@pytest.fixture
+def partidos(last, tmp_path):
+    escribir_resultados(tmp_path / "resultados.csv", filas_sinteticas(150))
+    last.leer_resultados()
+    return sorted(last.resultados, key=lambda p: p["fecha"])
+
+
+@pytest.mark.parametrize("nombre", VECTORIZADOS)
+def test_lotes_igual_que_partido_a_partido(last, partidos, nombre):
+    motor = last.MOTORES_RATING[nombre]
+    n = len(last.nombre_por_id)
+    ratings, cambios = motor.reproducir(partidos, n)
+    # La implementación por lotes de partidos independientes frente a uno detrás de otro
+    uno_a_uno = {pid: motor.crear_rating() for pid in range(n)}
+    cambios_uno_a_uno = [motor.actualizar(uno_a_uno, p) for p in partidos]
+    for pid in range(n):
+        assert tuple(ratings[pid]) == pytest.approx(tuple(uno_a_uno[pid]), abs=1e-9)
+    assert cambios == cambios_uno_a_uno
+
+
+@pytest.mark.parametrize("nombre", ["TrueSkill"] + VECTORIZADOS + ["Historia completa"])
+def test_interfaz_comun(last, partidos, nombre):
+    motor = last.MOTORES_RATING[nombre]
+    n = len(last.nombre_por_id)
+    ratings, cambios = motor.reproducir(partidos, n)
+    assert len(cambios) == len(partidos)
+    for pid, r in ratings.items():
+        # La misma escala para todos: media 25 y rating_value = mu - 2*sigma
+        assert 0 < r.mu < 50
+        assert motor.valor(r) == pytest.approx(r.mu - 2 * r.sigma)
+        assert tuple(motor.desde_lista(motor.a_lista(r))) == pytest.approx(tuple(r))
+    # Quien gana sube respecto a quien pierde
+    p = partidos[0]
+    inicial = {pid: motor.crear_rating() for pid in range(n)}
+    deltas = motor.actualizar(inicial, p)
+    perdedores = [j for j in p["partido"][0] + p["partido"][1] if j not in p["ganador_partido"]]
+    assert min(deltas[j] for j in p["ganador_partido"]) > max(deltas[j] for j in perdedores)
+    probs = motor.predicciones(partidos, n)
+    assert len(probs) == len(partidos) and all(0 < x < 1 for x in probs)
+    assert motor.prob_victoria([motor.crear_rating()] * 2, [motor.crear_rating()] * 2) == pytest.approx(0.5)
+
+
+def test_cambiar_de_motor_rehace_los_rankings(last, partidos):
+    def foto():
+        last.asegurar_rankings()
+        return {s: {pid: (r.mu, r.sigma) for pid, r in ranking.items()}
+                for s, ranking in last.ranking_trueskill_por_season.items()}
+
+    trueskill = foto()
+    last.cambiar_motor_rating("Elo")
+    elo = foto()
+    n = len(last.nombre_por_id)
+    for season, ranking in elo.items():
+        lista = sorted((p for _, p in last.resultados.partidos_de_season(season)), key=lambda p: p["fecha"])
+        esperado, _ = last.MOTORES_RATING["Elo"].reproducir(lista, n)
+        for pid, (mu, sigma) in ranking.items():
+            assert (mu, sigma) == pytest.approx(tuple(esperado[pid])[:2])
+    last.cambiar_motor_rating("TrueSkill")
+    assert foto() == trueskill
+
+
+def test_benchmark(last, partidos):
+    informe = last.benchmark_motores(partidos, repeticiones=1)
+    assert set(informe) == set(last.MOTORES_RATING)
+    for metricas in informe.values():
+        assert metricas["partidos_por_segundo"] > 0
+        assert 0 <= metricas["brier"] <= 1 and 0 <= metricas["acierto"] <= 1
+        assert metricas["log_loss"] > 0
@@ -0,0 +1,93 @@
+import os
+import time
+
+import pytest
+
+
+@pytest.fixture
+def cola(last, monkeypatch):
+    monkeypatch.setattr(last, "ESPERA_MAX_CERROJO", 0.05)
+    monkeypatch.setattr(last, "ESPERA_REINTENTO", 0.01)
+    cola = last.ColaPersistencia()
+    yield cola
+    cola.vaciar()
+
+
+def test_reescritura_interrumpida_deja_el_original(last, cola, tmp_path, monkeypatch):
+    ruta = str(tmp_path / "datos.txt")
+    with open(ruta, "w") as f:
+        f.write("viejo")
+
+    def fsync_roto(fd):
+        raise OSError("disco lleno")
+
+    monkeypatch.setattr(last.os, "fsync", fsync_roto)
+    cola.reemplazar(ruta, "nuevo")
+    cola.vaciar()
+    with open(ruta) as f:
+        assert f.read() == "viejo"
+    assert os.listdir(tmp_path).count("datos.txt") == 1
+    assert not [n for n in os.listdir(tmp_path) if n.endswith(".tmp")]
+    assert cola.fallidos() == [ruta] and cola.pendiente(ruta)
+    assert "disco lleno" in last.conflictos_escritura[-1]
+
+    monkeypatch.undo()
+    cola.reintentar()
+    cola.vaciar()
+    with open(ruta) as f:
+        assert f.read() == "nuevo"
+    assert cola.fallidos() == [] and not cola.pendiente(ruta)
+
+
+def test_lotes_se_juntan_en_una_escritura(last, cola, tmp_path, monkeypatch):
+    ruta = str(tmp_path / "resultados.csv")
+    llamadas = []
+    fsync = os.fsync
+    monkeypatch.setattr(last.os, "fsync", lambda fd: (llamadas.append(fd), fsync(fd)))
+    monkeypatch.setattr(last, "ESPERA_MAX_CERROJO", 5.0)
+    terminadas = []
+    with last.bloqueo_archivos([ruta]):
+        cola.anexar(ruta, ["a\n"], cabecera="cabecera\n", encoding="utf-8",
+                    al_terminar=lambda: terminadas.append("a"))
+        # El hilo ya tiene el primer lote y espera el cerrojo: lo demás se acumula
+        time.sleep(0.2)
+        for fila in "bcd":
+            cola.anexar(ruta, [fila + "\n"], encoding="utf-8",
+                        al_terminar=lambda fila=fila: terminadas.append(fila))
+    cola.vaciar()
+    with open(ruta) as f:
+        assert f.read() == "cabecera\na\nb\nc\nd\n"
+    assert len(llamadas) == 2
+    assert terminadas == list("abcd")
+
+
+def test_cerrojo_retenido_no_bloquea_y_no_pierde_filas(last, cola, tmp_path):
+    ruta = str(tmp_path / "resultados.csv")
+    with last.bloqueo_archivos([ruta], espera=1.0):
+        cola.anexar(ruta, ["a\n"], cabecera="cabecera\n", encoding="utf-8")
+        inicio = time.monotonic()
+        cola.vaciar()
+        assert time.monotonic() - inicio < 5
+        assert cola.fallidos() == [ruta] and cola.pendiente(ruta)
+        assert "resultados.csv" in last.conflictos_escritura[-1]
+    assert not os.path.exists(ruta)
+    # Lo fallido sale con el siguiente lote, delante de lo nuevo
+    cola.anexar(ruta, ["b\n"], encoding="utf-8")
+    cola.vaciar()
+    with open(ruta) as f:
+        assert f.read() == "cabecera\na\nb\n"
+    assert cola.fallidos() == [] and not cola.pendiente(ruta)
+
+
+def test_reescritura_incluye_anexos_anteriores(last, cola, tmp_path):
+    ruta = str(tmp_path / "datos.txt")
+    with last.bloqueo_archivos([str(tmp_path / "jugadores.json")], espera=1.0):
+        # Retiene el hilo para que las tres operaciones vayan en el mismo lote
+        cola.reemplazar(str(tmp_path / "jugadores.json"), "[]")
+        time.sleep(0.2)
+        cola.anexar(ruta, ["x\n"])
+        cola.reemplazar(ruta, "entero\n")
+        cola.anexar(ruta, ["y\n"])
+    cola.vaciar()
+    with open(ruta) as f:
+        assert f.read() == "entero\ny\n"
@@ -0,0 +1,60 @@
+import random
+
+import numpy as np
+import pytest
+
+from conftest import escribir_resultados, filas_sinteticas
+
+
+def test_prob_victoria_lote_igual_que_prob_victoria(last):
+    rnd = random.Random(2)
+    for motor in last.MOTORES_RATING.values():
+        equipos = [[last.RatingMotor(rnd.uniform(15, 35), rnd.uniform(0.5, 8)) for _ in range(4)]
+                   for _ in range(50)]
+        esperadas = [motor.prob_victoria(e[:2], e[2:]) for e in equipos]
+        mu = np.array([[r.mu for r in e] for e in equipos])
+        var = np.array([sum(r.sigma ** 2 for r in e) for e in equipos])
+        lote = motor.prob_victoria_lote(mu[:, 0] + mu[:, 1], mu[:, 2] + mu[:, 3], var)
+        assert lote == pytest.approx(esperadas, rel=1e-6), motor.nombre
+
+
+@pytest.fixture
+def con_partidos(last, tmp_path):
+    escribir_resultados(tmp_path / "resultados.csv", filas_sinteticas(80))
+    last.leer_resultados()
+    return last
+
+
+@pytest.mark.parametrize("motor", ["TrueSkill", "Elo", "Glicko-2", "Weng-Lin"])
+def test_proyeccion_usa_el_motor_activo(con_partidos, monkeypatch, motor):
+    last = con_partidos
+    if motor not in last.MOTORES_RATING:
+        pytest.skip(f"sin motor {motor}")
+    last.cambiar_motor_rating(motor)
+    clase = type(last.MOTORES_RATING[motor])
+    llamadas = []
+    original = clase.prob_victoria_lote
+    monkeypatch.setattr(clase, "prob_victoria_lote",
+                        lambda self, *args: (llamadas.append(self.nombre), original(self, *args))[1])
+    season = last.obtener_season("2021-06-01")
+    restantes, probs = last.proyectar_season(season, n_simulaciones=300, partidos_restantes=5,
+                                             semilla=1, procesos=1)
+    assert restantes == 5 and set(llamadas) == {motor}
+    for k in range(3):
+        assert sum(p[k] for p in probs.values()) == pytest.approx(1.0)
+
+
+def test_misma_semilla_mismo_resultado(con_partidos):
+    last = con_partidos
+    season = last.obtener_season("2021-06-01")
+    a = last.proyectar_season(season, n_simulaciones=500, partidos_restantes=10, semilla=3, procesos=1)
+    b = last.proyectar_season(season, n_simulaciones=500, partidos_restantes=10, semilla=3, procesos=1)
+    assert a == b
+
+
+def test_sin_partidos_queda_el_ranking_actual(con_partidos):
+    last = con_partidos
+    season = last.obtener_season("2021-06-01")
+    _, probs = last.proyectar_season(season, n_simulaciones=200, partidos_restantes=0, semilla=0, procesos=1)
+    for k, pid in enumerate(last.clasificacion_por_season[season].podio()):
+        assert probs[pid][k] == 1.0
@@ -0,0 +1,68 @@
+import copy
+
+import numpy as np
+
+from conftest import cargar_last, escribir_resultados, filas_sinteticas
+
+
+def preparar(last, tmp_path, n=120):
+    escribir_resultados(tmp_path / "resultados.csv", filas_sinteticas(n))
+    last.leer_resultados()
+    last.persistencia.vaciar()
+
+
+def otra_instancia(tmp_path):
+    otra = cargar_last(tmp_path)
+    otra.cargar_calendario()
+    otra.leer_jugadores()
+    otra.leer_resultados()
+    return otra
+
+
+def test_registro_igual_que_los_partidos(last, tmp_path):
+    preparar(last, tmp_path)
+    mapa = last.asegurar_registro()
+    assert isinstance(mapa, np.memmap) and len(mapa) == len(last.resultados)
+    assert mapa.tobytes() == last.registro.codificar(list(last.resultados)).tobytes()
+    assert last.calcular_estadisticas(mapa) == last.calcular_estadisticas(list(last.resultados))
+
+
+def test_dos_instancias_comparten_el_registro(last, tmp_path):
+    preparar(last, tmp_path)
+    mapa = last.asegurar_registro()
+    otra = otra_instancia(tmp_path)
+    mapa_otra = otra.asegurar_registro()
+    # Las dos lo usan (mapeado en solo lectura), ninguna trabaja sin él
+    assert last.registro.activo and otra.registro.activo
+    assert mapa_otra.tobytes() == mapa.tobytes()
+
+    nuevo = copy.deepcopy(last.resultados[len(last.resultados) - 1])
+    nuevo["lugar"] = "Otro sitio"
+    version = last.registro.version_en_disco()
+    last.incorporar_partido(nuevo)
+    last.guardar_resultado_csv(nuevo)
+    last.persistencia.vaciar()
+    assert last.version_registro == last.version_datos
+    assert last.registro.version_en_disco() == version + 1
+
+    # La otra ve la versión nueva y el partido por el seguimiento, sin reescribir nada
+    otra.comprobar_resultados_externos()
+    mapa_otra = otra.asegurar_registro()
+    assert len(mapa_otra) == len(otra.resultados) == len(last.resultados)
+    assert otra.registro.version_en_disco() == version + 1
+    assert mapa_otra.tobytes() == last.asegurar_registro().tobytes()
+    assert otra.registro.lugares[mapa_otra["lugar"][-1]] == "Otro sitio"
+    otra.persistencia.vaciar()
+
+
+def test_cerrojo_ocupado_no_desactiva_el_registro(last, tmp_path, monkeypatch):
+    preparar(last, tmp_path)
+    last.asegurar_registro()
+    monkeypatch.setattr(last, "ESPERA_CERROJO_REGISTRO", 0.05)
+    last.marcar_datos_modificados()
+    with last.bloqueo_archivos([last.registro.rutas()[0]]):
+        # Otra instancia escribiendo: esta vez desde memoria
+        assert last.asegurar_registro() is None
+        assert len(list(last.registro_o_partidos())) == len(last.resultados)
+    assert last.registro.activo
+    assert len(last.asegurar_registro()) == len(last.resultados)
@@ -0,0 +1,47 @@
+from conftest import escribir_calendario, escribir_resultados, filas_sinteticas
+
+
+def cargados(last):
+    return [t["season"] for t in last.resultados.archivadas if t["partidos"] is not None]
+
+
+def preparar(last, tmp_path):
+    """Dos seasons cerradas (se archivan al leer) y una abierta; se relee como al arrancar."""
+    escribir_calendario(tmp_path, [("Season A", "2020-01-01", "2021-02-28"),
+                                   ("Season B", "2021-03-01", "2021-03-31"),
+                                   ("Season C", "2021-04-01", "2099-12-31")])
+    last.cargar_calendario()
+    escribir_resultados(tmp_path / "resultados.csv", filas_sinteticas(200))
+    last.leer_resultados()
+    last.persistencia.vaciar()
+    todos = list(last.resultados)
+    last.leer_resultados()
+    return todos
+
+
+def test_arrancar_no_lee_los_shards(last, tmp_path):
+    todos = preparar(last, tmp_path)
+    assert [t["season"] for t in last.resultados.archivadas] == [0, 1]
+    assert cargados(last) == []
+    assert sorted(last.resultados.seasons()) == [0, 1, 2]
+    assert list(last.resultados.recorrer()) == todos
+    assert [(s, [p for _, p in lista]) for s, lista in last.resultados.recorrer_por_season()] == \
+        [(s, [p for p in todos if p["season"] == s]) for s in (0, 1, 2)]
+    assert cargados(last) == []
+
+
+def test_una_season_solo_lee_su_shard(last, tmp_path):
+    todos = preparar(last, tmp_path)
+    lista = last.resultados.partidos_de_season(1)
+    assert cargados(last) == [1]
+    assert lista == [(i, p) for i, p in enumerate(todos) if p["season"] == 1]
+
+
+def test_balance_por_season_sin_leer_shards(last, tmp_path):
+    todos = preparar(last, tmp_path)
+    for season in (0, 1, 2):
+        for pid in range(len(last.nombre_por_id)):
+            jugados = [p for p in todos if p["season"] == season and pid in p["partido"][0] + p["partido"][1]]
+            victorias = sum(pid in p["ganador_partido"] for p in jugados)
+            assert last.balance(pid, last.indice("season", season)) == (victorias, len(jugados) - victorias)
+    assert cargados(last) == []
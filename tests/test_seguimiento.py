@@ -0,0 +1,76 @@
+import os
+
+import pytest
+
+from conftest import escribir_resultados, filas_sinteticas
+
+
+@pytest.fixture
+def seguido(last, tmp_path):
+    """resultados.csv leído (ya migrado a ids) y el seguimiento al día."""
+    escribir_resultados(tmp_path / "resultados.csv", filas_sinteticas(50))
+    last.leer_resultados()
+    last.persistencia.vaciar()
+    assert last.comprobar_resultados_externos() == 0
+    return tmp_path / "resultados.csv"
+
+
+def filas_de_otro_equipo(last, n, semilla=1):
+    """Líneas como las escribiría otra instancia (con ids)."""
+    partidos = [last.parsear_fila_resultado(f)[0] for f in filas_sinteticas(n, semilla=semilla)]
+    return [last.lineas_csv(last.CAMPOS_RESULTADOS, [last.fila_csv_resultado(p)]).encode("utf-8")
+            for p in partidos]
+
+
+def test_filas_anadidas_por_otros(last, seguido):
+    lineas = filas_de_otro_equipo(last, 6)
+    with open(seguido, "ab") as f:
+        f.write(b"".join(lineas[:5]) + lineas[5][:20])
+    assert last.comprobar_resultados_externos() == 5
+    assert len(last.resultados) == 55
+    # La línea a medias se queda para la siguiente vuelta
+    assert last.estado_seguimiento["offset"] == os.path.getsize(seguido) - 20
+    assert last.comprobar_resultados_externos() == 0
+    with open(seguido, "ab") as f:
+        f.write(lineas[5][20:])
+    assert last.comprobar_resultados_externos() == 1
+    assert len(last.resultados) == 56
+
+
+def test_nuestras_filas_no_se_leen_dos_veces(last, seguido):
+    partido = last.parsear_fila_resultado(filas_sinteticas(1, semilla=2)[0])[0]
+    last.incorporar_partido(partido)
+    last.guardar_resultado_csv(partido)
+    last.persistencia.vaciar()
+    with open(seguido, "ab") as f:
+        f.write(filas_de_otro_equipo(last, 1, semilla=2)[0])
+    # La misma fila escrita también por otro equipo sí cuenta
+    assert last.comprobar_resultados_externos() == 1
+    assert len(last.resultados) == 52
+
+
+@pytest.mark.parametrize("cambio", ["cabeza", "cola", "truncado", "generacion"])
+def test_reescritura_obliga_a_recargar(last, seguido, cambio):
+    datos = seguido.read_bytes()
+    if cambio == "cabeza":
+        # Mismo tamaño, otro primer jugador en la primera fila (dentro de TAM_FIRMA)
+        primera = datos.index(b"\n") + 1
+        assert primera < last.TAM_FIRMA
+        otro = b"1" if datos[primera:primera + 1] != b"1" else b"2"
+        datos = datos[:primera] + otro + datos[primera + 1:]
+    elif cambio == "cola":
+        # Mismo tamaño, otra fecha en la última fila
+        final = datos.rindex(b"\n", 0, -1) + 1
+        datos = datos[:final] + datos[final:].replace(b"2021-", b"2020-", 1)
+    elif cambio == "truncado":
+        datos = datos[:datos.rindex(b"\n", 0, -1) + 1]
+    else:
+        # Reescrito por otra instancia con el mismo contenido
+        generacion = last._generacion_resultados()
+        with open(str(seguido) + ".version", "w", encoding="utf-8") as f:
+            f.write(str(generacion + 1))
+    assert len(datos) == os.path.getsize(seguido) or cambio == "truncado"
+    seguido.write_bytes(datos)
+    assert last.comprobar_resultados_externos() == -1
+    assert len(last.resultados) == (49 if cambio == "truncado" else 50)
+    assert last.comprobar_resultados_externos() == 0
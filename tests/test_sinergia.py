@@ -0,0 +1,77 @@
+import copy
+import math
+
+import numpy as np
+import pytest
+
+from conftest import escribir_resultados, filas_sinteticas
+
+
+@pytest.fixture
+def con_partidos(last, tmp_path):
+    escribir_resultados(tmp_path / "resultados.csv", filas_sinteticas(150))
+    last.leer_resultados()
+    return last
+
+
+def gradiente(last, partidos, ratings, sinergias):
+    """Gradiente de la log-posterior de cada sinergia, partido a partido."""
+    grad = {pareja: -last.PRECISION_SINERGIA * s for pareja, (s, _) in sinergias.items()}
+    for p in partidos:
+        eq1, eq2 = p["partido"]
+        c1, c2 = tuple(sorted(eq1)), tuple(sorted(eq2))
+        prob = last.motor_actual.prob_victoria([ratings[j] for j in eq1], [ratings[j] for j in eq2])
+        logit = math.log(prob / (1 - prob)) + sinergias[c1][0] - sinergias[c2][0]
+        resto = (set(p["ganador_partido"]) == set(eq1)) - 1 / (1 + math.exp(-logit))
+        grad[c1] += resto
+        grad[c2] -= resto
+    return grad
+
+
+def test_sinergias_son_el_optimo(con_partidos):
+    last = con_partidos
+    last.asegurar_sinergias()
+    for season, lista in last.resultados.recorrer_por_season():
+        partidos = [p for _, p in lista]
+        sinergias = last.sinergias_por_season[season]
+        # Solo las parejas que han jugado juntas, con sus partidos contados
+        juntos = {}
+        for p in partidos:
+            for equipo in p["partido"]:
+                juntos[tuple(sorted(equipo))] = juntos.get(tuple(sorted(equipo)), 0) + 1
+        assert {pareja: n for pareja, (_, n) in sinergias.items()} == juntos
+        ratings = last.ranking_trueskill_por_season[season]
+        # Las sinergias se guardan redondeadas a 4 decimales
+        for pareja, g in gradiente(last, partidos, ratings, sinergias).items():
+            assert abs(g) < 1e-3 * (1 + juntos[pareja]), pareja
+
+
+def test_sin_partidos_no_hay_sinergias(last):
+    assert last.ajustar_sinergias([], {}) == {}
+
+
+def test_mejores_y_peores_parejas(con_partidos):
+    last = con_partidos
+    season = last.obtener_season("2021-06-01")
+    last.asegurar_sinergias()
+    todas = sorted(((par, s, n) for par, (s, n) in last.sinergias_por_season[season].items()),
+                   key=lambda x: x[1])
+    assert [x[1] for x in last.mejores_parejas(season, k=3)] == [x[1] for x in todas[::-1][:3]]
+    assert [x[1] for x in last.mejores_parejas(season, k=3, peores=True)] == [x[1] for x in todas[:3]]
+    minimo = int(np.median([n for _, _, n in todas])) + 1
+    assert all(n >= minimo for _, _, n in last.mejores_parejas(season, k=50, min_partidos=minimo))
+
+
+def test_partido_nuevo_rehace_las_sinergias(con_partidos):
+    last = con_partidos
+    modelo = copy.deepcopy(last.resultados[0])
+    season = modelo["season"]
+    last.asegurar_sinergias()
+    pareja = tuple(sorted(modelo["ganador_partido"]))
+    antes = last.sinergias_por_season[season][pareja]
+    for _ in range(5):
+        last.incorporar_partido(copy.deepcopy(modelo))
+    last.mejores_parejas(season)
+    despues = last.sinergias_por_season[season][pareja]
+    assert despues[1] == antes[1] + 5
+    assert despues[0] > antes[0]
@@ -0,0 +1,109 @@
+import random
+
+from conftest import escribir_resultados, filas_sinteticas
+
+
+class ArbolFalso:
+    """Lo que sincronizar_filas usa de un ttk.Treeview, con las llamadas contadas."""
+
+    def __init__(self):
+        self.hijos = []
+        self.datos = {}
+        self.llamadas = {"insert": 0, "move": 0, "item": 0, "delete": 0, "detach": 0}
+
+    def get_children(self):
+        return tuple(self.hijos)
+
+    def insert(self, padre, indice, iid, values, tags):
+        self.llamadas["insert"] += 1
+        self.datos[iid] = (values, tags)
+        self.hijos.insert(indice, iid)
+
+    def move(self, iid, padre, indice):
+        self.llamadas["move"] += 1
+        if iid in self.hijos:
+            self.hijos.remove(iid)
+        self.hijos.insert(indice, iid)
+
+    def detach(self, *iids):
+        self.llamadas["detach"] += 1
+        for iid in iids:
+            self.hijos.remove(iid)
+
+    def delete(self, *iids):
+        self.llamadas["delete"] += 1
+        for iid in iids:
+            self.hijos.remove(iid)
+            del self.datos[iid]
+
+    def item(self, iid, values, tags):
+        self.llamadas["item"] += 1
+        self.datos[iid] = (values, tags)
+
+    def pintado(self):
+        return [(iid, *self.datos[iid]) for iid in self.hijos]
+
+
+def test_sincronizar_igual_que_repintar(last):
+    rnd = random.Random(7)
+    arbol, mostradas = ArbolFalso(), {}
+    filas = [(str(k), (k, rnd.random()), ()) for k in range(40)]
+    siguiente = 40
+    for _ in range(200):
+        filas = list(filas)
+        for _ in range(rnd.randint(0, 4)):
+            accion = rnd.choice(["alta", "baja", "mover", "valor"])
+            if accion == "alta":
+                filas.insert(rnd.randint(0, len(filas)), (str(siguiente), (siguiente, 0.0), ()))
+                siguiente += 1
+            elif accion == "baja" and filas:
+                filas.pop(rnd.randrange(len(filas)))
+            elif accion == "mover" and filas:
+                filas.insert(rnd.randint(0, len(filas) - 1), filas.pop(rnd.randrange(len(filas))))
+            elif filas:
+                k = rnd.randrange(len(filas))
+                filas[k] = (filas[k][0], (filas[k][1][0], rnd.random()), ("par",) if rnd.random() < 0.5 else ())
+        last.sincronizar_filas(arbol, filas, mostradas)
+        # Lo mismo que borrar todo y volver a insertarlo
+        repintado = ArbolFalso()
+        last.sincronizar_filas(repintado, filas, {})
+        assert arbol.pintado() == repintado.pintado() == filas
+        assert mostradas == {iid: (values, tags) for iid, values, tags in filas}
+
+
+def test_sincronizar_toca_solo_lo_que_cambia(last):
+    filas = [(str(k), (k,), ()) for k in range(100)]
+    arbol, mostradas = ArbolFalso(), {}
+    last.sincronizar_filas(arbol, filas, mostradas)
+    arbol.llamadas = dict.fromkeys(arbol.llamadas, 0)
+    last.sincronizar_filas(arbol, filas, mostradas)
+    assert sum(arbol.llamadas.values()) == 0
+    # Una fila que sube al principio y otra que cambia de valor
+    filas = [filas[60]] + filas[:60] + filas[61:]
+    filas[10] = ("9", (-9,), ())
+    last.sincronizar_filas(arbol, filas, mostradas)
+    assert arbol.pintado() == filas
+    assert arbol.llamadas == {"insert": 0, "move": 1, "item": 1, "delete": 0, "detach": 1}
+
+
+def test_cambios_publicados_llegan_a_las_ventanas(last, tmp_path):
+    escribir_resultados(tmp_path / "resultados.csv", filas_sinteticas(30))
+    last.leer_resultados()
+    last.notificar_cambios()
+    recibidos = []
+    last.observadores_datos.append(recibidos.append)
+    partido = last.resultados[5]
+    idx = last.incorporar_partido(dict(partido, lugar="Otro"))
+    last.notificar_cambios()
+    assert len(recibidos) == 1
+    (cambio,) = recibidos[0]
+    assert (cambio.tipo, cambio.idx, cambio.seasons) == ("nuevo", idx, frozenset([partido["season"]]))
+    assert cambio.jugadores == frozenset(partido["partido"][0] + partido["partido"][1])
+    assert last.seasons_afectadas(recibidos[0]) == {partido["season"]}
+    # Un cambio total (otro motor) manda repintar todo y se traga los demás
+    last.publicar_cambio("editado", idx, [partido])
+    last.publicar_cambio("todo")
+    last.publicar_cambio("borrado", idx, [partido])
+    last.notificar_cambios()
+    assert recibidos[1] == [last.CAMBIO_TOTAL]
+    assert last.seasons_afectadas(recibidos[1]) is None and last.jugadores_afectados(recibidos[1]) is None